@@ -1,24 +1,13 @@
 """
 Client Database Agent - Handles client database operations.
 """
+from functools import cache
 from crewai import Agent
 from config.llm_config import get_gpt4o
 from tools.database_tool import ClientSaveTool, ClientQueryTool, ClientUpdateTool
 
 
-def create_client_db_agent():
-    """
-    Create Client Database Agent for CRUD operations.
-
-    This agent uses database tools to:
-    - Save new clients
-    - Query existing clients
-    - Update client status/details
-    """
-    return Agent(
-        role="מנהל מאגר לקוחות",
-        goal="לשמור ולחפש לקוחות במאגר הנתונים בצורה מדויקת",
-        backstory="""אתה מנהל מאגר הלקוחות.
+_CLIENT_DB_BACKSTORY = """אתה מנהל מאגר הלקוחות.
 
 תפקידך:
 1. **שמירת לקוחות**: קבלת פרטי לקוח JSON ושמירה במאגר
@@ -31,9 +20,30 @@ def create_client_db_agent():
 
 כשאתה מחפש לקוחות, תחזיר רשימה ברורה עם הדרישות של כל לקוח.
 
-תמיד תבצע את הפעולה המתבקשת ותדווח על התוצאה בעברית.""",
-        llm=get_gpt4o(),
-        tools=[ClientSaveTool(), ClientQueryTool(), ClientUpdateTool()],
+תמיד תבצע את הפעולה המתבקשת ותדווח על התוצאה בעברית."""
+
+
+@cache
+def _client_db_tools():
+    """Client database tools, instantiated once per process."""
+    return (ClientSaveTool(), ClientQueryTool(), ClientUpdateTool())
+
+
+def create_client_db_agent():
+    """
+    Create Client Database Agent for CRUD operations.
+
+    This agent uses database tools to:
+    - Save new clients
+    - Query existing clients
+    - Update client status/details
+    """
+    return Agent(
+        role="מנהל מאגר לקוחות",
+        goal="לשמור ולחפש לקוחות במאגר הנתונים בצורה מדויקת",
+        backstory=_CLIENT_DB_BACKSTORY,
+        llm=get_gpt4o(prompt_cache_key="client_db_v1"),
+        tools=list(_client_db_tools()),
         verbose=True,
         allow_delegation=False
     )
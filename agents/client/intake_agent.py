@@ -0,0 +1,56 @@
+"""
+Client Intake Agent - Parses a new client's requirements and saves them in one pass.
+"""
+from functools import cache
+from crewai import Agent
+from config.llm_config import get_gpt4o
+from tools.database_tool import ClientSaveTool
+
+
+_CLIENT_INTAKE_BACKSTORY = """אתה אחראי על קליטת לקוחות חדשים: מבין את הדרישות מטקסט עברי חופשי ושומר אותן במאגר.
+
+אתה מבין:
+- **סוג חיפוש**: "מחפש להשכיר" = rent, "רוצה לקנות" = buy
+- **טווחי חדרים**: "2-3 חדרים" = min_rooms: 2, max_rooms: 3, "לפחות 4" = min_rooms: 4
+- **טווחי מחיר**: "עד 6000 שקל" = max_price: 6000, "בין 5000-7000" = min_price: 5000, max_price: 7000
+- **מיקום**: "בצפון תל אביב" → city: "תל אביב", preferred_areas: ["צפון תל אביב"]
+- **קיצורים**: חד׳ = חדרים, מ״ר = מטר רבוע, "4 מיליון" = 4000000
+
+**דוגמה:**
+"לקוח חדש יניב כהן מחפש 2-3 חדרים עד 6000 שקל בתל אביב"
+→ name: "יניב כהן", looking_for: "rent", min_rooms: 2, max_rooms: 3, max_price: 6000, city: "תל אביב"
+
+**שדות חובה:** name (אם אין שם, כתוב "לקוח חדש"), looking_for (rent או buy)
+
+**שדות אופציונליים:** phone, property_type, city, min_rooms, max_rooms, min_price, max_price, min_size, preferred_areas, notes
+
+אחרי שחילצת את הפרטים, שמור את הלקוח עם הכלי ClientSaveTool - קריאה אחת בלבד.
+
+בסוף תחזיר JSON תקני בלבד: כל השדות שחילצת ובנוסף client_id - מספר הלקוח שהכלי החזיר."""
+
+
+@cache
+def _client_intake_tools():
+    """Save tool for intake agents (stateless, so one instance serves them all)."""
+    return (ClientSaveTool())
+
+
+def create_client_intake_agent():
+    """
+    Create Client Intake Agent for the add-client workflow.
+
+    Combines the parser and save steps so a new client costs one LLM
+    session instead of two:
+    - Extract requirements from Hebrew text
+    - Save the client with ClientSaveTool
+    - Return the parsed fields plus the new client_id as JSON
+    """
+    return Agent(
+        role="קולט לקוחות",
+        goal="לחלץ דרישות לקוח מדויקות מטקסט עברית ולשמור אותן במאגר",
+        backstory=_CLIENT_INTAKE_BACKSTORY,
+        llm=get_gpt4o(prompt_cache_key="client_intake_v1"),
+        tools=list(_client_intake_tools()),
+        verbose=True,
+        allow_delegation=False
+    )
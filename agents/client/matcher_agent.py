@@ -1,23 +1,13 @@
 """
 Client Matcher Agent - Finds property-client matches.
 """
+from functools import cache
 from crewai import Agent
 from config.llm_config import get_gpt4o
 from tools.matching_tool import PropertyMatcherTool, ClientMatcherTool
 
 
-def create_client_matcher_agent():
-    """
-    Create Client Matcher Agent for finding matches.
-
-    This agent uses matching algorithms to:
-    - Find properties that match a client's requirements
-    - Find clients interested in a specific property
-    """
-    return Agent(
-        role="מומחה התאמות",
-        goal="למצוא את ההתאמות הטובות ביותר בין לקוחות לנכסים",
-        backstory="""אתה מומחה להתאמת נכסים ללקוחות.
+_CLIENT_MATCHER_BACKSTORY = """אתה מומחה להתאמת נכסים ללקוחות.
 
 תפקידך למצוא את ההתאמות הטובות ביותר על סמך:
 1. **סוג עסקה**: חובה התאמה (rent ↔ rent, sale ↔ buy)
@@ -38,9 +28,29 @@ def create_client_matcher_agent():
 - "עיר מדויקת, בתקציב, מספר חדרים מתאים"
 - "אזור קרוב, מעט מעל תקציב (5%)"
 
-תמיד תחזיר את הלקוחות/נכסים הכי מתאימים קודם.""",
-        llm=get_gpt4o(),
-        tools=[PropertyMatcherTool(), ClientMatcherTool()],
+תמיד תחזיר את הלקוחות/נכסים הכי מתאימים קודם."""
+
+
+@cache
+def _client_matcher_tools():
+    """Matching tools, built once and handed to every matcher agent."""
+    return (PropertyMatcherTool(), ClientMatcherTool())
+
+
+def create_client_matcher_agent():
+    """
+    Create Client Matcher Agent for finding matches.
+
+    This agent uses matching algorithms to:
+    - Find properties that match a client's requirements
+    - Find clients interested in a specific property
+    """
+    return Agent(
+        role="מומחה התאמות",
+        goal="למצוא את ההתאמות הטובות ביותר בין לקוחות לנכסים",
+        backstory=_CLIENT_MATCHER_BACKSTORY,
+        llm=get_gpt4o(prompt_cache_key="client_matcher_v1"),
+        tools=list(_client_matcher_tools()),
         verbose=True,
         allow_delegation=False
     )
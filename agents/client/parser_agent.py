@@ -5,16 +5,7 @@ from crewai import Agent
 from config.llm_config import get_gpt4o
 
 
-def create_client_parser_agent():
-    """
-    Create Client Parser Agent for extracting client requirements from Hebrew text.
-
-    This agent understands client search criteria and preferences.
-    """
-    return Agent(
-        role="מפרסר לקוחות",
-        goal="לחלץ דרישות לקוח מדויקות מטקסט עברית חופשי",
-        backstory="""אתה מומחה להבנת דרישות לקוחות בעברית.
+_CLIENT_PARSER_BACKSTORY = """אתה מומחה להבנת דרישות לקוחות בעברית.
 
 אתה מבין:
 - **סוג חיפוש**: "מחפש להשכיר" = rent, "רוצה לקנות/למכור" = buy
@@ -72,8 +63,20 @@ def create_client_parser_agent():
 - אזורים מועדפים (כמו "צפון תל אביב", "דיזנגוף") → preferred_areas array
 - הערות מיוחדות ("קרוב לבית ספר") → notes
 
-תחזיר תמיד JSON תקני בלבד.""",
-        llm=get_gpt4o(),
+תחזיר תמיד JSON תקני בלבד."""
+
+
+def create_client_parser_agent():
+    """
+    Create Client Parser Agent for extracting client requirements from Hebrew text.
+
+    This agent understands client search criteria and preferences.
+    """
+    return Agent(
+        role="מפרסר לקוחות",
+        goal="לחלץ דרישות לקוח מדויקות מטקסט עברית חופשי",
+        backstory=_CLIENT_PARSER_BACKSTORY,
+        llm=get_gpt4o(prompt_cache_key="client_parser_v1"),
         verbose=True,
         allow_delegation=False
     )
@@ -5,16 +5,7 @@ from crewai import Agent
 from config.llm_config import get_creative_gpt4o
 
 
-def create_client_response_agent():
-    """
-    Create Client Response Agent for generating natural Hebrew responses.
-
-    This agent writes friendly, conversational responses about clients and matches.
-    """
-    return Agent(
-        role="כותב תגובות לקוחות",
-        goal="לכתוב תשובות ידידותיות וברורות בעברית על לקוחות והתאמות",
-        backstory="""אתה כותב תשובות לסוכני נדל"ן בעברית טבעית וידידותית.
+_CLIENT_RESPONSE_BACKSTORY = """אתה כותב תשובות לסוכני נדל"ן בעברית טבעית וידידותית.
 
 **סגנון הכתיבה שלך:**
 - שפה יומיומית וחמה
@@ -80,8 +71,20 @@ def create_client_response_agent():
 - תהיה קונקרטי - "בתקציב" טוב מ"מתאים"
 - מקסימום 1500 תווים להודעה
 
-תכתוב בעברית בלבד.""",
-        llm=get_creative_gpt4o(),
+תכתוב בעברית בלבד."""
+
+
+def create_client_response_agent():
+    """
+    Create Client Response Agent for generating natural Hebrew responses.
+
+    This agent writes friendly, conversational responses about clients and matches.
+    """
+    return Agent(
+        role="כותב תגובות לקוחות",
+        goal="לכתוב תשובות ידידותיות וברורות בעברית על לקוחות והתאמות",
+        backstory=_CLIENT_RESPONSE_BACKSTORY,
+        llm=get_creative_gpt4o(prompt_cache_key="client_response_v1"),
         verbose=True,
         allow_delegation=False
     )
@@ -0,0 +1,135 @@
+"""
+Local intent classifier - cheap first pass before the manager agent.
+
+Scores a message against per-intent centroids of character trigram
+vectors built from labeled example phrasings. Only confident, clearly
+separated predictions are returned; anything else goes to the LLM.
+Write intents are never returned from here: a false ADD_* inserts a row,
+so those messages always get the LLM's decision.
+"""
+from collections import Counter
+from math import sqrt
+from typing import Dict, Optional, Tuple
+
+from agents.manager.manager_agent import normalize_message
+
+# Minimum cosine similarity to the best centroid
+MIN_CONFIDENCE = 0.45
+
+# Minimum lead over the runner-up intent
+MIN_MARGIN = 0.1
+
+# Intents that create rows; kept as centroids so they still win messages
+# away from the read intents, but deferred to the LLM when they come out on top
+WRITE_INTENTS = frozenset({'ADD_PROPERTY', 'ADD_CLIENT'})
+
+# Labeled phrasings: the manager agent's routing examples plus the
+# usage examples the bot itself shows users
+INTENT_EXAMPLES: Dict[str, Tuple[str, ...]] = {
+    'ADD_PROPERTY': (
+        "יש לי נכס חדש ב",
+        "דירה למכירה",
+        "דירה להשכרה",
+        "רוצה להוסיף נכס",
+        "נכס חדש ברחוב",
+        "דירה 3 חדרים בתל אביב רחוב דיזנגוף 102 5000 שקל להשכרה",
+        "דירה 3 חד׳ בת״א רחוב דיזנגוף 102 2 מיליון שקל משופצת",
+        "בית פרטי 5 חדרים ברעננה 150 מ״ר עם גינה גדולה ובריכה 4 מיל׳",
+    ),
+    'ADD_CLIENT': (
+        "לקוח חדש שמחפש",
+        "יש לי לקוח שמעוניין",
+        "מישהו מחפש דירה",
+        "רוצה להוסיף לקוח",
+        "לקוח חדש יניב כהן מחפש 2-3 חדרים עד 6000 בתל אביב",
+        "דני לוי רוצה לקנות בית 4-5 חדרים ברעננה תקציב עד 4 מיליון",
+    ),
+    'QUERY_PROPERTY': (
+        "תראה לי את הדירה ב",
+        "מה יש ב",
+        "הנכס ברחוב",
+        "יש לך משהו ב",
+        "תראה לי נכסים בדיזנגוף",
+        "תראה לי נכס מספר",
+    ),
+    'QUERY_CLIENT': (
+        "מי מחפש",
+        "תראה לי את הלקוח",
+        "הלקוח שרה",
+        "מי מחפש 3 חדרים",
+    ),
+    'FIND_MATCHES': (
+        "מה מתאים ל",
+        "יש התאמות ל",
+        "תמצא משהו ל",
+        "למי זה מתאים",
+        "מה מתאים ליניב",
+        "תמצא לקוחות לנכס בדיזנגוף 102",
+        "מי מתאים לנכס",
+    ),
+    'GENERAL': (
+        "שלום",
+        "מה המצב",
+        "תסביר לי איך",
+        "עזרה",
+        "מה אתה יכול לעשות",
+        "תודה רבה",
+    ),
+}
+
+
+def _trigrams(text: str) -> Counter:
+    """Character trigram counts of a normalized, space-padded message."""
+    padded = f" {text} "
+    return Counter(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def _unit(vector: Counter) -> Dict[str, float]:
+    """L2-normalize a sparse vector."""
+    norm = sqrt(sum(v * v for v in vector.values())) or 1.0
+    return {k: v / norm for k, v in vector.items()}
+
+
+def _build_centroids() -> Dict[str, Dict[str, float]]:
+    """Average the unit vectors of each intent's examples."""
+    centroids = {}
+    for intent, examples in INTENT_EXAMPLES.items():
+        total = Counter()
+        for example in examples:
+            for gram, weight in _unit(_trigrams(normalize_message(example))).items():
+                total[gram] += weight
+        centroids[intent] = _unit(total)
+    return centroids
+
+
+_CENTROIDS = _build_centroids()
+
+
+def classify_local(normalized: str) -> Optional[str]:
+    """
+    Classify a normalized message without calling the LLM.
+
+    Args:
+        normalized: Output of normalize_message()
+
+    Returns:
+        Read-only intent string when confident, otherwise None
+    """
+    if not normalized:
+        return None
+
+    vector = _unit(_trigrams(normalized))
+    scores = sorted(
+        (
+            (sum(weight * centroid.get(gram, 0.0) for gram, weight in vector.items()), intent)
+            for intent, centroid in _CENTROIDS.items()
+        ),
+        reverse=True
+    )
+
+    (best, intent), (runner_up, _) = scores[0], scores[1]
+    if intent in WRITE_INTENTS:
+        return None
+    if best >= MIN_CONFIDENCE and best - runner_up >= MIN_MARGIN:
+        return intent
+    return None
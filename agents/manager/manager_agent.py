@@ -1,26 +1,62 @@
 """
 Manager Agent - Routes incoming messages to appropriate crews.
 """
+import re
+from typing import Optional
+
 from crewai import Agent
 from config.llm_config import get_gpt4o
 
+# Normalized messages are truncated to this length before classification/caching
+MAX_NORMALIZED_LENGTH = 120
 
-def create_manager_agent():
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Ordered keyword table, first match wins. ADD_* rows only match explicit
+# opening phrases: words like "מחפש" or "להשכרה" also appear in searches, and a
+# misrouted read would insert a row, so anything less certain goes to the LLM.
+_INTENT_RULES = tuple((intent, re.compile(pattern)) for intent, pattern in (
+    ('GENERAL', r'^(?:שלום|היי|הי|עזרה|מה המצב|מה קורה|בוקר טוב|ערב טוב|תודה(?: רבה)?'
+                r'|כן|לא|אוקי|ok|בסדר|טוב|יאללה)$'),
+    ('FIND_MATCHES', r'^(?:מה מתאים ל|יש התאמות|תמצא משהו ל|תמצא לקוחות|למי זה מתאים|מי מתאים ל)'
+                     r'|\bהתאמות\b'),
+    ('QUERY_CLIENT', r'^(?:מי מחפש|תראה לי את הלקוח)'),
+    ('QUERY_PROPERTY', r'^(?:תראה לי (?:את )?(?:הדירה|הנכס|נכס|נכסים)|הנכס ברחוב|יש לך|מה יש ב)'),
+    ('ADD_CLIENT', r'^(?:לקוח חדש|יש לי לקוח|רוצה להוסיף לקוח)'),
+    ('ADD_PROPERTY', r'^(?:נכס חדש|יש לי נכס|רוצה להוסיף נכס)'),
+))
+
+
+def normalize_message(message: str) -> str:
     """
-    Create the Manager Agent responsible for intent classification.
+    Normalize a message for intent rules and caching.
 
-    This agent analyzes Hebrew messages and classifies them into:
-    - ADD_PROPERTY: User wants to add a new property
-    - ADD_CLIENT: User wants to register a new client
-    - QUERY_PROPERTY: User wants to search/view properties
-    - QUERY_CLIENT: User wants to search/view clients
-    - FIND_MATCHES: User wants to find matches
-    - GENERAL: General question or greeting
+    Lowercases, strips punctuation, collapses whitespace and truncates.
     """
-    return Agent(
-        role="מנהל ראשי",
-        goal="לזהות את כוונת המשתמש בהודעה בעברית ולנתב אותה לצוות המתאים",
-        backstory="""אתה המנהל הראשי של מערכת נדל"ן חכמה בעברית.
+    text = _PUNCTUATION_RE.sub(' ', message.lower())
+    text = _WHITESPACE_RE.sub(' ', text).strip()
+    return text[:MAX_NORMALIZED_LENGTH]
+
+
+def match_intent_rules(normalized: str) -> Optional[str]:
+    """
+    Rule-based fast path for obvious intents.
+
+    Args:
+        normalized: Output of normalize_message()
+
+    Returns:
+        Intent string, or None when the LLM should decide
+    """
+    for intent, pattern in _INTENT_RULES:
+        if pattern.search(normalized):
+            return intent
+
+    return None
+
+
+_MANAGER_BACKSTORY = """אתה המנהל הראשי של מערכת נדל"ן חכמה בעברית.
 
 תפקידך לקרוא הודעות מסוכני נדל"ן ולזהות את הכוונה:
 
@@ -60,8 +96,26 @@ def create_manager_agent():
 - "עזרה"
 
 חשוב: תחזיר רק את סוג הכוונה בלבד (ADD_PROPERTY, ADD_CLIENT, וכו'),
-ללא הסבר נוסף.""",
-        llm=get_gpt4o(),
+ללא הסבר נוסף."""
+
+
+def create_manager_agent():
+    """
+    Create the Manager Agent responsible for intent classification.
+
+    This agent analyzes Hebrew messages and classifies them into:
+    - ADD_PROPERTY: User wants to add a new property
+    - ADD_CLIENT: User wants to register a new client
+    - QUERY_PROPERTY: User wants to search/view properties
+    - QUERY_CLIENT: User wants to search/view clients
+    - FIND_MATCHES: User wants to find matches
+    - GENERAL: General question or greeting
+    """
+    return Agent(
+        role="מנהל ראשי",
+        goal="לזהות את כוונת המשתמש בהודעה בעברית ולנתב אותה לצוות המתאים",
+        backstory=_MANAGER_BACKSTORY,
+        llm=get_gpt4o(prompt_cache_key="manager_v1"),
         verbose=True,
         allow_delegation=False
     )
@@ -1,24 +1,13 @@
 """
 Property Database Agent - Handles property database operations.
 """
+from functools import cache
 from crewai import Agent
 from config.llm_config import get_gpt4o
 from tools.database_tool import PropertySaveTool, PropertyQueryTool, PropertyUpdateTool, PropertyGetByIdTool
 
 
-def create_property_db_agent():
-    """
-    Create Property Database Agent for CRUD operations.
-
-    This agent uses database tools to:
-    - Save new properties
-    - Query existing properties
-    - Update property status/details
-    """
-    return Agent(
-        role="מנהל מאגר נכסים",
-        goal="לשמור ולחפש נכסים במאגר הנתונים בצורה מדויקת",
-        backstory="""אתה מנהל מאגר הנכסים.
+_PROPERTY_DB_BACKSTORY = """אתה מנהל מאגר הנכסים.
 
 תפקידך:
 1. **שמירת נכסים**: קבלת פרטי נכס JSON ושמירה במאגר
@@ -32,9 +21,30 @@ def create_property_db_agent():
 
 כשאתה מחפש או שולף נכסים, תחזיר את **כל הפרטים** כולל תיאור.
 
-תמיד תבצע את הפעולה המתבקשת ותדווח על התוצאה בעברית.""",
-        llm=get_gpt4o(),
-        tools=[PropertySaveTool(), PropertyQueryTool(), PropertyUpdateTool(), PropertyGetByIdTool()],
+תמיד תבצע את הפעולה המתבקשת ותדווח על התוצאה בעברית."""
+
+
+@cache
+def _property_db_tools():
+    """Property database tools, instantiated once per process."""
+    return (PropertySaveTool(), PropertyQueryTool(), PropertyUpdateTool(), PropertyGetByIdTool())
+
+
+def create_property_db_agent():
+    """
+    Create Property Database Agent for CRUD operations.
+
+    This agent uses database tools to:
+    - Save new properties
+    - Query existing properties
+    - Update property status/details
+    """
+    return Agent(
+        role="מנהל מאגר נכסים",
+        goal="לשמור ולחפש נכסים במאגר הנתונים בצורה מדויקת",
+        backstory=_PROPERTY_DB_BACKSTORY,
+        llm=get_gpt4o(prompt_cache_key="property_db_v1"),
+        tools=list(_property_db_tools()),
         verbose=True,
         allow_delegation=False
     )
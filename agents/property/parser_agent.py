@@ -5,19 +5,7 @@ from crewai import Agent
 from config.llm_config import get_gpt4o
 
 
-def create_property_parser_agent():
-    """
-    Create Property Parser Agent for extracting property details from Hebrew text.
-
-    This agent understands:
-    - Hebrew abbreviations (חד׳, מ״ר, ת״א, ק״ג)
-    - Number formats (2 מיליון, 3.5 חדרים, 5000 שקל)
-    - Real estate slang (משופצת, ממוזגת, דקה מהים)
-    """
-    return Agent(
-        role="מפרסר נכסים",
-        goal="לחלץ פרטי נכס מדויקים מטקסט עברית חופשי",
-        backstory="""אתה מומחה להבנת תיאורי נכסים בעברית.
+_PROPERTY_PARSER_BACKSTORY = """אתה מומחה להבנת תיאורי נכסים בעברית.
 
 אתה מבין:
 - **קיצורים**: חד׳ = חדרים, מ״ר = מטר רבוע, ת״א = תל אביב, ק״ג = קומה גבוהה
@@ -90,8 +78,23 @@ def create_property_parser_agent():
 
 אם חסר מידע קריטי (עיר או מחיר), ציין מפורשות מה חסר.
 
-תחזיר תמיד JSON תקני בלבד, ללא טקסט נוסף.""",
-        llm=get_gpt4o(),
+תחזיר תמיד JSON תקני בלבד, ללא טקסט נוסף."""
+
+
+def create_property_parser_agent():
+    """
+    Create Property Parser Agent for extracting property details from Hebrew text.
+
+    This agent understands:
+    - Hebrew abbreviations (חד׳, מ״ר, ת״א, ק״ג)
+    - Number formats (2 מיליון, 3.5 חדרים, 5000 שקל)
+    - Real estate slang (משופצת, ממוזגת, דקה מהים)
+    """
+    return Agent(
+        role="מפרסר נכסים",
+        goal="לחלץ פרטי נכס מדויקים מטקסט עברית חופשי",
+        backstory=_PROPERTY_PARSER_BACKSTORY,
+        llm=get_gpt4o(prompt_cache_key="property_parser_v1"),
         verbose=True,
         allow_delegation=False
     )
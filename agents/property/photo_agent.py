@@ -1,24 +1,13 @@
 """
 Property Photo Agent - Handles property photos from WhatsApp.
 """
+from functools import cache
 from crewai import Agent
 from config.llm_config import get_gpt4o
 from tools.media_tool import TwilioMediaDownloader, GetPropertyPhotosTool, BatchMediaDownloader
 
 
-def create_property_photo_agent():
-    """
-    Create Property Photo Agent for handling media.
-
-    This agent:
-    - Downloads photos from Twilio WhatsApp
-    - Associates photos with properties
-    - Retrieves property photos
-    """
-    return Agent(
-        role="מנהל תמונות נכסים",
-        goal="להוריד תמונות מ-WhatsApp ולקשר אותן לנכסים במאגר",
-        backstory="""אתה מנהל תמונות הנכסים.
+_PROPERTY_PHOTO_BACKSTORY = """אתה מנהל תמונות הנכסים.
 
 תפקידך:
 1. **הורדת תמונות**: קבלת URLs מ-Twilio והורדה לשרת
@@ -31,9 +20,30 @@ def create_property_photo_agent():
 
 אם אין תמונות (רשימה ריקה), פשוט תדווח "לא נשלחו תמונות".
 
-תמיד תדווח כמה תמונות הורדו בהצלחה.""",
-        llm=get_gpt4o(),
-        tools=[TwilioMediaDownloader(), GetPropertyPhotosTool(), BatchMediaDownloader()],
+תמיד תדווח כמה תמונות הורדו בהצלחה."""
+
+
+@cache
+def _property_photo_tools():
+    """Media tools; they share the pooled HTTP session, so one set is enough."""
+    return (TwilioMediaDownloader(), GetPropertyPhotosTool(), BatchMediaDownloader())
+
+
+def create_property_photo_agent():
+    """
+    Create Property Photo Agent for handling media.
+
+    This agent:
+    - Downloads photos from Twilio WhatsApp
+    - Associates photos with properties
+    - Retrieves property photos
+    """
+    return Agent(
+        role="מנהל תמונות נכסים",
+        goal="להוריד תמונות מ-WhatsApp ולקשר אותן לנכסים במאגר",
+        backstory=_PROPERTY_PHOTO_BACKSTORY,
+        llm=get_gpt4o(prompt_cache_key="property_photo_v1"),
+        tools=list(_property_photo_tools()),
         verbose=True,
         allow_delegation=False
     )
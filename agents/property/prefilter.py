@@ -0,0 +1,109 @@
+"""
+Deterministic pre-extraction for Hebrew real estate messages.
+
+Pulls the fields a regex can read reliably (phones, prices in millions,
+room ranges, size, city abbreviations) so the parser task can be handed
+them as facts instead of re-deriving them.
+"""
+import json
+import re
+
+# Israeli mobile / landline numbers: 054-1234567, 0541234567, 03 1234567
+PHONE_RE = re.compile(r"(?<!\d)0(?:5\d|[23489])[- ]?\d{7}(?!\d)")
+
+# "2 מיליון", "3.5 מיליון", "4 מיל׳"
+PRICE_MILLION_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(?:מיליון|מיל['׳])")
+
+# "2-3 חדרים", "4 - 5 חד׳"
+ROOM_RANGE_RE = re.compile(r"(\d+(?:\.\d+)?)\s*-\s*(\d+(?:\.\d+)?)\s*חד")
+
+# "3 חדרים", "3.5 חד׳" (single value, checked after the range pattern)
+ROOMS_RE = re.compile(r"(?<![\d.\-])(\d+(?:\.\d+)?)\s*חד")
+
+# "150 מ״ר", "80 מ\"ר", "90 מטר"
+SIZE_RE = re.compile(r"(\d+)\s*(?:מ[\"״]ר|מטר)")
+
+CITY_ABBREVIATIONS = {
+    "ת״א": "תל אביב",
+    'ת"א': "תל אביב",
+    "ר״ג": "רמת גן",
+    'ר"ג': "רמת גן",
+    "פ״ת": "פתח תקווה",
+    'פ"ת': "פתח תקווה",
+    "ראשל״צ": "ראשון לציון",
+    'ראשל"צ': "ראשון לציון",
+    "ב״ש": "באר שבע",
+    'ב"ש': "באר שבע",
+    "י-ם": "ירושלים",
+}
+
+KNOWN_CITIES = (
+    "תל אביב", "ירושלים", "חיפה", "רמת גן", "גבעתיים", "הרצליה", "רעננה",
+    "כפר סבא", "פתח תקווה", "ראשון לציון", "חולון", "בת ים", "נתניה",
+    "באר שבע", "רחובות", "הוד השרון", "מודיעין", "אשדוד", "אשקלון",
+)
+
+
+def _number(value: str):
+    """Return int when the value is whole, float otherwise."""
+    number = float(value)
+    return int(number) if number.is_integer() else number
+
+
+def extract_fields(text: str) -> dict:
+    """
+    Extract deterministic fields from a free-text Hebrew message.
+
+    Args:
+        text: Raw message body
+
+    Returns:
+        Dict with any of: phone, price, min_rooms, max_rooms, rooms, size, city
+    """
+    fields = {}
+
+    phone = PHONE_RE.search(text)
+    if phone:
+        fields["phone"] = phone.group(0)
+
+    price = PRICE_MILLION_RE.search(text)
+    if price:
+        fields["price"] = int(float(price.group(1)) * 1_000_000)
+
+    room_range = ROOM_RANGE_RE.search(text)
+    if room_range:
+        fields["min_rooms"] = _number(room_range.group(1))
+        fields["max_rooms"] = _number(room_range.group(2))
+    else:
+        rooms = ROOMS_RE.search(text)
+        if rooms:
+            fields["rooms"] = _number(rooms.group(1))
+
+    size = SIZE_RE.search(text)
+    if size:
+        fields["size"] = int(size.group(1))
+
+    for abbreviation, city in CITY_ABBREVIATIONS.items():
+        if abbreviation in text:
+            fields["city"] = city
+            break
+    else:
+        for city in KNOWN_CITIES:
+            if city in text:
+                fields["city"] = city
+                break
+
+    return fields
+
+
+def format_hint(text: str) -> str:
+    """
+    Build the "already extracted" line for a parser task description.
+
+    Returns:
+        Hebrew hint line, or empty string when nothing was extracted
+    """
+    fields = extract_fields(text)
+    if not fields:
+        return ""
+    return f"\n\nמידע שכבר חולץ: {json.dumps(fields, ensure_ascii=False)}"
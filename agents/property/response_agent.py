@@ -5,16 +5,7 @@ from crewai import Agent
 from config.llm_config import get_creative_gpt4o
 
 
-def create_property_response_agent():
-    """
-    Create Property Response Agent for generating natural Hebrew responses.
-
-    This agent writes friendly, conversational responses about properties.
-    """
-    return Agent(
-        role="כותב תגובות נכסים",
-        goal="לכתוב תשובות ידידותיות וברורות בעברית על נכסים",
-        backstory="""אתה כותב תשובות לסוכני נדל"ן בעברית טבעית וידידותית.
+_PROPERTY_RESPONSE_BACKSTORY = """אתה כותב תשובות לסוכני נדל"ן בעברית טבעית וידידותית.
 
 **סגנון הכתיבה שלך:**
 - שפה יומיומית וחמה, כמו חבר
@@ -59,8 +50,20 @@ def create_property_response_agent():
 - אם משהו לא עובד, תסביר בפשטות מה קרה
 - מקסימום 1500 תווים להודעה (WhatsApp limit)
 
-תכתוב בעברית בלבד, ללא אנגלית.""",
-        llm=get_creative_gpt4o(),  # Higher temperature for natural language
+תכתוב בעברית בלבד, ללא אנגלית."""
+
+
+def create_property_response_agent():
+    """
+    Create Property Response Agent for generating natural Hebrew responses.
+
+    This agent writes friendly, conversational responses about properties.
+    """
+    return Agent(
+        role="כותב תגובות נכסים",
+        goal="לכתוב תשובות ידידותיות וברורות בעברית על נכסים",
+        backstory=_PROPERTY_RESPONSE_BACKSTORY,
+        llm=get_creative_gpt4o(prompt_cache_key="property_response_v1"),  # Higher temperature for natural language
         verbose=True,
         allow_delegation=False
     )
@@ -0,0 +1,116 @@
+"""
+Fixed-format property responses rendered without the response agent.
+
+The layout follows the "new property" block in the property response
+agent's backstory. Helpers here read the structured bits out of earlier
+task outputs; any helper returns None when it is not sure, and callers
+fall back to the LLM response agent.
+"""
+import json
+import re
+from typing import Optional
+
+PROPERTY_SAVED = """מעולה! 🏠 שמרתי את הנכס:
+
+📍 {address}
+🛏️ {rooms_line}
+💰 ₪{price:,}{photos_line}
+
+מספר נכס: #{property_id}{matches_line}"""
+
+PHOTOS_LINE = "\n📸 {count} תמונות נשמרו"
+MATCHES_LINE = "\n\nמצאתי {count} לקוחות שמתאימים! רוצה לראות?"
+
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.S)
+_PROPERTY_ID_RE = re.compile(r"(?:מספר נכס:?\s*#?|נכס\s*#)(\d+)")
+_PHOTOS_DOWNLOADED_RE = re.compile(r"הורדו\s+(\d+)\s+מתוך")
+_CLIENTS_FOUND_RE = re.compile(r"נמצאו\s+(\d+)\s+לקוחות")
+_NO_MATCHES_RE = re.compile(r"לא נמצאו")
+
+
+def parse_json_output(raw: str) -> Optional[dict]:
+    """Extract the JSON object from a parser task output (tolerates code fences)."""
+    match = _JSON_OBJECT_RE.search(raw or "")
+    if not match:
+        return None
+    try:
+        data = json.loads(match.group(0))
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def extract_property_id(raw: str) -> Optional[int]:
+    """Read the saved property ID from the save task output."""
+    match = _PROPERTY_ID_RE.search(raw or "")
+    return int(match.group(1)) if match else None
+
+
+def extract_photo_count(raw: str, sent: int) -> Optional[int]:
+    """Number of photos stored, or None if the photo task output is unclear."""
+    if sent == 0:
+        return 0
+    match = _PHOTOS_DOWNLOADED_RE.search(raw or "")
+    return int(match.group(1)) if match else None
+
+
+def extract_match_count(raw: str) -> Optional[int]:
+    """Number of matching clients found, or None if the match output is unclear."""
+    match = _CLIENTS_FOUND_RE.search(raw or "")
+    if match:
+        return int(match.group(1))
+    if _NO_MATCHES_RE.search(raw or ""):
+        return 0
+    return None
+
+
+def _format_number(value) -> str:
+    """3.0 -> '3', 3.5 -> '3.5'."""
+    number = float(value)
+    return str(int(number)) if number.is_integer() else str(number)
+
+
+def render_property_saved(
+    parsed: dict,
+    property_id: int,
+    photo_count: int,
+    match_count: int
+) -> Optional[str]:
+    """
+    Render the "property saved" confirmation.
+
+    Args:
+        parsed: Parser task JSON (city, street, street_number, rooms, size, price)
+        property_id: ID returned by the save step
+        photo_count: Photos stored for the property
+        match_count: Matching clients found
+
+    Returns:
+        Hebrew message, or None if required fields are missing
+    """
+    try:
+        city = parsed["city"]
+        price = int(parsed["price"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    street = " ".join(str(part) for part in (parsed.get("street"), parsed.get("street_number")) if part)
+    address = f"{street}, {city}" if street else city
+
+    rooms = parsed.get("rooms")
+    size = parsed.get("size")
+    try:
+        rooms_line = f"{_format_number(rooms)} חדרים" if rooms else parsed.get("property_type", "נכס")
+        if size:
+            rooms_line += f" | 📐 {_format_number(size)} מ״ר"
+    except (TypeError, ValueError):
+        return None
+
+    return PROPERTY_SAVED.format(
+        address=address,
+        rooms_line=rooms_line,
+        price=price,
+        photos_line=PHOTOS_LINE.format(count=photo_count) if photo_count else "",
+        property_id=property_id,
+        matches_line=MATCHES_LINE.format(count=match_count) if match_count else "",
+    )
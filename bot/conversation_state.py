@@ -1,77 +1,177 @@
 """
 Conversation state management.
 Tracks message history for each user.
+
+Writes are queued and flushed in batches by a background thread so the
+webhook path never waits on a database commit. Reads only wait for the
+rows queued for the same phone number, and pending rows are flushed at
+interpreter exit.
 """
 from database.models import Conversation
-from database.connection import get_session
-from datetime import datetime
+from database.connection import get_session, session_scope
+from sqlalchemy.orm import Session
+from typing import Optional
+import atexit
 import logging
+import queue
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
+# Batched writer configuration
+_BATCH_SIZE = 100           # Max rows per commit
+_FLUSH_INTERVAL = 0.2       # Max seconds a message waits before being flushed
+_EXIT_DRAIN_TIMEOUT = 5.0   # Max seconds to wait for pending rows at shutdown
+
+_write_queue = queue.Queue()
+
+# Rows queued but not yet written, per phone number
+_pending = {}
+_pending_changed = threading.Condition()
+
+
+def _drain_batch():
+    """Block for the first pending row, then collect more until size or time limit."""
+    batch = [_write_queue.get()]
+    deadline = time.monotonic() + _FLUSH_INTERVAL
+
+    while len(batch) < _BATCH_SIZE:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(_write_queue.get(timeout=remaining))
+        except queue.Empty:
+            break
+
+    return batch
+
+
+def _writer_loop():
+    """Background thread: flush queued conversation rows with one commit per batch."""
+    while True:
+        batch = _drain_batch()
+        try:
+            # timestamp is filled in by the database (server default) at insert
+            with get_session() as session:
+                session.bulk_insert_mappings(Conversation, batch)
+
+            logger.debug(f"Flushed {len(batch)} conversation messages")
+
+        except Exception as e:
+            logger.error(f"Error saving conversation batch ({len(batch)} messages): {e}", exc_info=True)
+
+        finally:
+            with _pending_changed:
+                for row in batch:
+                    phone_number = row['phone_number']
+                    _pending[phone_number] -= 1
+                    if not _pending[phone_number]:
+                        del _pending[phone_number]
+                _pending_changed.notify_all()
+
+
+def _wait_for_writes(phone_number: Optional[str] = None, timeout: Optional[float] = None) -> bool:
+    """Wait until the rows queued for phone_number (or for everyone) are written."""
+    if phone_number is None:
+        done = lambda: not _pending
+    else:
+        done = lambda: phone_number not in _pending
+
+    with _pending_changed:
+        return _pending_changed.wait_for(done, timeout)
+
+
+def _drain_at_exit():
+    """Give the daemon writer a chance to flush what is still queued."""
+    if not _wait_for_writes(timeout=_EXIT_DRAIN_TIMEOUT):
+        logger.warning(f"Exiting with {sum(_pending.values())} conversation messages unsaved")
+
+
+_writer_thread = threading.Thread(target=_writer_loop, name='conversation-writer', daemon=True)
+_writer_thread.start()
+atexit.register(_drain_at_exit)
+
 
 class ConversationStateManager:
     """Manages conversation history in database."""
 
     def add_message(self, phone_number: str, role: str, content: str):
         """
-        Store a message in conversation history.
+        Queue a message for storage in conversation history.
+
+        Non-blocking: the row is written by the background writer thread.
 
         Args:
             phone_number: User's phone number
             role: 'user' or 'assistant'
             content: Message content
         """
-        try:
-            with get_session() as session:
-                conversation = Conversation(
-                    phone_number=phone_number,
-                    role=role,
-                    content=content,
-                    timestamp=datetime.utcnow()
-                )
-                session.add(conversation)
+        with _pending_changed:
+            _pending[phone_number] = _pending.get(phone_number, 0) + 1
 
-            logger.info(f"Saved message from {phone_number} (role: {role})")
+        _write_queue.put({
+            'phone_number': phone_number,
+            'role': role,
+            'content': content
+        })
 
-        except Exception as e:
-            logger.error(f"Error saving conversation: {e}", exc_info=True)
+        logger.info(f"Queued message from {phone_number} (role: {role})")
+
+    def flush(self, phone_number: Optional[str] = None):
+        """
+        Block until queued messages have been written.
 
-    def get_recent_history(self, phone_number: str, limit: int = 10):
+        Args:
+            phone_number: Only wait for this user's messages (defaults to all users)
+        """
+        _wait_for_writes(phone_number)
+
+    def get_recent_history(self, phone_number: str, limit: int = 10, session: Optional[Session] = None):
         """
         Retrieve recent conversation history for a user.
 
         Args:
             phone_number: User's phone number
             limit: Maximum number of messages to retrieve
+            session: Optional session to reuse (defaults to the current scope)
 
         Returns:
-            List of Conversation objects (oldest first)
+            List of rows with role, content and timestamp (oldest first)
         """
         try:
-            with get_session() as session:
+            # Make sure messages queued by this process are visible
+            self.flush(phone_number)
+
+            with session_scope(session) as session:
                 messages = session.query(Conversation)\
-                    .filter_by(phone_number=phone_number)\
-                    .order_by(Conversation.timestamp.desc())\
+                    .with_entities(Conversation.role, Conversation.content, Conversation.timestamp)\
+                    .filter(Conversation.phone_number == phone_number)\
+                    .order_by(Conversation.timestamp.desc(), Conversation.id.desc())\
                     .limit(limit)\
                     .all()
 
                 # Reverse to get oldest first
-                return list(reversed(messages))
+                return messages[::-1]
 
         except Exception as e:
             logger.error(f"Error retrieving history: {e}", exc_info=True)
             return []
 
-    def clear_history(self, phone_number: str):
+    def clear_history(self, phone_number: str, session: Optional[Session] = None):
         """
         Clear conversation history for a user.
 
         Args:
             phone_number: User's phone number
+            session: Optional session to reuse (defaults to the current scope)
         """
         try:
-            with get_session() as session:
+            # Pending writes would otherwise land after the delete
+            self.flush(phone_number)
+
+            with session_scope(session) as session:
                 session.query(Conversation)\
                     .filter_by(phone_number=phone_number)\
                     .delete()
@@ -81,18 +181,21 @@ class ConversationStateManager:
         except Exception as e:
             logger.error(f"Error clearing history: {e}", exc_info=True)
 
-    def get_conversation_count(self, phone_number: str) -> int:
+    def get_conversation_count(self, phone_number: str, session: Optional[Session] = None) -> int:
         """
         Get total number of messages for a user.
 
         Args:
             phone_number: User's phone number
+            session: Optional session to reuse (defaults to the current scope)
 
         Returns:
             Message count
         """
         try:
-            with get_session() as session:
+            self.flush(phone_number)
+
+            with session_scope(session) as session:
                 count = session.query(Conversation)\
                     .filter_by(phone_number=phone_number)\
                     .count()
@@ -1,20 +1,50 @@
 """
 Flask webhook handler for Twilio WhatsApp messages.
 Async version - processes messages in background to avoid Twilio timeout.
+
+Background processing runs as coroutines on one shared event loop; blocking
+CrewAI and Twilio calls are handed to the loop's bounded executor. When too
+many messages are in flight the webhook answers 503 instead of queueing more.
 """
 from flask import Flask, request, jsonify
 from twilio.rest import Client
+from twilio.http.http_client import TwilioHttpClient
 from crews.orchestrator import CrewAIOrchestrator
 from bot.conversation_state import ConversationStateManager
+from tools.media_tool import prefetch_media, discard_prefetched
 from config import settings
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import QueueHandler, QueueListener
+import asyncio
+import atexit
 import logging
+import queue
 import threading
 
-# Configure logging
-logging.basicConfig(
-    level=getattr(logging, settings.LOG_LEVEL),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Configure logging: records are queued on the calling thread and written
+# to the real handlers (stderr by default) by a background listener
+root_logger = logging.getLogger()
+root_logger.setLevel(getattr(logging, settings.LOG_LEVEL))
+
+if not any(isinstance(h, QueueHandler) for h in root_logger.handlers):
+    output_handlers = root_logger.handlers[:]
+    if not output_handlers:
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        ))
+        output_handlers = [stream_handler]
+
+    for handler in output_handlers:
+        root_logger.removeHandler(handler)
+
+    log_queue = queue.Queue(-1)
+    root_logger.addHandler(QueueHandler(log_queue))
+    log_listener = QueueListener(log_queue, *output_handlers, respect_handler_level=True)
+    log_listener.start()
+    atexit.register(log_listener.stop)
+
 logger = logging.getLogger(__name__)
 
 # Initialize Flask app
@@ -28,7 +58,55 @@ state_manager = ConversationStateManager()
 logger.info("Initialization complete")
 
 # Initialize Twilio client for sending messages directly
-twilio_client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
+# (pooled HTTP client: chunks and replies reuse one keep-alive connection)
+twilio_client = Client(
+    settings.TWILIO_ACCOUNT_SID,
+    settings.TWILIO_AUTH_TOKEN,
+    http_client=TwilioHttpClient(pool_connections=True, timeout=30)
+)
+
+# Shared event loop for background message processing
+background_loop = asyncio.new_event_loop()
+background_loop.set_default_executor(
+    ThreadPoolExecutor(max_workers=settings.WORKER_COUNT, thread_name_prefix='wa')
+)
+threading.Thread(
+    target=background_loop.run_forever,
+    name='message-loop',
+    daemon=True
+).start()
+
+# Backpressure: limits messages accepted but not yet fully processed
+pending_slots = threading.BoundedSemaphore(settings.MAX_PENDING_MESSAGES)
+
+# Recently accepted MessageSids, so Twilio retries don't rerun the pipeline
+_SEEN_SIDS_MAX = 10_000
+_seen_sids = OrderedDict()
+_seen_sids_lock = threading.Lock()
+
+
+def mark_message_seen(message_sid: str) -> bool:
+    """
+    Record a MessageSid.
+
+    Returns:
+        True if the SID is new, False if it was already seen
+    """
+    with _seen_sids_lock:
+        if message_sid in _seen_sids:
+            _seen_sids.move_to_end(message_sid)
+            return False
+
+        _seen_sids[message_sid] = None
+        if len(_seen_sids) > _SEEN_SIDS_MAX:
+            _seen_sids.popitem(last=False)
+        return True
+
+
+def forget_message(message_sid: str):
+    """Drop a SID so a retry of a rejected message is processed."""
+    with _seen_sids_lock:
+        _seen_sids.pop(message_sid, None)
 
 
 def send_whatsapp_message(to_number: str, message: str):
@@ -48,7 +126,7 @@ def send_whatsapp_message(to_number: str, message: str):
         else:
             chunks = [message]
 
-        # Send each chunk
+        # Send each chunk in order (concurrent sends could arrive shuffled)
         for chunk in chunks:
             twilio_client.messages.create(
                 from_=settings.TWILIO_WHATSAPP_NUMBER,
@@ -64,15 +142,22 @@ def send_whatsapp_message(to_number: str, message: str):
         return False
 
 
-def process_message_async(message: str, from_number: str, media_urls: list):
+async def process_message_async(message: str, from_number: str, media_urls: list):
     """
-    Process message in background thread and send response via Twilio API.
+    Process message on the background loop and send response via Twilio API.
     """
+    loop = asyncio.get_running_loop()
+
     try:
         logger.info(f"[ASYNC] Starting processing for {from_number}")
 
+        # Photo downloads don't depend on the intent, so start them in the
+        # background while the manager agent classifies the message
+        if media_urls:
+            prefetch_media(media_urls)
+
         # Process through CrewAI orchestrator
-        response_text = orchestrator.process_message(
+        response_text = await orchestrator.process_message_async(
             message=message,
             phone_number=from_number,
             media_urls=media_urls
@@ -80,11 +165,13 @@ def process_message_async(message: str, from_number: str, media_urls: list):
 
         logger.info(f"[ASYNC] Generated response: {response_text[:100]}...")
 
-        # Save bot response to conversation history
+        # Send response via Twilio API as soon as it exists; history can wait
+        send = loop.run_in_executor(None, send_whatsapp_message, from_number, response_text)
+
+        # Save bot response to conversation history while the send is in flight
         state_manager.add_message(from_number, 'assistant', response_text)
 
-        # Send response via Twilio API
-        success = send_whatsapp_message(from_number, response_text)
+        success = await send
 
         if success:
             logger.info(f"[ASYNC] Successfully sent response to {from_number}")
@@ -96,7 +183,12 @@ def process_message_async(message: str, from_number: str, media_urls: list):
 
         # Send error message to user
         error_msg = "מצטער, נתקלתי בבעיה טכנית. נסה שוב בעוד רגע."
-        send_whatsapp_message(from_number, error_msg)
+        await loop.run_in_executor(None, send_whatsapp_message, from_number, error_msg)
+
+    finally:
+        # Free any photos that were prefetched but not used by a property crew
+        if media_urls:
+            discard_prefetched(media_urls)
 
 
 @app.route('/webhook', methods=['POST'])
@@ -107,8 +199,20 @@ def whatsapp_webhook():
     """
     try:
         # Extract Twilio parameters
+        message_sid = request.form.get('MessageSid', '')
         from_number = request.form.get('From', '').replace('whatsapp:', '')
         message_body = request.form.get('Body', '')
+
+        # Validate message - must have text content (checked before any other work)
+        if len(message_body.strip().encode('utf-8')) < 2:
+            logger.warning(f"Empty message received from {from_number} (media count: {request.form.get('NumMedia', 0)}), ignoring")
+            return "", 200
+
+        # Twilio retries deliver the same MessageSid again
+        if message_sid and not mark_message_seen(message_sid):
+            logger.info(f"Duplicate webhook for {message_sid}, ignoring")
+            return "", 200
+
         num_media = int(request.form.get('NumMedia', 0))
 
         # Collect media URLs
@@ -121,21 +225,22 @@ def whatsapp_webhook():
         logger.info(f"Received message from {from_number}: {message_body[:50]}...")
         logger.info(f"Media count: {num_media}")
 
-        # Validate message - must have text content
-        if not message_body or message_body.strip() == "":
-            logger.warning(f"Empty message received (media count: {num_media}), ignoring")
-            return "", 200
+        # Shed load when the background workers are saturated
+        if not pending_slots.acquire(blocking=False):
+            logger.warning(f"Too many messages in flight, rejecting message from {from_number}")
+            if message_sid:
+                forget_message(message_sid)
+            return "", 503
 
         # Save incoming message to conversation history
         state_manager.add_message(from_number, 'user', message_body)
 
         # Start background processing
-        thread = threading.Thread(
-            target=process_message_async,
-            args=(message_body, from_number, media_urls)
+        future = asyncio.run_coroutine_threadsafe(
+            process_message_async(message_body, from_number, media_urls),
+            background_loop
         )
-        thread.daemon = True
-        thread.start()
+        future.add_done_callback(lambda _: pending_slots.release())
 
         logger.info(f"Started background processing for {from_number}")
 
@@ -1,33 +1,57 @@
 """
 LLM configuration for CrewAI agents.
 All agents use GPT-4o for best Hebrew language support.
+
+Agents pass a stable prompt_cache_key and keep their backstories as
+constant module-level strings, so OpenAI can serve the repeated system
+prompt prefix from its prompt cache. That gives each agent its own cached
+ChatOpenAI instance, but all of them send requests through one shared HTTP
+client, so there is still a single connection pool.
 """
+from functools import lru_cache
 from langchain_openai import ChatOpenAI
+from openai import DefaultHttpxClient
 from config import settings
 
-def get_gpt4o(temperature=0.3):
+
+@lru_cache(maxsize=1)
+def _http_client():
+    """HTTP client (and connection pool) shared by every ChatOpenAI instance."""
+    return DefaultHttpxClient()
+
+
+@lru_cache(maxsize=16)
+def get_gpt4o(temperature=0.3, prompt_cache_key=None):
     """
-    Get GPT-4o instance for CrewAI agents.
+    Get GPT-4o instance for CrewAI agents (cached per configuration).
 
     Args:
         temperature: Controls randomness (0-1). Lower = more consistent.
                     Default 0.3 for reliable parsing.
+        prompt_cache_key: Optional stable key (e.g. "manager_v1") that routes
+                    requests sharing a prompt prefix to the same cache.
 
     Returns:
         ChatOpenAI instance configured for GPT-4o
     """
+    model_kwargs = {"prompt_cache_key": prompt_cache_key} if prompt_cache_key else {}
+
     return ChatOpenAI(
         model=settings.OPENAI_MODEL,
         temperature=temperature,
-        openai_api_key=settings.OPENAI_API_KEY
+        openai_api_key=settings.OPENAI_API_KEY,
+        model_kwargs=model_kwargs,
+        http_client=_http_client()
     )
 
 
-def get_creative_gpt4o():
+@lru_cache(maxsize=8)
+def get_creative_gpt4o(prompt_cache_key=None):
     """Get GPT-4o with higher temperature for creative responses."""
-    return get_gpt4o(temperature=0.7)
+    return get_gpt4o(temperature=0.7, prompt_cache_key=prompt_cache_key)
 
 
-def get_deterministic_gpt4o():
+@lru_cache(maxsize=8)
+def get_deterministic_gpt4o(prompt_cache_key=None):
     """Get GPT-4o with very low temperature for deterministic outputs."""
-    return get_gpt4o(temperature=0.1)
+    return get_gpt4o(temperature=0.1, prompt_cache_key=prompt_cache_key)
@@ -20,16 +20,32 @@ OPENAI_MODEL = 'gpt-4o'  # Using GPT-4o for best Hebrew support
 
 # Database Configuration
 DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///storage/database.db')
+# Server-side prepared statements (psycopg); disable behind a transaction-mode
+# pooler such as Supabase's port 6543, which cannot keep them across transactions
+DB_PREPARED_STATEMENTS = os.getenv('DB_PREPARED_STATEMENTS', 'True').lower() == 'true'
 
 # Supabase Configuration
 SUPABASE_URL = os.getenv('SUPABASE_URL')
 SUPABASE_KEY = os.getenv('SUPABASE_KEY')
 SUPABASE_STORAGE_BUCKET = os.getenv('SUPABASE_STORAGE_BUCKET', 'property-photos')
+# Read analytics from the materialized views in database/analytics_views.sql (PostgreSQL only)
+ANALYTICS_USE_MATVIEWS = os.getenv('ANALYTICS_USE_MATVIEWS', 'False').lower() == 'true'
 
 # Flask Configuration
 FLASK_ENV = os.getenv('FLASK_ENV', 'development')
 FLASK_SECRET_KEY = os.getenv('FLASK_SECRET_KEY', 'dev-secret-key-change-in-production')
 FLASK_DEBUG = os.getenv('FLASK_DEBUG', 'True').lower() == 'true'
+# Seed Hebrew test data at startup (development only unless set explicitly)
+SEED_ON_STARTUP = os.getenv('SEED_ON_STARTUP', str(FLASK_ENV == 'development')).lower() == 'true'
+
+# Background Processing Configuration
+WORKER_COUNT = int(os.getenv('WORKERS', '16'))  # Threads for blocking CrewAI/Twilio calls
+MAX_PENDING_MESSAGES = int(os.getenv('MAX_PENDING_MESSAGES', '64'))  # In-flight messages before 503
+MAX_CONCURRENT_LLM = int(os.getenv('MAX_CONCURRENT_LLM', '8'))  # Messages in LLM-bound stages at once
+QUERY_CACHE_TTL = int(os.getenv('QUERY_CACHE_TTL', '60'))  # Seconds a repeated search reuses its answer (per worker process; 0 disables)
+ANALYTICS_CACHE_TTL = int(os.getenv('ANALYTICS_CACHE_TTL', '30'))  # Seconds analytics results are reused in-process
+
+CREW_VERBOSE = os.getenv('CREW_VERBOSE', 'False').lower() == 'true'  # Per-step CrewAI logging (slow; debug only)
 
 # ngrok Configuration
 NGROK_AUTH_TOKEN = os.getenv('NGROK_AUTH_TOKEN')
@@ -1,31 +1,144 @@
 """
 Client Crew - Manages client-related workflows.
 
-Sequential workflow:
-1. Parser Agent: Extract client requirements from Hebrew text
-2. DB Agent: Save client to database
-3. Matcher Agent: Find matching properties
-4. Response Agent: Generate friendly confirmation with matches
+Add-client workflow:
+1. Intake Agent: Extract client requirements from Hebrew text and save
+   the client, in a single task
+2. Matching properties are scored locally for the saved client (the
+   Matcher Agent is only used if the client ID can't be read back)
+3. Response Agent: Generate friendly confirmation with matches
 """
 from crewai import Crew, Task, Process
+from agents.client.intake_agent import create_client_intake_agent
 from agents.client.parser_agent import create_client_parser_agent
 from agents.client.db_agent import create_client_db_agent
 from agents.client.matcher_agent import create_client_matcher_agent
 from agents.client.response_agent import create_client_response_agent
+from agents.property.prefilter import format_hint
+from agents.property.response_templates import parse_json_output
+from tools.matching_tool import PropertyMatcherTool
+from crews.crew_cache import CrewCache
+from config import settings
+from typing import Optional
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
+_CLIENT_ID_RE = re.compile(r"(?:מספר לקוח:?\s*#?|לקוח\s*#)(\d+)")
+
+
+def _extract_client_id(intake_output: str) -> Optional[int]:
+    """Read the new client ID from the intake task output (JSON field or Hebrew confirmation)."""
+    parsed = parse_json_output(intake_output)
+    if parsed:
+        try:
+            return int(parsed["client_id"])
+        except (KeyError, TypeError, ValueError):
+            pass
+
+    match = _CLIENT_ID_RE.search(intake_output or "")
+    return int(match.group(1)) if match else None
+
+
+# Task description templates, filled by CrewAI from kickoff inputs. The fixed
+# instructions come first and the per-request values last, so consecutive
+# prompts share the longest possible prefix for provider prompt caching.
+_ADD_INTAKE_DESCRIPTION = """נתח את ההודעה שבסוף, חלץ פרטי לקוח ושמור אותו במאגר.
+
+חלץ: name, phone, looking_for, property_type, city, min_rooms, max_rooms, min_price, max_price, min_size, preferred_areas, notes.
+
+אם יש מידע שכבר חולץ, השתמש בו (price הוא תקציב, rooms הוא min_rooms ו-max_rooms, size הוא min_size) והשלם רק את השדות החסרים.
+
+אם אין שם לקוח, כתוב "לקוח חדש".
+
+שמור את הלקוח עם הכלי ClientSaveTool, עם ה-phone_number שבסוף.
+
+החזר JSON בלבד עם כל השדות שחולצו ובנוסף client_id.
+
+phone_number: {phone_number}
+הודעה: "{user_message}"{hint}"""
+
+_ADD_RESPONSE_DESCRIPTION = """צור הודעת תשובה ידידותית בעברית.
+
+דגש את ההתאמות הטובות! זה מה שמעניין.
+
+כתוב בסגנון חם עם אימוג׳ים (📝 🔍 ✨ 🏠).
+
+מקסימום 1500 תווים.
+
+סכם:
+1. את הלקוח שנשמר (שם, דרישות ומספר לקוח): {intake_output}
+2. נכסים מתאימים שנמצאו עם פרטים והסבר ההתאמה:
+{match_output}"""
+
+_ADD_MATCH_DESCRIPTION = """חפש נכסים המתאימים לדרישות הלקוח.
+
+השתמש בכלי PropertyMatcherTool.
+
+החזר את 3-5 ההתאמות הטובות ביותר עם הסברים.
+
+מספר הלקוח מתוך תוצאת השמירה:
+{intake_output}"""
+
+_QUERY_PARSE_DESCRIPTION = """נתח את שאילתת החיפוש שבסוף וחלץ קריטריונים.
+
+חלץ: name, looking_for, city, status.
+
+החזר JSON עם הקריטריונים.
+
+שאילתה: "{query}\""""
+
+_QUERY_SEARCH_DESCRIPTION = """חפש במאגר לקוחות לפי הקריטריונים.
+
+השתמש בכלי ClientQueryTool.
+
+החזר רשימת לקוחות מתאימים."""
+
+_QUERY_RESPONSE_DESCRIPTION = """הצג את תוצאות החיפוש בצורה ברורה.
+
+עבור כל לקוח, הצג: שם, טלפון, דרישות, תאריך רישום.
+
+מקסימום 1500 תווים."""
+
+_MATCHES_PARSE_DESCRIPTION = """נתח את הבקשה להתאמות שבסוף.
+
+זהה: האם מדובר בחיפוש עבור לקוח ספציפי (שם) או סתם בקשה כללית.
+
+חלץ את השם או הקריטריונים הרלוונטיים.
+
+שאילתה: "{query}\""""
+
+_MATCHES_FIND_DESCRIPTION = """מצא את הלקוח או הנכס הרלוונטי במאגר.
+
+השתמש בכלי ClientQueryTool או PropertyQueryTool.
+
+החזר את המזהה שנמצא."""
+
+_MATCHES_MATCH_DESCRIPTION = """מצא את ההתאמות הטובות ביותר.
+
+השתמש בכלי PropertyMatcherTool או ClientMatcherTool בהתאם.
+
+החזר את 5 ההתאמות הטובות ביותר עם הסברים."""
+
+_MATCHES_RESPONSE_DESCRIPTION = """הצג את ההתאמות בצורה ברורה ומעניינת.
+
+דגש את ההתאמות המצוינות.
+
+הסבר למה כל התאמה טובה.
+
+מקסימום 1500 תווים."""
+
 
 class ClientCrew:
     """Crew for handling client operations."""
 
     def __init__(self):
-        """Initialize all agents."""
-        self.parser = create_client_parser_agent()
-        self.db_agent = create_client_db_agent()
-        self.matcher = create_client_matcher_agent()
-        self.response_agent = create_client_response_agent()
+        """Set up the per-thread crew cache."""
+        # Crews are built once per thread and reused with kickoff(inputs=...).
+        # Each builder creates its own agents: CrewAI rebinds an agent's crew
+        # and executor on every run, so agents must not be shared across crews.
+        self._crews = CrewCache()
 
     def add_client(self, user_message: str, phone_number: str):
         """
@@ -40,209 +153,201 @@ class ClientCrew:
         """
         logger.info(f"Starting add_client workflow for: {user_message[:50]}...")
 
-        # Task 1: Parse client requirements
-        parse_task = Task(
-            description=f"""נתח את ההודעה הבאה וחלץ פרטי לקוח:
+        # Stage 1: parse and save in one task
+        crew = self._crews.get('intake', self._build_intake_crew)
+        result = crew.kickoff(inputs={
+            'user_message': user_message,
+            'hint': format_hint(user_message),
+            'phone_number': phone_number,
+        })
+        intake_output = result.raw if hasattr(result, 'raw') else str(result)
+
+        # Stage 2: match properties for the saved client (no LLM needed when the ID is known)
+        client_id = _extract_client_id(intake_output)
+        if client_id is not None:
+            match_output = PropertyMatcherTool()._run(client_id=client_id)
+        else:
+            logger.info("Client ID not found in intake output, using matcher agent")
+            match_output = self._match_saved_client(intake_output)
+
+        # Stage 3: generate response
+        crew = self._crews.get('response', self._build_response_crew)
+        result = crew.kickoff(inputs={
+            'intake_output': intake_output,
+            'match_output': match_output,
+        })
 
-הודעה: "{user_message}"
+        logger.info("Client crew completed successfully")
+        return result.raw if hasattr(result, 'raw') else str(result)
 
-חלץ: name, phone, looking_for, property_type, city, min_rooms, max_rooms, min_price, max_price, min_size, preferred_areas, notes.
+    def _match_saved_client(self, intake_output: str) -> str:
+        """Fallback: let the matcher agent find the saved client's ID and match it."""
+        crew = self._crews.get('match', self._build_match_crew)
+        result = crew.kickoff(inputs={'intake_output': intake_output})
+        return result.raw if hasattr(result, 'raw') else str(result)
 
-אם אין שם לקוח, כתוב "לקוח חדש".
+    def query_client(self, query: str):
+        """
+        Query existing clients.
 
-החזר JSON בלבד.""",
-            expected_output="JSON object with client fields",
-            agent=self.parser
-        )
+        Args:
+            query: Search query in Hebrew
 
-        # Task 2: Save to database
-        save_task = Task(
-            description=f"""קבל את פרטי הלקוח מהמשימה הקודמת ושמור אותם במאגר.
+        Returns:
+            Hebrew response with results
+        """
+        logger.info(f"Starting query_client workflow for: {query}")
 
-הוסף את מספר הטלפון: {phone_number}
+        crew = self._crews.get('query', self._build_query_crew)
+        result = crew.kickoff(inputs={'query': query})
+        return result.raw if hasattr(result, 'raw') else str(result)
 
-השתמש בכלי ClientSaveTool.
+    def find_matches(self, query: str):
+        """
+        Find matches for a specific client or property.
 
-החזר את מספר הלקוח שנוצר.""",
-            expected_output="Client ID and confirmation message in Hebrew",
-            agent=self.db_agent,
-            context=[parse_task]
-        )
+        Args:
+            query: Hebrew query specifying what to match
 
-        # Task 3: Find matching properties
-        match_task = Task(
-            description="""חפש נכסים המתאימים לדרישות הלקוח.
+        Returns:
+            Hebrew response with matches
+        """
+        logger.info(f"Starting find_matches workflow for: {query}")
 
-קבל את מספר הלקוח מהמשימה הקודמת.
+        crew = self._crews.get('matches', self._build_matches_crew)
+        result = crew.kickoff(inputs={'query': query})
+        return result.raw if hasattr(result, 'raw') else str(result)
 
-השתמש בכלי PropertyMatcherTool.
+    def _build_intake_crew(self) -> Crew:
+        """Parse + save crew for add_client."""
+        intake = create_client_intake_agent()
 
-החזר את 3-5 ההתאמות הטובות ביותר עם הסברים.""",
-            expected_output="List of matching properties with scores and explanations",
-            agent=self.matcher,
-            context=[save_task]
+        # Task 1: Parse and save (regex-extracted fields passed as hints)
+        intake_task = Task(
+            description=_ADD_INTAKE_DESCRIPTION,
+            expected_output="JSON object with client fields and client_id",
+            agent=intake
         )
 
-        # Task 4: Generate response
-        response_task = Task(
-            description="""צור הודעת תשובה ידידותית בעברית.
-
-סכם:
-1. את הלקוח שנשמר (שם ודרישות)
-2. מספר הלקוח
-3. נכסים מתאימים שנמצאו עם פרטים והסבר ההתאמה
-
-דגש את ההתאמות הטובות! זה מה שמעניין.
+        return Crew(
+            agents=[intake],
+            tasks=[intake_task],
+            process=Process.sequential,
+            verbose=settings.CREW_VERBOSE
+        )
 
-כתוב בסגנון חם עם אימוג׳ים (📝 🔍 ✨ 🏠).
+    def _build_match_crew(self) -> Crew:
+        """Matcher-agent crew for add_client when the client ID is unknown."""
+        matcher = create_client_matcher_agent()
 
-מקסימום 1500 תווים.""",
-            expected_output="Friendly Hebrew confirmation with matches (max 1500 chars)",
-            agent=self.response_agent,
-            context=[parse_task, save_task, match_task]
+        match_task = Task(
+            description=_ADD_MATCH_DESCRIPTION,
+            expected_output="List of matching properties with scores and explanations",
+            agent=matcher
         )
 
-        # Create and execute crew
-        crew = Crew(
-            agents=[self.parser, self.db_agent, self.matcher, self.response_agent],
-            tasks=[parse_task, save_task, match_task, response_task],
+        return Crew(
+            agents=[matcher],
+            tasks=[match_task],
             process=Process.sequential,
-            verbose=True
+            verbose=settings.CREW_VERBOSE
         )
 
-        result = crew.kickoff()
-
-        logger.info("Client crew completed successfully")
-        return result.raw if hasattr(result, 'raw') else str(result)
+    def _build_response_crew(self) -> Crew:
+        """Response crew for add_client."""
+        response_agent = create_client_response_agent()
 
-    def query_client(self, query: str):
-        """
-        Query existing clients.
+        # Task 3: Generate response
+        response_task = Task(
+            description=_ADD_RESPONSE_DESCRIPTION,
+            expected_output="Friendly Hebrew confirmation with matches (max 1500 chars)",
+            agent=response_agent
+        )
 
-        Args:
-            query: Search query in Hebrew
+        return Crew(
+            agents=[response_agent],
+            tasks=[response_task],
+            process=Process.sequential,
+            verbose=settings.CREW_VERBOSE
+        )
 
-        Returns:
-            Hebrew response with results
-        """
-        logger.info(f"Starting query_client workflow for: {query}")
+    def _build_query_crew(self) -> Crew:
+        """Parse + search + format crew for query_client."""
+        parser = create_client_parser_agent()
+        db_agent = create_client_db_agent()
+        response_agent = create_client_response_agent()
 
         # Task 1: Parse search criteria
         parse_task = Task(
-            description=f"""נתח את שאילתת החיפוש וחלץ קריטריונים:
-
-שאילתה: "{query}"
-
-חלץ: name, looking_for, city, status.
-
-החזר JSON עם הקריטריונים.""",
+            description=_QUERY_PARSE_DESCRIPTION,
             expected_output="JSON with search criteria",
-            agent=self.parser
+            agent=parser
         )
 
         # Task 2: Search database
         search_task = Task(
-            description="""חפש במאגר לקוחות לפי הקריטריונים.
-
-השתמש בכלי ClientQueryTool.
-
-החזר רשימת לקוחות מתאימים.""",
+            description=_QUERY_SEARCH_DESCRIPTION,
             expected_output="List of matching clients",
-            agent=self.db_agent,
+            agent=db_agent,
             context=[parse_task]
         )
 
         # Task 3: Format response
         response_task = Task(
-            description="""הצג את תוצאות החיפוש בצורה ברורה.
-
-עבור כל לקוח, הצג: שם, טלפון, דרישות, תאריך רישום.
-
-מקסימום 1500 תווים.""",
+            description=_QUERY_RESPONSE_DESCRIPTION,
             expected_output="Formatted search results in Hebrew",
-            agent=self.response_agent,
+            agent=response_agent,
             context=[search_task]
         )
 
-        crew = Crew(
-            agents=[self.parser, self.db_agent, self.response_agent],
+        return Crew(
+            agents=[parser, db_agent, response_agent],
             tasks=[parse_task, search_task, response_task],
             process=Process.sequential,
-            verbose=True
+            verbose=settings.CREW_VERBOSE
         )
 
-        result = crew.kickoff()
-        return result.raw if hasattr(result, 'raw') else str(result)
-
-    def find_matches(self, query: str):
-        """
-        Find matches for a specific client or property.
-
-        Args:
-            query: Hebrew query specifying what to match
-
-        Returns:
-            Hebrew response with matches
-        """
-        logger.info(f"Starting find_matches workflow for: {query}")
+    def _build_matches_crew(self) -> Crew:
+        """Parse + find + match + format crew for find_matches."""
+        parser = create_client_parser_agent()
+        db_agent = create_client_db_agent()
+        matcher = create_client_matcher_agent()
+        response_agent = create_client_response_agent()
 
         # Task 1: Parse query to understand what to match
         parse_task = Task(
-            description=f"""נתח את הבקשה להתאמות:
-
-שאילתה: "{query}"
-
-זהה: האם מדובר בחיפוש עבור לקוח ספציפי (שם) או סתם בקשה כללית.
-
-חלץ את השם או הקריטריונים הרלוונטיים.""",
+            description=_MATCHES_PARSE_DESCRIPTION,
             expected_output="JSON with matching request details",
-            agent=self.parser
+            agent=parser
         )
 
         # Task 2: Find the client/property
         find_task = Task(
-            description="""מצא את הלקוח או הנכס הרלוונטי במאגר.
-
-השתמש בכלי ClientQueryTool או PropertyQueryTool.
-
-החזר את המזהה שנמצא.""",
+            description=_MATCHES_FIND_DESCRIPTION,
             expected_output="Client or property ID",
-            agent=self.db_agent,
+            agent=db_agent,
             context=[parse_task]
         )
 
         # Task 3: Find matches
         match_task = Task(
-            description="""מצא את ההתאמות הטובות ביותר.
-
-השתמש בכלי PropertyMatcherTool או ClientMatcherTool בהתאם.
-
-החזר את 5 ההתאמות הטובות ביותר עם הסברים.""",
+            description=_MATCHES_MATCH_DESCRIPTION,
             expected_output="Top 5 matches with scores and explanations",
-            agent=self.matcher,
+            agent=matcher,
             context=[find_task]
         )
 
         # Task 4: Format response
         response_task = Task(
-            description="""הצג את ההתאמות בצורה ברורה ומעניינת.
-
-דגש את ההתאמות המצוינות.
-
-הסבר למה כל התאמה טובה.
-
-מקסימום 1500 תווים.""",
+            description=_MATCHES_RESPONSE_DESCRIPTION,
             expected_output="Formatted matches in Hebrew",
-            agent=self.response_agent,
+            agent=response_agent,
             context=[parse_task, match_task]
         )
 
-        crew = Crew(
-            agents=[self.parser, self.db_agent, self.matcher, self.response_agent],
+        return Crew(
+            agents=[parser, db_agent, matcher, response_agent],
             tasks=[parse_task, find_task, match_task, response_task],
             process=Process.sequential,
-            verbose=True
+            verbose=settings.CREW_VERBOSE
         )
-
-        result = crew.kickoff()
-        return result.raw if hasattr(result, 'raw') else str(result)
@@ -0,0 +1,43 @@
+"""
+Per-thread cache of prebuilt Crew objects.
+
+Crews are built once with placeholder task descriptions and reused via
+kickoff(inputs=...). A Crew's tasks hold the outputs of their last run,
+and CrewAI rebinds its agents' crew and executor on each kickoff, so one
+instance must never run two requests at the same time. Each worker
+thread keeps its own copy instead. The build callables create fresh
+agents for every Crew (only the LLM clients and tools are shared), so
+nothing a run mutates is visible to another thread.
+"""
+import threading
+from typing import Callable
+
+from crewai import Crew
+
+
+class CrewCache:
+    """Lazily built Crews keyed by workflow stage, one set per thread."""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def get(self, name: str, build: Callable[[], Crew]) -> Crew:
+        """
+        Return this thread's Crew for a stage, building it on first use.
+
+        Args:
+            name: Stage key (e.g. "add", "query")
+            build: Factory for the Crew
+
+        Returns:
+            Crew ready for kickoff(inputs=...)
+        """
+        crews = self._local.__dict__.setdefault('crews', {})
+        crew = crews.get(name)
+        if crew is None:
+            crew = crews[name] = build()
+        return crew
+
+    def discard(self, name: str):
+        """Drop this thread's Crew for a stage (e.g. it timed out and may still be running)."""
+        self._local.__dict__.get('crews', {}).pop(name, None)
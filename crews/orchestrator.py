@@ -4,13 +4,161 @@ CrewAI Orchestrator - Main routing logic for the WhatsApp bot.
 Routes incoming messages to appropriate crews based on intent classification.
 """
 from crewai import Crew, Task, Process
-from agents.manager.manager_agent import create_manager_agent
+from agents.manager.manager_agent import create_manager_agent, normalize_message, match_intent_rules
+from agents.manager.intent_classifier import classify_local
 from crews.property_crew import PropertyCrew
 from crews.client_crew import ClientCrew
+from crews.query_cache import TTLCache, data_version
+from config import settings
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Optional, Union
+import asyncio
+import hashlib
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
+VALID_INTENTS = ('ADD_PROPERTY', 'ADD_CLIENT', 'QUERY_PROPERTY',
+                 'QUERY_CLIENT', 'FIND_MATCHES', 'GENERAL')
+
+QUERY_CACHE_SIZE = 2048
+
+# General-message keywords, matched in one pass. Categories are listed in
+# priority order: when a message hits several, the earliest one wins.
+_GENERAL_CATEGORIES = ('short', 'greeting', 'help', 'thanks')
+_GENERAL_RE = re.compile(
+    r"(?P<short>^(?:כן|לא|אוקי|ok|בסדר|טוב|יאללה|כ|נ)$)"
+    r"|(?P<greeting>שלום|היי|מה קורה|בוקר טוב|ערב טוב)"
+    r"|(?P<help>עזרה|מה אתה יכול|איך|הסבר)"
+    r"|(?P<thanks>תודה|מעולה|אחלה)"
+)
+
+# Fixed replies for general messages and errors
+_GENERAL_SHORT = """אשמח לעזור! 😊
+
+כדי שאוכל להמשיך, אנא פרט מה תרצה:
+
+🔍 **לחפש נכס?** כתוב: "תראה לי נכסים ב[עיר/רחוב]"
+📋 **לראות פרטי נכס?** כתוב: "תראה לי נכס מספר [X]"
+👥 **למצוא לקוחות מתאימים?** כתוב: "מי מתאים לנכס [X]"
+📞 **לקבל פרטי קשר?** כתוב: "תן לי את הטלפון של בעל נכס [X]"
+
+מה תרצה לעשות?"""
+
+_GENERAL_GREETING = """שלום! 👋 אני עוזר חכם לניהול נדל"ן.
+
+אני יכול לעזור לך:
+🏠 להוסיף נכסים חדשים
+📝 לרשום לקוחות
+🔍 לחפש נכסים או לקוחות
+✨ למצוא התאמות מושלמות
+
+איך אוכל לעזור?"""
+
+_GENERAL_HELP = """אני עוזר חכם לניהול נדל"ן! 🏠
+
+**איך להוסיף נכס:**
+"דירה 3 חדרים בתל אביב רחוב דיזנגוף 102 5000 שקל להשכרה"
+אפשר גם לשלוח תמונות! 📸
+
+**איך להוסיף לקוח:**
+"לקוח חדש יניב כהן מחפש 2-3 חדרים עד 6000 בתל אביב"
+
+**איך לחפש:**
+"תראה לי נכסים בדיזנגוף"
+"מי מחפש 3 חדרים"
+
+**איך למצוא התאמות:**
+"מה מתאים ליניב"
+"תמצא לקוחות לנכס בדיזנגוף 102"
+
+מה תרצה לעשות?"""
+
+_GENERAL_THANKS = """בשמחה! 😊
+
+אם תצטרך עוד משהו, אני כאן.
+
+🏠 להוסיף נכס
+📝 להוסיף לקוח
+🔍 לחפש
+✨ למצוא התאמות"""
+
+_GENERAL_UNKNOWN = """לא הבנתי בדיוק מה ביקשת. 🤔
+
+אני יכול לעזור לך:
+🏠 להוסיף נכסים
+📝 להוסיף לקוחות
+🔍 לחפש נכסים או לקוחות
+✨ למצוא התאמות
+
+תנסה שוב? או כתוב "עזרה" למידע נוסף."""
+
+_ERROR_RESPONSE = """מצטער, נתקלתי בבעיה טכנית. 😕
+
+ההודעה שלך נשמרה, ואני מנסה לפתור את הבעיה.
+
+תוכל לנסות שוב בעוד כמה רגעים, או ליצור קשר עם התמיכה.
+
+תודה על הסבלנות!"""
+
+_GENERAL_RESPONSES = {
+    'short': _GENERAL_SHORT,  # Short affirmative/negative - need more context
+    'greeting': _GENERAL_GREETING,
+    'help': _GENERAL_HELP,
+    'thanks': _GENERAL_THANKS,
+}
+
+
+def _general_category(message_lower: str) -> Optional[str]:
+    """Return the highest-priority general category found in the message, if any."""
+    found = {match.lastgroup for match in _GENERAL_RE.finditer(message_lower)}
+    return next((category for category in _GENERAL_CATEGORIES if category in found), None)
+
+
+@dataclass(frozen=True, slots=True)
+class Msg:
+    """
+    An incoming message, normalized once per request.
+
+    Equality and hashing use only the digest (of the stripped, lowercased
+    text, not `norm`, so "3.5 חדרים" and "3-5 חדרים" stay distinct), so a
+    Msg can key the intent and query caches directly.
+    """
+    raw: str = field(compare=False)
+    lower: str = field(compare=False)   # stripped + lowercased, for general keywords
+    norm: str = field(compare=False)    # normalize_message() output, for intent rules
+    digest: bytes
+
+
+def prep(message: Union[str, Msg]) -> Msg:
+    """Build the Msg for a raw message (a Msg is returned unchanged)."""
+    if isinstance(message, Msg):
+        return message
+
+    lower = message.strip().lower()
+    return Msg(
+        raw=message,
+        lower=lower,
+        norm=normalize_message(message),
+        digest=hashlib.blake2b(lower.encode(), digest_size=16).digest()
+    )
+
+
+# Task description templates (filled per call with str.format)
+_CLASSIFY_DESCRIPTION = """סווג את כוונת ההודעה שבסוף.
+
+החזר **רק** אחד מהבאים (ללא הסבר):
+- ADD_PROPERTY
+- ADD_CLIENT
+- QUERY_PROPERTY
+- QUERY_CLIENT
+- FIND_MATCHES
+- GENERAL
+
+הודעה: "{message}\""""
+
 
 class CrewAIOrchestrator:
     """
@@ -26,78 +174,109 @@ class CrewAIOrchestrator:
     """
 
     def __init__(self):
-        """Initialize orchestrator with all crews and manager agent."""
+        """Initialize orchestrator with all crews."""
         logger.info("Initializing CrewAI Orchestrator...")
 
-        self.manager = create_manager_agent()
+        # Agents are built per crew on first use, so there is nothing slow to overlap here
         self.property_crew = PropertyCrew()
         self.client_crew = ClientCrew()
 
+        # LLM classifications keyed on the message digest
+        self._classify_cached = lru_cache(maxsize=4096)(self._classify_with_llm)
+
+        # Responses to read-only queries, keyed on (intent, message digest, data version)
+        self._query_cache = TTLCache(maxsize=QUERY_CACHE_SIZE, ttl=settings.QUERY_CACHE_TTL)
+
+        # Caps messages in LLM-bound stages for async callers (avoids rate-limit floods)
+        self._llm_slots = asyncio.Semaphore(settings.MAX_CONCURRENT_LLM)
+
         logger.info("Orchestrator initialized successfully")
 
-    def classify_intent(self, message: str) -> str:
+    def classify_intent(self, message: Union[str, Msg]) -> str:
         """
         Classify the intent of a Hebrew message.
 
+        Obvious phrasings are resolved by rules, then by the local trigram
+        classifier when it is confident; everything else goes to the
+        manager agent, with results cached per message.
+
         Args:
-            message: Hebrew message from user
+            message: Hebrew message from user (raw or already prepped)
 
         Returns:
             Intent string: ADD_PROPERTY, ADD_CLIENT, QUERY_PROPERTY,
                           QUERY_CLIENT, FIND_MATCHES, or GENERAL
         """
-        logger.info(f"Classifying intent for: {message[:50]}...")
+        msg = prep(message)
+        logger.info(f"Classifying intent for: {msg.raw[:50]}...")
 
-        task = Task(
-            description=f"""סווג את כוונת ההודעה הבאה:
+        intent = self._classify_without_llm(msg.norm)
+        if intent:
+            return intent
 
-"{message}"
+        try:
+            intent = self._classify_cached(msg)
+            logger.info(f"Classified intent: {intent}")
+            return intent
 
-החזר **רק** אחד מהבאים (ללא הסבר):
-- ADD_PROPERTY
-- ADD_CLIENT
-- QUERY_PROPERTY
-- QUERY_CLIENT
-- FIND_MATCHES
-- GENERAL""",
+        except Exception as e:
+            logger.error(f"Error classifying intent: {e}", exc_info=True)
+            return 'GENERAL'
+
+    def _classify_without_llm(self, normalized: str) -> Optional[str]:
+        """Resolve the intent from rules or the local classifier; None if neither is sure."""
+        intent = match_intent_rules(normalized)
+        if intent:
+            logger.info(f"Classified intent (rules): {intent}")
+            return intent
+
+        intent = classify_local(normalized)
+        if intent:
+            logger.info(f"Classified intent (local): {intent}")
+            return intent
+
+        return None
+
+    def _classify_with_llm(self, msg: Msg) -> str:
+        """
+        Ask the manager agent for the intent of a message (its original text).
+
+        Raises on failure or invalid output so nothing bad gets cached.
+        """
+        # A fresh agent per call: concurrent classifications must not share one
+        manager = create_manager_agent()
+
+        task = Task(
+            description=_CLASSIFY_DESCRIPTION.format(message=msg.raw),
             expected_output="Single intent keyword (ADD_PROPERTY, ADD_CLIENT, etc.)",
-            agent=self.manager
+            agent=manager
         )
 
         crew = Crew(
-            agents=[self.manager],
+            agents=[manager],
             tasks=[task],
             process=Process.sequential,
             verbose=False  # Less verbose for intent classification
         )
 
-        try:
-            result = crew.kickoff()
-            intent = (result.raw if hasattr(result, 'raw') else str(result)).strip().upper()
-
-            # Validate intent
-            valid_intents = ['ADD_PROPERTY', 'ADD_CLIENT', 'QUERY_PROPERTY',
-                           'QUERY_CLIENT', 'FIND_MATCHES', 'GENERAL']
+        result = crew.kickoff()
+        intent = (result.raw if hasattr(result, 'raw') else str(result)).strip().upper()
 
-            if intent not in valid_intents:
-                logger.warning(f"Invalid intent returned: {intent}, defaulting to GENERAL")
-                intent = 'GENERAL'
+        if intent not in VALID_INTENTS:
+            raise ValueError(f"Invalid intent returned: {intent}")
 
-            logger.info(f"Classified intent: {intent}")
-            return intent
+        return intent
 
-        except Exception as e:
-            logger.error(f"Error classifying intent: {e}", exc_info=True)
-            return 'GENERAL'
-
-    def process_message(self, message: str, phone_number: str, media_urls: list = None) -> str:
+    def process_message(self, message: Union[str, Msg], phone_number: str, media_urls: list = None,
+                        intent: str = None) -> str:
         """
         Main entry point for processing messages.
 
         Args:
-            message: Hebrew message from user
+            message: Hebrew message from user (raw or already prepped)
             phone_number: User's phone number
             media_urls: Optional list of Twilio media URLs
+            intent: Optional intent already classified by the caller
 
         Returns:
             Hebrew response message
@@ -105,12 +284,16 @@ class CrewAIOrchestrator:
         if media_urls is None:
             media_urls = []
 
+        msg = prep(message)
+        message = msg.raw
+
         logger.info(f"Processing message from {phone_number}: {message[:50]}...")
         logger.info(f"Media URLs count: {len(media_urls)}")
 
         try:
-            # Classify intent
-            intent = self.classify_intent(message)
+            # Classify intent (unless the caller already did)
+            if intent is None:
+                intent = self.classify_intent(msg)
 
             # Route to appropriate crew
             if intent == 'ADD_PROPERTY':
@@ -130,11 +313,11 @@ class CrewAIOrchestrator:
 
             elif intent == 'QUERY_PROPERTY':
                 logger.info("Routing to Property Crew (query_property)")
-                return self.property_crew.query_property(query=message)
+                return self._cached_query(intent, msg, self.property_crew.query_property)
 
             elif intent == 'QUERY_CLIENT':
                 logger.info("Routing to Client Crew (query_client)")
-                return self.client_crew.query_client(query=message)
+                return self._cached_query(intent, msg, self.client_crew.query_client)
 
             elif intent == 'FIND_MATCHES':
                 logger.info("Routing to Client Crew (find_matches)")
@@ -142,95 +325,80 @@ class CrewAIOrchestrator:
 
             elif intent == 'GENERAL':
                 logger.info("Handling as general query")
-                return self._handle_general(message)
+                return self._handle_general(msg)
 
             else:
                 logger.warning(f"Unknown intent: {intent}")
-                return self._handle_general(message)
+                return self._handle_general(msg)
 
         except Exception as e:
             logger.error(f"Error processing message: {e}", exc_info=True)
             return self._handle_error(e)
 
-    def _handle_general(self, message: str) -> str:
+    async def process_message_async(self, message: str, phone_number: str,
+                                    media_urls: list = None) -> str:
         """
-        Handle general queries, greetings, and help requests.
+        Async entry point for callers running on an event loop.
+
+        Blocking CrewAI work runs in the loop's default executor, so one
+        loop can overlap many messages. At most settings.MAX_CONCURRENT_LLM
+        messages are in LLM-bound stages at a time; general messages, which
+        are answered from fixed text, skip the limit.
 
         Args:
-            message: Hebrew message
+            message: Hebrew message from user
+            phone_number: User's phone number
+            media_urls: Optional list of Twilio media URLs
 
         Returns:
-            Hebrew response
+            Hebrew response message
         """
-        message_lower = message.strip().lower()
-
-        # Short affirmative/negative responses - need more context
-        if message_lower in ['כן', 'לא', 'אוקי', 'ok', 'בסדר', 'טוב', 'יאללה', 'כ', 'נ']:
-            return """אשמח לעזור! 😊
-
-כדי שאוכל להמשיך, אנא פרט מה תרצה:
-
-🔍 **לחפש נכס?** כתוב: "תראה לי נכסים ב[עיר/רחוב]"
-📋 **לראות פרטי נכס?** כתוב: "תראה לי נכס מספר [X]"
-👥 **למצוא לקוחות מתאימים?** כתוב: "מי מתאים לנכס [X]"
-📞 **לקבל פרטי קשר?** כתוב: "תן לי את הטלפון של בעל נכס [X]"
+        msg = prep(message)
 
-מה תרצה לעשות?"""
+        intent = self._classify_without_llm(msg.norm)
+        if intent == 'GENERAL':
+            return self.process_message(msg, phone_number, media_urls, intent=intent)
 
-        # Greetings
-        if any(word in message_lower for word in ['שלום', 'היי', 'מה קורה', 'בוקר טוב', 'ערב טוב']):
-            return """שלום! 👋 אני עוזר חכם לניהול נדל"ן.
+        async with self._llm_slots:
+            return await asyncio.to_thread(
+                self.process_message, msg, phone_number, media_urls, intent
+            )
 
-אני יכול לעזור לך:
-🏠 להוסיף נכסים חדשים
-📝 לרשום לקוחות
-🔍 לחפש נכסים או לקוחות
-✨ למצוא התאמות מושלמות
-
-איך אוכל לעזור?"""
-
-        # Help
-        if any(word in message_lower for word in ['עזרה', 'מה אתה יכול', 'איך', 'הסבר']):
-            return """אני עוזר חכם לניהול נדל"ן! 🏠
-
-**איך להוסיף נכס:**
-"דירה 3 חדרים בתל אביב רחוב דיזנגוף 102 5000 שקל להשכרה"
-אפשר גם לשלוח תמונות! 📸
-
-**איך להוסיף לקוח:**
-"לקוח חדש יניב כהן מחפש 2-3 חדרים עד 6000 בתל אביב"
-
-**איך לחפש:**
-"תראה לי נכסים בדיזנגוף"
-"מי מחפש 3 חדרים"
-
-**איך למצוא התאמות:**
-"מה מתאים ליניב"
-"תמצא לקוחות לנכס בדיזנגוף 102"
+    def _cached_query(self, intent: str, msg: Msg, run_query) -> str:
+        """
+        Answer a read-only query from the cache, or run it and cache the response.
 
-מה תרצה לעשות?"""
+        Args:
+            intent: QUERY_PROPERTY or QUERY_CLIENT
+            msg: Prepped query from user
+            run_query: Crew method to call on a miss (takes query=...)
 
-        # Thanks
-        if any(word in message_lower for word in ['תודה', 'תודה רבה', 'מעולה', 'אחלה']):
-            return """בשמחה! 😊
+        Returns:
+            Hebrew response message
+        """
+        key = (intent, msg.digest, data_version())
 
-אם תצטרך עוד משהו, אני כאן.
+        response = self._query_cache.get(key)
+        if response is not None:
+            logger.info(f"Query cache hit ({intent})")
+            return response
 
-🏠 להוסיף נכס
-📝 להוסיף לקוח
-🔍 לחפש
-✨ למצוא התאמות"""
+        response = run_query(query=msg.raw)
+        self._query_cache.set(key, response)
+        return response
 
-        # Unknown
-        return """לא הבנתי בדיוק מה ביקשת. 🤔
+    def _handle_general(self, msg: Msg) -> str:
+        """
+        Handle general queries, greetings, and help requests.
 
-אני יכול לעזור לך:
-🏠 להוסיף נכסים
-📝 להוסיף לקוחות
-🔍 לחפש נכסים או לקוחות
-✨ למצוא התאמות
+        Args:
+            msg: Prepped Hebrew message
 
-תנסה שוב? או כתוב "עזרה" למידע נוסף."""
+        Returns:
+            Hebrew response
+        """
+        category = _general_category(msg.lower)
+        return _GENERAL_RESPONSES.get(category, _GENERAL_UNKNOWN)
 
     def _handle_error(self, error: Exception) -> str:
         """
@@ -242,13 +410,5 @@ class CrewAIOrchestrator:
         Returns:
             Hebrew error message for user
         """
-        error_msg = str(error)
-
         # Don't expose technical details to user
-        return """מצטער, נתקלתי בבעיה טכנית. 😕
-
-ההודעה שלך נשמרה, ואני מנסה לפתור את הבעיה.
-
-תוכל לנסות שוב בעוד כמה רגעים, או ליצור קשר עם התמיכה.
-
-תודה על הסבלנות!"""
+        return _ERROR_RESPONSE
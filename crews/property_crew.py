@@ -1,12 +1,13 @@
 """
 Property Crew - Manages property-related workflows.
 
-Sequential workflow:
+Staged workflow:
 1. Parser Agent: Extract property details from Hebrew text
 2. DB Agent: Save property to database
-3. Photo Agent: Download and associate photos
-4. Matcher Agent (via DB): Find matching clients
-5. Response Agent: Generate friendly confirmation
+3. Photo Agent: Download and associate photos   } run concurrently,
+4. Matcher Agent (via DB): Find matching clients } both need only the saved ID
+5. Response Agent: Generate friendly confirmation (skipped when the
+   fixed confirmation template can be filled from the earlier outputs)
 """
 from crewai import Crew, Task, Process
 from agents.property.parser_agent import create_property_parser_agent
@@ -14,21 +15,113 @@ from agents.property.db_agent import create_property_db_agent
 from agents.property.photo_agent import create_property_photo_agent
 from agents.property.response_agent import create_property_response_agent
 from agents.client.matcher_agent import create_client_matcher_agent
+from agents.property.prefilter import format_hint
+from agents.property.response_templates import (
+    parse_json_output, extract_property_id, extract_photo_count,
+    extract_match_count, render_property_saved
+)
+from crews.crew_cache import CrewCache
+from config import settings
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Concurrency cap and per-crew time limit for the parallel stage
+MAX_PARALLEL_CREWS = 2
+STAGE_TIMEOUT = 120  # seconds
+
+# Dedicated pool so a timed-out crew doesn't hold up asyncio.run() shutdown
+_stage_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='crew-stage')
+
+
+# Task description templates, filled by CrewAI from kickoff inputs. The fixed
+# instructions come first and the per-request values last, so consecutive
+# prompts share the longest possible prefix for provider prompt caching.
+_ADD_PARSE_DESCRIPTION = """נתח את ההודעה שבסוף וחלץ פרטי נכס.
+
+חלץ: property_type, city, street, street_number, rooms, size, floor, price, transaction_type, owner_name, owner_phone, description.
+
+אם יש מידע שכבר חולץ, השתמש בו (phone הוא owner_phone) והשלם רק את השדות החסרים.
+
+אם חסר מידע קריטי (city או price), ציין מה חסר.
+
+החזר JSON בלבד.
+
+הודעה: "{user_message}"{hint}"""
+
+_ADD_SAVE_DESCRIPTION = """קבל את פרטי הנכס מהמשימה הקודמת ושמור אותם במאגר.
+
+השתמש בכלי PropertySaveTool.
+
+החזר את מספר הנכס שנוצר.
+
+הוסף את מספר הטלפון: {phone_number}"""
+
+_ADD_PHOTO_DESCRIPTION = """הורד תמונות עבור הנכס שנשמר וקשר אותן למספר הנכס.
+
+יש {photo_count} תמונות להוריד.
+URLs: {media_urls}
+מספר טלפון: {phone_number}
+
+תוצאת השמירה (כוללת את מספר הנכס):
+{save_output}"""
+
+_ADD_MATCH_DESCRIPTION = """חפש לקוחות שעשויים להתעניין בנכס שנשמר.
+
+השתמש בכלי ClientMatcherTool.
+
+החזר רשימת לקוחות מתאימים (עד 3) או "לא נמצאו התאמות".
+
+מספר הנכס מתוך תוצאת השמירה:
+{save_output}"""
+
+_ADD_RESPONSE_DESCRIPTION = """צור הודעת תשובה ידידותית בעברית.
+
+כתוב בסגנון חם וידידותי עם אימוג׳ים (🏠 📍 🛏️ 💰 📸).
+
+מקסימום 1500 תווים.
+
+סכם:
+1. את הנכס שנשמר: {parse_output}
+2. מספר הנכס: {save_output}
+3. כמה תמונות הורדו: {photo_output}
+4. לקוחות מתאימים אם יש: {match_output}"""
+
+_QUERY_PARSE_DESCRIPTION = """נתח את שאילתת החיפוש שבסוף וחלץ קריטריונים.
+
+חלץ: street, city, min_rooms, max_rooms, min_price, max_price, transaction_type.
+
+החזר JSON עם הקריטריונים שזוהו.
+
+שאילתה: "{query}\""""
+
+_QUERY_SEARCH_DESCRIPTION = """חפש במאגר נכסים לפי הקריטריונים שהתקבלו.
+
+השתמש בכלי PropertyQueryTool.
+
+החזר רשימת נכסים מתאימים."""
+
+_QUERY_RESPONSE_DESCRIPTION = """הצג את תוצאות החיפוש בצורה ברורה וידידותית.
+
+אם נמצאו נכסים, הצג אותם עם כל הפרטים החשובים.
+
+אם לא נמצאו, הצע להרחיב את החיפוש.
+
+מקסימום 1500 תווים."""
+
 
 class PropertyCrew:
     """Crew for handling property operations."""
 
     def __init__(self):
-        """Initialize all agents."""
-        self.parser = create_property_parser_agent()
-        self.db_agent = create_property_db_agent()
-        self.photo_agent = create_property_photo_agent()
-        self.matcher = create_client_matcher_agent()
-        self.response_agent = create_property_response_agent()
+        """Set up the per-thread crew cache."""
+        # Crews are built once per thread and reused with kickoff(inputs=...).
+        # Each builder creates its own agents: CrewAI rebinds an agent's crew
+        # and executor on every run, so agents must not be shared across crews.
+        self._crews = CrewCache()
 
     def add_property(self, user_message: str, phone_number: str, media_urls: list = None):
         """
@@ -47,158 +140,237 @@ class PropertyCrew:
         if media_urls is None:
             media_urls = []
 
-        # Task 1: Parse property details
-        parse_task = Task(
-            description=f"""נתח את ההודעה הבאה וחלץ פרטי נכס:
+        # Stage 1: parse and save (save needs the parsed fields)
+        crew = self._crews.get('add', self._build_add_crew)
+        crew.kickoff(inputs={
+            'user_message': user_message,
+            'hint': format_hint(user_message),
+            'phone_number': phone_number,
+        })
+
+        parse_task, save_task = crew.tasks
+        parse_output = parse_task.output.raw if parse_task.output else ""
+        save_output = save_task.output.raw if save_task.output else ""
+
+        # Stage 2: photos and matching only depend on the saved property, run together
+        stage_crews = {}
+
+        if media_urls:
+            stage_crews['photo'] = (self._crews.get('photo', self._build_photo_crew), {
+                'media_urls': str(media_urls),
+                'phone_number': phone_number,
+                'save_output': save_output,
+                'photo_count': len(media_urls),
+            })
+
+        stage_crews['match'] = (self._crews.get('match', self._build_match_crew), {
+            'save_output': save_output,
+        })
+
+        stage_outputs = asyncio.run(self._kickoff_parallel(stage_crews))
+        photo_output = stage_outputs.get('photo', "לא נשלחו תמונות")
+        match_output = stage_outputs['match']
+
+        outputs = [parse_output, save_output, photo_output, match_output]
+
+        # Task 5: Generate response - fixed template when every piece is known
+        response = self._render_saved_response(outputs, len(media_urls))
+        if response is None:
+            logger.info("Template not applicable, generating response with LLM")
+            response = self._generate_response(outputs)
+
+        logger.info("Property crew completed successfully")
+        return response
 
-הודעה: "{user_message}"
+    async def _kickoff_parallel(self, crews: dict) -> dict:
+        """
+        Run independent crews concurrently.
 
-חלץ: property_type, city, street, street_number, rooms, size, floor, price, transaction_type, owner_name, owner_phone, description.
+        Args:
+            crews: Mapping of name -> (Crew, kickoff inputs)
 
-אם חסר מידע קריטי (city או price), ציין מה חסר.
+        Returns:
+            Mapping of name -> raw output ("" if the crew failed or timed out)
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(MAX_PARALLEL_CREWS)
+
+        async def run(name: str, crew: Crew, inputs: dict) -> str:
+            async with semaphore:
+                try:
+                    result = await asyncio.wait_for(
+                        loop.run_in_executor(_stage_pool, partial(crew.kickoff, inputs=inputs)),
+                        timeout=STAGE_TIMEOUT
+                    )
+                    return result.raw if hasattr(result, 'raw') else str(result)
+                except asyncio.TimeoutError:
+                    logger.error(f"{name} crew timed out after {STAGE_TIMEOUT}s")
+                    # The timed-out run keeps going in the pool; don't reuse its Crew
+                    self._crews.discard(name)
+                except Exception as e:
+                    logger.error(f"Error in {name} crew: {e}", exc_info=True)
+                return ""
+
+        names = list(crews)
+        results = await asyncio.gather(*(run(name, *crews[name]) for name in names))
+        return dict(zip(names, results))
+
+    def _render_saved_response(self, outputs: list, photos_sent: int):
+        """Render the confirmation template from task outputs, or None if any value is unclear."""
+        parse_output, save_output, photo_output, match_output = outputs
+
+        parsed = parse_json_output(parse_output)
+        property_id = extract_property_id(save_output)
+        photo_count = extract_photo_count(photo_output, photos_sent)
+        match_count = extract_match_count(match_output)
+
+        if parsed is None or None in (property_id, photo_count, match_count):
+            return None
+
+        return render_property_saved(parsed, property_id, photo_count, match_count)
+
+    def _generate_response(self, outputs: list) -> str:
+        """Have the response agent summarize the add_property task outputs."""
+        parse_output, save_output, photo_output, match_output = outputs
+
+        crew = self._crews.get('response', self._build_response_crew)
+        result = crew.kickoff(inputs={
+            'parse_output': parse_output,
+            'save_output': save_output,
+            'photo_output': photo_output,
+            'match_output': match_output,
+        })
+        return result.raw if hasattr(result, 'raw') else str(result)
+
+    def query_property(self, query: str):
+        """
+        Query existing properties.
+
+        Args:
+            query: Search query in Hebrew
+
+        Returns:
+            Hebrew response with results
+        """
+        logger.info(f"Starting query_property workflow for: {query}")
 
-החזר JSON בלבד.""",
+        crew = self._crews.get('query', self._build_query_crew)
+        result = crew.kickoff(inputs={'query': query})
+        return result.raw if hasattr(result, 'raw') else str(result)
+
+    def _build_add_crew(self) -> Crew:
+        """Parse + save crew for add_property."""
+        parser = create_property_parser_agent()
+        db_agent = create_property_db_agent()
+
+        # Task 1: Parse property details (regex-extracted fields passed as hints)
+        parse_task = Task(
+            description=_ADD_PARSE_DESCRIPTION,
             expected_output="JSON object with property fields",
-            agent=self.parser
+            agent=parser
         )
 
         # Task 2: Save to database
         save_task = Task(
-            description=f"""קבל את פרטי הנכס מהמשימה הקודמת ושמור אותם במאגר.
-
-הוסף את מספר הטלפון: {phone_number}
-
-השתמש בכלי PropertySaveTool.
-
-החזר את מספר הנכס שנוצר.""",
+            description=_ADD_SAVE_DESCRIPTION,
             expected_output="Property ID and confirmation message in Hebrew",
-            agent=self.db_agent,
+            agent=db_agent,
             context=[parse_task]
         )
 
-        # Task 3: Download photos (if any)
-        has_photos = len(media_urls) > 0
-        photo_description = f"""הורד תמונות עבור הנכס שנשמר.
-
-URLs: {media_urls}
-מספר טלפון: {phone_number}
-
-קשר את התמונות למספר הנכס שהתקבל מהמשימה הקודמת.
-
-אם אין תמונות (רשימה ריקה), פשוט דווח "לא נשלחו תמונות"."""
+        return Crew(
+            agents=[parser, db_agent],
+            tasks=[parse_task, save_task],
+            process=Process.sequential,
+            verbose=settings.CREW_VERBOSE
+        )
 
-        if has_photos:
-            photo_description += f"\n\nיש {len(media_urls)} תמונות להוריד."
+    def _build_photo_crew(self) -> Crew:
+        """Photo download crew for add_property."""
+        photo_agent = create_property_photo_agent()
 
+        # Task 3: Download photos
         photo_task = Task(
-            description=photo_description,
-            expected_output="Number of photos downloaded or 'no photos'",
-            agent=self.photo_agent,
-            context=[save_task]
+            description=_ADD_PHOTO_DESCRIPTION,
+            expected_output="Number of photos downloaded",
+            agent=photo_agent
         )
 
-        # Task 4: Find matching clients
-        match_task = Task(
-            description="""חפש לקוחות שעשויים להתעניין בנכס שנשמר.
-
-קבל את מספר הנכס מהמשימה הקודמת.
+        return Crew(
+            agents=[photo_agent],
+            tasks=[photo_task],
+            process=Process.sequential,
+            verbose=settings.CREW_VERBOSE
+        )
 
-השתמש בכלי ClientMatcherTool.
+    def _build_match_crew(self) -> Crew:
+        """Client matching crew for add_property."""
+        matcher = create_client_matcher_agent()
 
-החזר רשימת לקוחות מתאימים (עד 3) או "לא נמצאו התאמות".""",
+        # Task 4: Find matching clients
+        match_task = Task(
+            description=_ADD_MATCH_DESCRIPTION,
             expected_output="List of matching clients or 'no matches'",
-            agent=self.matcher,
-            context=[save_task]
+            agent=matcher
         )
 
-        # Task 5: Generate response
-        response_task = Task(
-            description="""צור הודעת תשובה ידידותית בעברית.
+        return Crew(
+            agents=[matcher],
+            tasks=[match_task],
+            process=Process.sequential,
+            verbose=settings.CREW_VERBOSE
+        )
 
-סכם:
-1. את הנכס שנשמר (פרטים מהמשימה הראשונה)
-2. מספר הנכס (מהמשימה השנייה)
-3. כמה תמונות הורדו (מהמשימה השלישית)
-4. לקוחות מתאימים אם יש (מהמשימה הרביעית)
+    def _build_response_crew(self) -> Crew:
+        """Response crew for add_property when the template can't be used."""
+        response_agent = create_property_response_agent()
 
-כתוב בסגנון חם וידידותי עם אימוג׳ים (🏠 📍 🛏️ 💰 📸).
-
-מקסימום 1500 תווים.""",
+        # Task 5: Generate response
+        response_task = Task(
+            description=_ADD_RESPONSE_DESCRIPTION,
             expected_output="Friendly Hebrew confirmation message (max 1500 chars)",
-            agent=self.response_agent,
-            context=[parse_task, save_task, photo_task, match_task]
+            agent=response_agent
         )
 
-        # Create and execute crew
-        crew = Crew(
-            agents=[self.parser, self.db_agent, self.photo_agent, self.matcher, self.response_agent],
-            tasks=[parse_task, save_task, photo_task, match_task, response_task],
+        return Crew(
+            agents=[response_agent],
+            tasks=[response_task],
             process=Process.sequential,
-            verbose=True
+            verbose=settings.CREW_VERBOSE
         )
 
-        result = crew.kickoff()
-
-        logger.info("Property crew completed successfully")
-        return result.raw if hasattr(result, 'raw') else str(result)
-
-    def query_property(self, query: str):
-        """
-        Query existing properties.
-
-        Args:
-            query: Search query in Hebrew
-
-        Returns:
-            Hebrew response with results
-        """
-        logger.info(f"Starting query_property workflow for: {query}")
+    def _build_query_crew(self) -> Crew:
+        """Parse + search + format crew for query_property."""
+        parser = create_property_parser_agent()
+        db_agent = create_property_db_agent()
+        response_agent = create_property_response_agent()
 
         # Task 1: Parse search criteria
         parse_task = Task(
-            description=f"""נתח את שאילתת החיפוש וחלץ קריטריונים:
-
-שאילתה: "{query}"
-
-חלץ: street, city, min_rooms, max_rooms, min_price, max_price, transaction_type.
-
-החזר JSON עם הקריטריונים שזוהו.""",
+            description=_QUERY_PARSE_DESCRIPTION,
             expected_output="JSON with search criteria",
-            agent=self.parser
+            agent=parser
         )
 
         # Task 2: Search database
         search_task = Task(
-            description="""חפש במאגר נכסים לפי הקריטריונים שהתקבלו.
-
-השתמש בכלי PropertyQueryTool.
-
-החזר רשימת נכסים מתאימים.""",
+            description=_QUERY_SEARCH_DESCRIPTION,
             expected_output="List of matching properties",
-            agent=self.db_agent,
+            agent=db_agent,
             context=[parse_task]
         )
 
         # Task 3: Format response
         response_task = Task(
-            description="""הצג את תוצאות החיפוש בצורה ברורה וידידותית.
-
-אם נמצאו נכסים, הצג אותם עם כל הפרטים החשובים.
-
-אם לא נמצאו, הצע להרחיב את החיפוש.
-
-מקסימום 1500 תווים.""",
+            description=_QUERY_RESPONSE_DESCRIPTION,
             expected_output="Formatted search results in Hebrew",
-            agent=self.response_agent,
+            agent=response_agent,
             context=[search_task]
         )
 
-        crew = Crew(
-            agents=[self.parser, self.db_agent, self.response_agent],
+        return Crew(
+            agents=[parser, db_agent, response_agent],
             tasks=[parse_task, search_task, response_task],
             process=Process.sequential,
-            verbose=True
+            verbose=settings.CREW_VERBOSE
         )
-
-        result = crew.kickoff()
-        return result.raw if hasattr(result, 'raw') else str(result)
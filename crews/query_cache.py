@@ -0,0 +1,95 @@
+"""
+Short-lived cache for read-only query responses.
+
+Repeated QUERY_PROPERTY / QUERY_CLIENT messages (a user resending the same
+search) are answered from here instead of re-running the query crew.
+Entries expire after a TTL, and every commit that wrote properties,
+clients, photos or matches bumps a data version that is part of the cache
+key, so later lookups in the same process miss.
+
+The cache and the version counter are per process. Under gunicorn with
+several workers, a write handled by one worker does not invalidate the
+others; they can serve the older answer until QUERY_CACHE_TTL expires
+(set it to 0 to disable caching).
+"""
+from collections import OrderedDict
+from itertools import chain
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from database.models import Property, Client, Photo, Match
+
+_WATCHED_MODELS = (Property, Client, Photo, Match)
+
+_data_version = 0
+_version_lock = threading.Lock()
+
+
+@event.listens_for(Session, "after_flush")
+def _note_watched_write(session, flush_context):
+    """Remember that this transaction wrote queryable rows."""
+    if any(isinstance(obj, _WATCHED_MODELS) for obj in chain(session.new, session.dirty, session.deleted)):
+        session.info['query_cache_dirty'] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_data_version(session):
+    """
+    Invalidate cached query responses once the write is committed.
+
+    Bumping at flush time would let a concurrent reader cache data from
+    before the commit under the new version.
+    """
+    global _data_version
+    if session.info.pop('query_cache_dirty', False):
+        with _version_lock:
+            _data_version += 1
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_watched_write(session):
+    """A rolled-back write changes nothing."""
+    session.info.pop('query_cache_dirty', None)
+
+
+def data_version() -> int:
+    """Current data version; include it in cache keys."""
+    return _data_version
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after `ttl` seconds."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """Store a value, evicting the least recently used entry when full (no-op if ttl <= 0)."""
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
@@ -0,0 +1,68 @@
+-- WhatsApp Real Estate Bot - Pre-aggregated analytics views (PostgreSQL / Supabase)
+-- Run after supabase_setup.sql, then set ANALYTICS_USE_MATVIEWS=true so the
+-- Supabase skill reads these views instead of scanning the base tables.
+--
+-- Each view stores per-day partial aggregates (COUNT / SUM / MIN / MAX).
+-- Those combine across days, so any date window is answered by summing a
+-- handful of rows per group; averages are SUM / COUNT at query time.
+
+-- ===================================
+-- 1. PROPERTY DAILY STATS
+-- ===================================
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_property_daily_stats AS
+SELECT
+    DATE(created_at) AS day,
+    transaction_type,
+    city,
+    COALESCE(status, '') AS status,
+    COUNT(*) AS cnt,
+    SUM(price) AS sum_price,
+    MIN(price) AS min_price,
+    MAX(price) AS max_price,
+    SUM(rooms) AS sum_rooms,
+    COUNT(rooms) AS cnt_rooms
+FROM properties
+GROUP BY DATE(created_at), transaction_type, city, COALESCE(status, '');
+
+-- Required for REFRESH ... CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_property_daily_stats
+    ON mv_property_daily_stats(day, transaction_type, city, status);
+
+-- ===================================
+-- 2. MATCH DAILY STATS
+-- ===================================
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_match_daily_stats AS
+SELECT
+    DATE(suggested_at) AS day,
+    COALESCE(status, '') AS status,
+    CASE
+        WHEN score < 50 THEN 'Poor (0-50)'
+        WHEN score < 65 THEN 'Fair (50-65)'
+        WHEN score < 80 THEN 'Good (65-80)'
+        ELSE 'Excellent (80+)'
+    END AS score_range,
+    COUNT(*) AS cnt,
+    SUM(score) AS sum_score,
+    MIN(score) AS min_score
+FROM matches
+GROUP BY 1, 2, 3;
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_match_daily_stats
+    ON mv_match_daily_stats(day, status, score_range);
+
+-- ===================================
+-- 3. REFRESH
+-- ===================================
+-- CONCURRENTLY keeps the views readable while they rebuild
+CREATE OR REPLACE FUNCTION refresh_analytics_views()
+RETURNS void AS $$
+BEGIN
+    REFRESH MATERIALIZED VIEW CONCURRENTLY mv_property_daily_stats;
+    REFRESH MATERIALIZED VIEW CONCURRENTLY mv_match_daily_stats;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Schedule with pg_cron (Supabase: Database → Extensions → pg_cron), e.g. every 5 minutes:
+-- SELECT cron.schedule('refresh-analytics-views', '*/5 * * * *', 'SELECT refresh_analytics_views()');
+
+SELECT refresh_analytics_views();
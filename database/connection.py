@@ -1,30 +1,76 @@
 """
 Database connection and session management.
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import QueuePool
 from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
 from config import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
+IS_SQLITE = 'sqlite' in settings.DATABASE_URL
+
+
+def _sync_database_url(url: str) -> str:
+    """
+    Pin bare Postgres URLs to psycopg3.
+
+    A plain postgresql:// URL would select the psycopg2 dialect, which is
+    not installed; psycopg3 batches executemany() INSERTs through
+    SQLAlchemy's insertmanyvalues multi-row VALUES path.
+    """
+    if url.startswith(('postgresql://', 'postgres://')):
+        return 'postgresql+psycopg://' + url.split('://', 1)[1]
+    return url
+
+
+# Connection pool: one connection per concurrent session, checked before use
+# and recycled before server-side idle timeouts can kill it
+pool_kwargs = dict(poolclass=QueuePool, pool_pre_ping=True, pool_recycle=1800, pool_timeout=30)
+if IS_SQLITE:
+    pool_kwargs.update(pool_size=5, max_overflow=10)
+else:
+    pool_kwargs.update(pool_size=10, max_overflow=20)
+
+if IS_SQLITE:
+    # timeout: seconds to wait for a competing writer's lock instead of failing
+    # immediately (sets the connection's busy timeout; no separate pragma needed)
+    connect_args = {"check_same_thread": False, "timeout": 30}
+else:
+    # Prepare a statement on its second execution per connection (psycopg
+    # default: sixth); None turns server-side prepares off
+    connect_args = {"prepare_threshold": 1 if settings.DB_PREPARED_STATEMENTS else None}
+
 # Create database engine
 engine = create_engine(
-    settings.DATABASE_URL,
+    _sync_database_url(settings.DATABASE_URL),
     echo=False,  # Set to True for SQL debugging
-    connect_args={"check_same_thread": False} if 'sqlite' in settings.DATABASE_URL else {}
+    insertmanyvalues_page_size=1000,  # Rows per multi-row INSERT batch
+    connect_args=connect_args,
+    **pool_kwargs
 )
 
-# Enable WAL mode for SQLite for better concurrency
-if 'sqlite' in settings.DATABASE_URL:
-    try:
-        with engine.connect() as conn:
-            conn.execute("PRAGMA journal_mode=WAL")
-            conn.execute("PRAGMA synchronous=NORMAL")
-            logger.info("Enabled WAL mode for SQLite")
-    except Exception as e:
-        logger.warning(f"Could not enable WAL mode: {e}")
+# Enable WAL mode for SQLite for better concurrency (readers don't block the writer)
+if IS_SQLITE:
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        """Apply per-connection SQLite settings as each pooled connection opens."""
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute("PRAGMA temp_store=MEMORY")
+            cursor.execute("PRAGMA mmap_size=268435456")  # 256 MB memory-mapped reads
+            cursor.execute("PRAGMA cache_size=-65536")    # 64 MB page cache (negative = KiB)
+            cursor.execute("PRAGMA foreign_keys=ON")      # enforce ON DELETE CASCADE (off by default)
+        except Exception as e:
+            logger.warning(f"Could not apply SQLite pragmas: {e}")
+        finally:
+            cursor.close()
 
 # Create session factory
 SessionLocal = sessionmaker(
@@ -57,6 +103,36 @@ def get_session() -> Session:
         session.close()
 
 
+# Session shared by helpers running inside one unit of work (see session_scope)
+current_session: ContextVar[Optional[Session]] = ContextVar('current_session', default=None)
+
+
+@contextmanager
+def session_scope(session: Optional[Session] = None) -> Session:
+    """
+    Reuse an existing session if one is available, otherwise open one.
+
+    Resolution order: the explicit `session` argument, then the session
+    stored in `current_session`, then a new get_session() which is also
+    published in `current_session` so nested helpers share it.
+
+    Usage:
+        with session_scope() as session:
+            history = state_manager.get_recent_history(phone)  # same session
+    """
+    session = session or current_session.get()
+    if session is not None:
+        yield session
+        return
+
+    with get_session() as session:
+        token = current_session.set(session)
+        try:
+            yield session
+        finally:
+            current_session.reset(token)
+
+
 def get_db() -> Session:
     """
     Get a database session (for dependency injection).
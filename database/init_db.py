@@ -4,191 +4,261 @@ Creates tables and optionally seeds test data.
 """
 import os
 import logging
+from sqlalchemy import insert, inspect, select, text
 from database.models import Base, Property, Client, Photo, Match, Conversation
-from database.connection import engine, get_session
+from database.connection import engine, IS_SQLITE
 from config import settings
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# Set once the schema is known to exist, so repeat calls in this process skip DDL
+_tables_ready = False
+
+# Single-column indexes replaced by the composite ones in models.py, under both
+# the SQLAlchemy (ix_) and supabase_setup.sql (idx_) names
+_SUPERSEDED_INDEXES: tuple[str, ...] = tuple(
+    f"{prefix}_{table}_{column}"
+    for prefix in ('ix', 'idx')
+    for table, column in (
+        ('properties', 'rooms'),
+        ('properties', 'price'),
+        ('properties', 'transaction_type'),
+        ('properties', 'status'),
+        ('clients', 'looking_for'),
+        ('clients', 'status'),
+        ('conversations', 'timestamp'),
+    )
+)
+
+
+# Hebrew development fixtures, built once at import
+_PROPERTY_SEED: tuple[dict, ...] = (
+    {
+        "property_type": "דירה",
+        "city": "תל אביב",
+        "street": "דיזנגוף",
+        "street_number": "102",
+        "address": "דיזנגוף 102, תל אביב",
+        "rooms": 3,
+        "size": 75,
+        "floor": 2,
+        "price": 5000,
+        "transaction_type": "rent",
+        "owner_name": "יוסי כהן",
+        "owner_phone": "0534439430",
+        "description": "דירה משופצת וממוזגת, קרובה לים",
+        "status": "available",
+        "phone_number": "+972501234567"
+    },
+    {
+        "property_type": "בית",
+        "city": "רעננה",
+        "street": "הרצל",
+        "street_number": "25",
+        "address": "הרצל 25, רעננה",
+        "rooms": 5,
+        "size": 150,
+        "price": 4000000,
+        "transaction_type": "sale",
+        "owner_name": "דינה לוי",
+        "owner_phone": "0521234567",
+        "description": "בית פרטי עם גינה גדולה, מחסן וחניה",
+        "status": "available",
+        "phone_number": "+972501234567"
+    },
+    {
+        "property_type": "דירה",
+        "city": "ירושלים",
+        "street": "יפו",
+        "street_number": "150",
+        "address": "יפו 150, ירושלים",
+        "rooms": 2,
+        "size": 55,
+        "floor": 1,
+        "price": 4000,
+        "transaction_type": "rent",
+        "owner_name": "משה אברהם",
+        "owner_phone": "0546789012",
+        "description": "דירה קטנה וחמודה, כולל ארנונה",
+        "status": "available",
+        "phone_number": "+972501234567"
+    },
+    {
+        "property_type": "דירה",
+        "city": "חיפה",
+        "street": "הרצל",
+        "street_number": "88",
+        "address": "הרצל 88, חיפה",
+        "rooms": 4,
+        "size": 95,
+        "floor": 3,
+        "price": 6500,
+        "transaction_type": "rent",
+        "owner_name": "רחל גולן",
+        "owner_phone": "0523456789",
+        "description": "דירה מרווחת עם מרפסת גדולה ונוף לים",
+        "status": "available",
+        "phone_number": "+972501234567"
+    },
+)
+
+_CLIENT_SEED: tuple[dict, ...] = (
+    {
+        "name": "יניב כהן",
+        "phone": "0501112233",
+        "looking_for": "rent",
+        "property_type": "דירה",
+        "city": "תל אביב",
+        "min_rooms": 2,
+        "max_rooms": 3,
+        "min_price": 4000,
+        "max_price": 6000,
+        "preferred_areas": '["דיזנגוף", "בן יהודה", "אבן גבירול"]',
+        "status": "active",
+        "phone_number": "+972501234567"
+    },
+    {
+        "name": "דני לוי",
+        "phone": "0502223344",
+        "looking_for": "rent",
+        "property_type": "דירה",
+        "city": "תל אביב",
+        "min_rooms": 3,
+        "max_rooms": 4,
+        "min_price": 5000,
+        "max_price": 7000,
+        "min_size": 70,
+        "preferred_areas": '["צפון תל אביב", "רמת אביב"]',
+        "status": "active",
+        "phone_number": "+972501234567"
+    },
+    {
+        "name": "שרה מזרחי",
+        "phone": "0503334455",
+        "looking_for": "buy",
+        "property_type": "בית",
+        "city": "רעננה",
+        "min_rooms": 4,
+        "max_rooms": 6,
+        "min_price": 3000000,
+        "max_price": 5000000,
+        "min_size": 120,
+        "notes": "מחפשת בית עם גינה לילדים",
+        "status": "active",
+        "phone_number": "+972501234567"
+    },
+)
+
+# (property index, client index, score) into the two fixtures above
+_MATCH_SEED: tuple[tuple[int, int, float], ...] = (
+    (0, 0, 95.0),  # יניב כהן - דיזנגוף
+    (0, 1, 85.0),  # דני לוי - דיזנגוף
+    (1, 2, 90.0),  # שרה מזרחי - house in רעננה
+)
+
+
 def create_tables():
-    """Create all database tables."""
-    logger.info("Creating database tables...")
-    Base.metadata.create_all(engine)
-    logger.info("Database tables created successfully")
+    """Create all database tables (no-op on a warm restart when they all exist)."""
+    global _tables_ready
+    if _tables_ready:
+        return
+
+    # One catalog query instead of a per-table check inside create_all()
+    existing = set(inspect(engine).get_table_names())
+    if set(Base.metadata.tables) <= existing:
+        logger.info("Database tables already exist, skipping create_all")
+        _sync_indexes()
+    else:
+        logger.info("Creating database tables...")
+        Base.metadata.create_all(engine)
+        logger.info("Database tables created successfully")
+
+    _tables_ready = True
+
+
+def _sync_indexes():
+    """Build model indexes an existing database lacks and drop the ones they replaced."""
+    inspector = inspect(engine)
+
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            present = {index['name'] for index in inspector.get_indexes(table.name)}
+
+            for index in table.indexes:
+                if index.name not in present:
+                    logger.info(f"Creating index {index.name}")
+                    index.create(conn)
+
+            for name in present.intersection(_SUPERSEDED_INDEXES):
+                logger.info(f"Dropping superseded index {name}")
+                conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+
+def _uniform_rows(rows):
+    """Give every row the same keys (missing ones as NULL), as a Core executemany requires."""
+    keys = {key for row in rows for key in row}
+    return [dict.fromkeys(keys) | row for row in rows]
 
 
 def seed_test_data():
     """Seed database with Hebrew test data for development."""
     logger.info("Seeding test data...")
 
-    with get_session() as session:
-        # Check if data already exists
-        existing_properties = session.query(Property).count()
-        if existing_properties > 0:
+    # Insert-only load: Core statements on one connection, no ORM unit of work
+    properties, clients = Property.__table__, Client.__table__
+
+    with engine.begin() as connection:
+        # Check if data already exists (stops at the first row instead of counting)
+        if connection.execute(select(properties.c.id).limit(1)).scalar() is not None:
             logger.info("Database already contains data, skipping seed")
             return
 
-        # Add test properties
-        properties = [
-            Property(
-                property_type="דירה",
-                city="תל אביב",
-                street="דיזנגוף",
-                street_number="102",
-                address="דיזנגוף 102, תל אביב",
-                rooms=3,
-                size=75,
-                floor=2,
-                price=5000,
-                transaction_type="rent",
-                owner_name="יוסי כהן",
-                owner_phone="0534439430",
-                description="דירה משופצת וממוזגת, קרובה לים",
-                status="available",
-                phone_number="+972501234567"
-            ),
-            Property(
-                property_type="בית",
-                city="רעננה",
-                street="הרצל",
-                street_number="25",
-                address="הרצל 25, רעננה",
-                rooms=5,
-                size=150,
-                price=4000000,
-                transaction_type="sale",
-                owner_name="דינה לוי",
-                owner_phone="0521234567",
-                description="בית פרטי עם גינה גדולה, מחסן וחניה",
-                status="available",
-                phone_number="+972501234567"
-            ),
-            Property(
-                property_type="דירה",
-                city="ירושלים",
-                street="יפו",
-                street_number="150",
-                address="יפו 150, ירושלים",
-                rooms=2,
-                size=55,
-                floor=1,
-                price=4000,
-                transaction_type="rent",
-                owner_name="משה אברהם",
-                owner_phone="0546789012",
-                description="דירה קטנה וחמודה, כולל ארנונה",
-                status="available",
-                phone_number="+972501234567"
-            ),
-            Property(
-                property_type="דירה",
-                city="חיפה",
-                street="הרצל",
-                street_number="88",
-                address="הרצל 88, חיפה",
-                rooms=4,
-                size=95,
-                floor=3,
-                price=6500,
-                transaction_type="rent",
-                owner_name="רחל גולן",
-                owner_phone="0523456789",
-                description="דירה מרווחת עם מרפסת גדולה ונוף לים",
-                status="available",
-                phone_number="+972501234567"
-            ),
-        ]
+        # One multi-row INSERT per table; RETURNING gives the new IDs in row order
+        property_ids = connection.execute(
+            insert(properties).returning(properties.c.id, sort_by_parameter_order=True),
+            _uniform_rows(_PROPERTY_SEED)
+        ).scalars().all()
+
+        client_ids = connection.execute(
+            insert(clients).returning(clients.c.id, sort_by_parameter_order=True),
+            _uniform_rows(_CLIENT_SEED)
+        ).scalars().all()
 
-        session.add_all(properties)
-        session.flush()  # Get IDs for properties
-
-        # Add test clients
-        clients = [
-            Client(
-                name="יניב כהן",
-                phone="0501112233",
-                looking_for="rent",
-                property_type="דירה",
-                city="תל אביב",
-                min_rooms=2,
-                max_rooms=3,
-                min_price=4000,
-                max_price=6000,
-                preferred_areas='["דיזנגוף", "בן יהודה", "אבן גבירול"]',
-                status="active",
-                phone_number="+972501234567"
-            ),
-            Client(
-                name="דני לוי",
-                phone="0502223344",
-                looking_for="rent",
-                property_type="דירה",
-                city="תל אביב",
-                min_rooms=3,
-                max_rooms=4,
-                min_price=5000,
-                max_price=7000,
-                min_size=70,
-                preferred_areas='["צפון תל אביב", "רמת אביב"]',
-                status="active",
-                phone_number="+972501234567"
-            ),
-            Client(
-                name="שרה מזרחי",
-                phone="0503334455",
-                looking_for="buy",
-                property_type="בית",
-                city="רעננה",
-                min_rooms=4,
-                max_rooms=6,
-                min_price=3000000,
-                max_price=5000000,
-                min_size=120,
-                notes="מחפשת בית עם גינה לילדים",
-                status="active",
-                phone_number="+972501234567"
-            ),
+        match_rows = [
+            {"property_id": property_ids[prop], "client_id": client_ids[client], "score": score, "status": "suggested"}
+            for prop, client, score in _MATCH_SEED
         ]
 
-        session.add_all(clients)
-        session.flush()
+        connection.execute(insert(Match.__table__), match_rows)
 
-        # Create some matches
-        # יניב כהן matches property 1 (דיזנגוף)
-        match1 = Match(
-            property_id=properties[0].id,
-            client_id=clients[0].id,
-            score=95.0,
-            status="suggested"
-        )
+        logger.info(f"Seeded {len(_PROPERTY_SEED)} properties, {len(_CLIENT_SEED)} clients, and {len(match_rows)} matches")
 
-        # דני לוי matches property 1 (דיזנגוף)
-        match2 = Match(
-            property_id=properties[0].id,
-            client_id=clients[1].id,
-            score=85.0,
-            status="suggested"
-        )
 
-        # שרה מזרחי matches property 2 (house in רעננה)
-        match3 = Match(
-            property_id=properties[1].id,
-            client_id=clients[2].id,
-            score=90.0,
-            status="suggested"
-        )
+def optimize_database():
+    """
+    Refresh SQLite query planner statistics.
 
-        session.add_all([match1, match2, match3])
+    Connection-level pragmas (WAL, synchronous=NORMAL, cache and mmap
+    sizes) are applied to every pooled connection in database.connection;
+    this only runs the once-per-startup PRAGMA optimize, which analyzes
+    tables whose statistics are stale so the planner picks the indexes.
+    """
+    if not IS_SQLITE:
+        return
 
-        logger.info(f"Seeded {len(properties)} properties, {len(clients)} clients, and 3 matches")
+    with engine.connect() as connection:
+        connection.execute(text("PRAGMA optimize"))
+    logger.info("SQLite statistics optimized")
 
 
 def drop_tables():
     """Drop all database tables (use with caution!)."""
+    global _tables_ready
     logger.warning("Dropping all database tables...")
     Base.metadata.drop_all(engine)
+    _tables_ready = False
     logger.info("All tables dropped")
 
 
@@ -218,6 +288,8 @@ def init_database(seed=False):
     if seed:
         seed_test_data()
 
+    optimize_database()
+
     logger.info("Database initialization complete")
 
 
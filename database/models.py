@@ -2,14 +2,40 @@
 SQLAlchemy ORM models for the WhatsApp Real Estate Assistant.
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean
-from sqlalchemy.orm import relationship, declarative_base
+import orjson
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean, Index, select
+from sqlalchemy.orm import relationship, declarative_base, column_property
 from sqlalchemy.sql import func
 
 Base = declarative_base()
 
 
-class Property(Base):
+class _Serializable:
+    """
+    to_dict()/to_json() driven by a fixed `_fields` tuple per model.
+
+    to_json() goes straight to orjson (datetimes encoded natively, naive
+    values treated as UTC) instead of building a dict and re-encoding it.
+    """
+    _fields: tuple = ()
+
+    def to_dict(self):
+        """Serialize to a dictionary (datetimes as ISO strings)."""
+        data = {field: getattr(self, field) for field in self._fields}
+        for field, value in data.items():
+            if isinstance(value, datetime):
+                data[field] = value.isoformat()
+        return data
+
+    def to_json(self) -> bytes:
+        """Serialize to UTF-8 JSON bytes."""
+        return orjson.dumps(
+            {field: getattr(self, field) for field in self._fields},
+            option=orjson.OPT_NAIVE_UTC
+        )
+
+
+class Property(_Serializable, Base):
     """
     Real estate property model.
     Supports both rental and sale properties.
@@ -23,14 +49,14 @@ class Property(Base):
     city = Column(String(100), nullable=False, default='תל אביב', index=True)
     street = Column(String(200))
     street_number = Column(String(20))
-    address = Column(String(500))  # Full address string
+    address = Column(String(324))  # "street, street_number, city" (200 + 20 + 100 + separators)
 
-    rooms = Column(Float, index=True)  # Can be 2.5, 3.5, etc.
+    rooms = Column(Float)  # Can be 2.5, 3.5, etc.
     size = Column(Integer)  # Square meters
     floor = Column(Integer)
-    price = Column(Integer, nullable=False, index=True)  # In ILS
+    price = Column(Integer, nullable=False)  # In ILS
 
-    transaction_type = Column(String(20), nullable=False, index=True)  # 'rent' or 'sale'
+    transaction_type = Column(String(20), nullable=False)  # 'rent' or 'sale'
 
     # Owner information
     owner_name = Column(String(200))
@@ -39,44 +65,38 @@ class Property(Base):
     description = Column(Text)
 
     # Status tracking
-    status = Column(String(20), default='available', index=True)  # available, rented, sold, pending
+    status = Column(String(20), default='available')  # available, rented, sold, pending
 
     # Metadata
     phone_number = Column(String(20), nullable=False)  # Who added this property
-    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now())
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=datetime.utcnow)
 
     # Relationships
     photos = relationship("Photo", back_populates="property", cascade="all, delete-orphan")
     matches = relationship("Match", back_populates="property", cascade="all, delete-orphan")
 
-    def to_dict(self):
-        """Serialize property to dictionary for agents."""
-        return {
-            'id': self.id,
-            'property_type': self.property_type,
-            'city': self.city,
-            'street': self.street,
-            'street_number': self.street_number,
-            'address': self.address,
-            'rooms': self.rooms,
-            'size': self.size,
-            'floor': self.floor,
-            'price': self.price,
-            'transaction_type': self.transaction_type,
-            'owner_name': self.owner_name,
-            'owner_phone': self.owner_phone,
-            'description': self.description,
-            'status': self.status,
-            'photo_count': len(self.photos),
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-        }
+    __table_args__ = (
+        # Matcher and property search: equality on type/status, then price and rooms ranges
+        Index('ix_property_search', 'transaction_type', 'status', 'price', 'rooms'),
+        # Status filters, optionally narrowed by creation date (also serves status alone)
+        Index('ix_property_status_created', 'status', 'created_at'),
+        # Analytics date windows; rows arrive in created_at order, so BRIN ranges stay tight
+        Index('ix_property_created_brin', 'created_at',
+              postgresql_using='brin', postgresql_with={'pages_per_range': 32}),
+    )
+
+    _fields = (
+        'id', 'property_type', 'city', 'street', 'street_number', 'address', 'rooms',
+        'size', 'floor', 'price', 'transaction_type', 'owner_name', 'owner_phone',
+        'description', 'status', 'photo_count', 'created_at',
+    )
 
     def __repr__(self):
         return f"<Property(id={self.id}, type={self.property_type}, city={self.city}, rooms={self.rooms}, price={self.price})>"
 
 
-class Client(Base):
+class Client(_Serializable, Base):
     """
     Client model for people looking for properties.
     """
@@ -89,7 +109,7 @@ class Client(Base):
     phone = Column(String(20))
 
     # Search criteria
-    looking_for = Column(String(20), nullable=False, index=True)  # 'rent' or 'buy'
+    looking_for = Column(String(20), nullable=False)  # 'rent' or 'buy'
     property_type = Column(String(50))  # דירה, בית, etc.
     city = Column(String(100), index=True)  # Preferred city
 
@@ -103,35 +123,30 @@ class Client(Base):
     notes = Column(Text)
 
     # Status tracking
-    status = Column(String(20), default='active', index=True)  # active, closed, pending
+    status = Column(String(20), default='active')  # active, closed, pending
 
     # Metadata
     phone_number = Column(String(20), nullable=False)  # Who added this client
-    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now())
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=datetime.utcnow)
 
     # Relationships
     matches = relationship("Match", back_populates="client", cascade="all, delete-orphan")
 
-    def to_dict(self):
-        """Serialize client to dictionary for agents."""
-        return {
-            'id': self.id,
-            'name': self.name,
-            'phone': self.phone,
-            'looking_for': self.looking_for,
-            'property_type': self.property_type,
-            'city': self.city,
-            'min_rooms': self.min_rooms,
-            'max_rooms': self.max_rooms,
-            'min_price': self.min_price,
-            'max_price': self.max_price,
-            'min_size': self.min_size,
-            'preferred_areas': self.preferred_areas,
-            'notes': self.notes,
-            'status': self.status,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-        }
+    __table_args__ = (
+        # Matcher (looking_for + status) and client search (+ city)
+        Index('ix_client_search', 'looking_for', 'status', 'city'),
+        # Analytics: active clients created within the window
+        Index('ix_client_status_created', 'status', 'created_at'),
+        Index('ix_client_created_brin', 'created_at',
+              postgresql_using='brin', postgresql_with={'pages_per_range': 32}),
+    )
+
+    _fields = (
+        'id', 'name', 'phone', 'looking_for', 'property_type', 'city', 'min_rooms',
+        'max_rooms', 'min_price', 'max_price', 'min_size', 'preferred_areas', 'notes',
+        'status', 'created_at',
+    )
 
     def __repr__(self):
         return f"<Client(id={self.id}, name={self.name}, looking_for={self.looking_for}, city={self.city})>"
@@ -149,12 +164,12 @@ class Photo(Base):
     property_id = Column(Integer, ForeignKey('properties.id', ondelete='CASCADE'), nullable=False, index=True)
 
     # Photo storage
-    file_path = Column(String(500), nullable=False)  # Local storage path
-    twilio_media_url = Column(String(500))  # Original Twilio URL for debugging
+    file_path = Column(String(260), nullable=False)  # Local storage path
+    twilio_media_url = Column(String(300))  # Original Twilio URL for debugging
     media_content_type = Column(String(50))  # image/jpeg, image/png, etc.
 
     # Metadata
-    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now())
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
 
     # Relationships
     property = relationship("Property", back_populates="photos")
@@ -163,7 +178,19 @@ class Photo(Base):
         return f"<Photo(id={self.id}, property_id={self.property_id}, path={self.file_path})>"
 
 
-class Match(Base):
+# Photo count as a correlated COUNT subquery, so callers don't load every Photo
+# row just to take len(). Deferred: add .options(undefer(Property.photo_count))
+# when listing properties to fetch it in the same SELECT.
+Property.photo_count = column_property(
+    select(func.count(Photo.id))
+    .where(Photo.property_id == Property.id)
+    .correlate_except(Photo)
+    .scalar_subquery(),
+    deferred=True
+)
+
+
+class Match(_Serializable, Base):
     """
     Property-client match model.
     Tracks suggested matches with quality scores.
@@ -181,29 +208,26 @@ class Match(Base):
     status = Column(String(20), default='suggested', index=True)  # suggested, sent, interested, rejected, closed
 
     # Metadata
-    suggested_at = Column(DateTime, default=datetime.utcnow, server_default=func.now())
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    suggested_at = Column(DateTime, server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=datetime.utcnow)
 
     # Relationships
     property = relationship("Property", back_populates="matches")
     client = relationship("Client", back_populates="matches")
 
-    def to_dict(self):
-        """Serialize match to dictionary."""
-        return {
-            'id': self.id,
-            'property_id': self.property_id,
-            'client_id': self.client_id,
-            'score': self.score,
-            'status': self.status,
-            'suggested_at': self.suggested_at.isoformat() if self.suggested_at else None,
-        }
+    __table_args__ = (
+        # Analytics date windows
+        Index('ix_match_suggested_brin', 'suggested_at',
+              postgresql_using='brin', postgresql_with={'pages_per_range': 32}),
+    )
+
+    _fields = ('id', 'property_id', 'client_id', 'score', 'status', 'suggested_at')
 
     def __repr__(self):
         return f"<Match(id={self.id}, property_id={self.property_id}, client_id={self.client_id}, score={self.score})>"
 
 
-class Conversation(Base):
+class Conversation(_Serializable, Base):
     """
     Conversation history model.
     Tracks all messages for context and debugging.
@@ -217,17 +241,14 @@ class Conversation(Base):
     content = Column(Text, nullable=False)
 
     # Metadata
-    timestamp = Column(DateTime, default=datetime.utcnow, server_default=func.now(), index=True)
+    timestamp = Column(DateTime, server_default=func.now(), nullable=False)
 
-    def to_dict(self):
-        """Serialize conversation to dictionary."""
-        return {
-            'id': self.id,
-            'phone_number': self.phone_number,
-            'role': self.role,
-            'content': self.content,
-            'timestamp': self.timestamp.isoformat() if self.timestamp else None,
-        }
+    __table_args__ = (
+        # Serves "latest N messages for a phone" without a scan or sort
+        Index('ix_conv_phone_ts', 'phone_number', 'timestamp'),
+    )
+
+    _fields = ('id', 'phone_number', 'role', 'content', 'timestamp')
 
     def __repr__(self):
         return f"<Conversation(id={self.id}, phone={self.phone_number}, role={self.role})>"
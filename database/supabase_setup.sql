@@ -12,7 +12,7 @@ CREATE TABLE IF NOT EXISTS properties (
     city VARCHAR(100) NOT NULL DEFAULT 'תל אביב',
     street VARCHAR(200),
     street_number VARCHAR(20),
-    address VARCHAR(500),
+    address VARCHAR(324),  -- street, street_number, city joined with ", "
 
     rooms DECIMAL(3,1),  -- 2.5, 3.5, etc.
     size INTEGER,  -- Square meters
@@ -32,16 +32,23 @@ CREATE TABLE IF NOT EXISTS properties (
 
     -- Metadata
     phone_number VARCHAR(20) NOT NULL,  -- Who added this property
-    created_at TIMESTAMP DEFAULT NOW(),
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
     updated_at TIMESTAMP DEFAULT NOW()
 );
 
 -- Create indexes for properties
 CREATE INDEX IF NOT EXISTS idx_properties_city ON properties(city);
-CREATE INDEX IF NOT EXISTS idx_properties_rooms ON properties(rooms);
-CREATE INDEX IF NOT EXISTS idx_properties_price ON properties(price);
-CREATE INDEX IF NOT EXISTS idx_properties_transaction_type ON properties(transaction_type);
-CREATE INDEX IF NOT EXISTS idx_properties_status ON properties(status);
+-- Matcher and search: equality on type/status, then price and rooms ranges
+CREATE INDEX IF NOT EXISTS ix_property_search ON properties(transaction_type, status, price, rooms);
+-- Status filters, optionally narrowed by creation date (also serves status alone)
+CREATE INDEX IF NOT EXISTS ix_property_status_created ON properties(status, created_at);
+-- Analytics date windows; rows arrive in created_at order, so BRIN ranges stay tight
+CREATE INDEX IF NOT EXISTS ix_property_created_brin ON properties USING BRIN (created_at) WITH (pages_per_range = 32);
+-- Single-column indexes the composites above replace (older databases)
+DROP INDEX IF EXISTS idx_properties_rooms;
+DROP INDEX IF EXISTS idx_properties_price;
+DROP INDEX IF EXISTS idx_properties_transaction_type;
+DROP INDEX IF EXISTS idx_properties_status;
 
 -- ===================================
 -- 2. CLIENTS TABLE
@@ -72,16 +79,22 @@ CREATE TABLE IF NOT EXISTS clients (
 
     -- Metadata
     phone_number VARCHAR(20) NOT NULL,  -- Who added this client
-    created_at TIMESTAMP DEFAULT NOW(),
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
     updated_at TIMESTAMP DEFAULT NOW()
 );
 
 -- Create indexes for clients
-CREATE INDEX IF NOT EXISTS idx_clients_looking_for ON clients(looking_for);
 CREATE INDEX IF NOT EXISTS idx_clients_city ON clients(city);
+-- Matcher (looking_for + status) and client search (+ city)
+CREATE INDEX IF NOT EXISTS ix_client_search ON clients(looking_for, status, city);
 CREATE INDEX IF NOT EXISTS idx_clients_min_price ON clients(min_price);
 CREATE INDEX IF NOT EXISTS idx_clients_max_price ON clients(max_price);
-CREATE INDEX IF NOT EXISTS idx_clients_status ON clients(status);
+-- Analytics: active clients created within the window
+CREATE INDEX IF NOT EXISTS ix_client_status_created ON clients(status, created_at);
+CREATE INDEX IF NOT EXISTS ix_client_created_brin ON clients USING BRIN (created_at) WITH (pages_per_range = 32);
+-- Single-column indexes the composites above replace (older databases)
+DROP INDEX IF EXISTS idx_clients_looking_for;
+DROP INDEX IF EXISTS idx_clients_status;
 
 -- ===================================
 -- 3. PHOTOS TABLE
@@ -92,12 +105,12 @@ CREATE TABLE IF NOT EXISTS photos (
     property_id INTEGER NOT NULL REFERENCES properties(id) ON DELETE CASCADE,
 
     -- Photo storage (Supabase Storage URLs)
-    file_path VARCHAR(500) NOT NULL,
-    twilio_media_url VARCHAR(500),
+    file_path VARCHAR(260) NOT NULL,
+    twilio_media_url VARCHAR(300),
     media_content_type VARCHAR(50),
 
     -- Metadata
-    created_at TIMESTAMP DEFAULT NOW()
+    created_at TIMESTAMP NOT NULL DEFAULT NOW()
 );
 
 -- Create index for photos
@@ -118,7 +131,7 @@ CREATE TABLE IF NOT EXISTS matches (
     status VARCHAR(20) DEFAULT 'suggested',  -- suggested, sent, interested, rejected, closed
 
     -- Metadata
-    suggested_at TIMESTAMP DEFAULT NOW(),
+    suggested_at TIMESTAMP NOT NULL DEFAULT NOW(),
     updated_at TIMESTAMP DEFAULT NOW()
 );
 
@@ -126,6 +139,8 @@ CREATE TABLE IF NOT EXISTS matches (
 CREATE INDEX IF NOT EXISTS idx_matches_property_id ON matches(property_id);
 CREATE INDEX IF NOT EXISTS idx_matches_client_id ON matches(client_id);
 CREATE INDEX IF NOT EXISTS idx_matches_status ON matches(status);
+-- Analytics date windows
+CREATE INDEX IF NOT EXISTS ix_match_suggested_brin ON matches USING BRIN (suggested_at) WITH (pages_per_range = 32);
 
 -- ===================================
 -- 5. CONVERSATIONS TABLE
@@ -138,12 +153,35 @@ CREATE TABLE IF NOT EXISTS conversations (
     content TEXT NOT NULL,
 
     -- Metadata
-    timestamp TIMESTAMP DEFAULT NOW()
+    timestamp TIMESTAMP NOT NULL DEFAULT NOW()
 );
 
 -- Create indexes for conversations
 CREATE INDEX IF NOT EXISTS idx_conversations_phone_number ON conversations(phone_number);
-CREATE INDEX IF NOT EXISTS idx_conversations_timestamp ON conversations(timestamp);
+CREATE INDEX IF NOT EXISTS ix_conv_phone_ts ON conversations(phone_number, timestamp DESC);
+-- Replaced by ix_conv_phone_ts (older databases)
+DROP INDEX IF EXISTS idx_conversations_timestamp;
+
+-- ===================================
+-- PHOTO FOREIGN KEY (older databases)
+-- ===================================
+-- Databases created before photos.property_id referenced properties can hold
+-- orphaned photo rows; drop them and add the cascading key so none accumulate
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint
+        WHERE conrelid = 'photos'::regclass
+            AND confrelid = 'properties'::regclass
+            AND contype = 'f'
+    ) THEN
+        DELETE FROM photos ph
+        WHERE NOT EXISTS (SELECT 1 FROM properties p WHERE p.id = ph.property_id);
+
+        ALTER TABLE photos ADD CONSTRAINT fk_photos_property
+            FOREIGN KEY (property_id) REFERENCES properties(id) ON DELETE CASCADE;
+    END IF;
+END $$;
 
 -- ===================================
 -- TRIGGERS FOR UPDATED_AT
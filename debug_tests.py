@@ -2,7 +2,11 @@
 🔍 בדיקות שיטתיות לאיתור בעיות בבוט
 הרץ כל פונקציה בנפרד לזהות איפה הבעיה
 """
+import io
 import logging
+import sys
+from functools import cache
+from concurrent.futures import ThreadPoolExecutor
 
 # הגדר לוגים מפורטים
 logging.basicConfig(
@@ -12,13 +16,20 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def test_1_database_connection():
+@cache
+def _get_orchestrator():
+    """Orchestrator shared by tests 3 and 5 (built once, reuses its LLM clients)."""
+    from crews.orchestrator import CrewAIOrchestrator
+    return CrewAIOrchestrator()
+
+
+def test_1_database_connection(out=None):
     """
     📊 בדיקה 1: חיבור למסד נתונים
     """
-    print("\n" + "="*60)
-    print("📊 בדיקה 1: חיבור למסד נתונים")
-    print("="*60)
+    print("\n" + "="*60, file=out)
+    print("📊 בדיקה 1: חיבור למסד נתונים", file=out)
+    print("="*60, file=out)
 
     try:
         from database.connection import get_session
@@ -28,23 +39,23 @@ def test_1_database_connection():
             properties_count = session.query(Property).count()
             clients_count = session.query(Client).count()
 
-        print(f"✅ חיבור למסד נתונים תקין!")
-        print(f"   נכסים: {properties_count}")
-        print(f"   לקוחות: {clients_count}")
+        print(f"✅ חיבור למסד נתונים תקין!", file=out)
+        print(f"   נכסים: {properties_count}", file=out)
+        print(f"   לקוחות: {clients_count}", file=out)
         return True
 
     except Exception as e:
-        print(f"❌ שגיאה בחיבור למסד נתונים: {e}")
+        print(f"❌ שגיאה בחיבור למסד נתונים: {e}", file=out)
         return False
 
 
-def test_2_openai_connection():
+def test_2_openai_connection(out=None):
     """
     🤖 בדיקה 2: חיבור ל-OpenAI
     """
-    print("\n" + "="*60)
-    print("🤖 בדיקה 2: חיבור ל-OpenAI")
-    print("="*60)
+    print("\n" + "="*60, file=out)
+    print("🤖 בדיקה 2: חיבור ל-OpenAI", file=out)
+    print("="*60, file=out)
 
     try:
         from config import settings
@@ -60,12 +71,12 @@ def test_2_openai_connection():
         )
 
         result = response.choices[0].message.content
-        print(f"✅ חיבור ל-OpenAI תקין!")
-        print(f"   תשובה: {result}")
+        print(f"✅ חיבור ל-OpenAI תקין!", file=out)
+        print(f"   תשובה: {result}", file=out)
         return True
 
     except Exception as e:
-        print(f"❌ שגיאה בחיבור ל-OpenAI: {e}")
+        print(f"❌ שגיאה בחיבור ל-OpenAI: {e}", file=out)
         return False
 
 
@@ -78,9 +89,7 @@ def test_3_manager_agent():
     print("="*60)
 
     try:
-        from crews.orchestrator import CrewAIOrchestrator
-
-        orchestrator = CrewAIOrchestrator()
+        orchestrator = _get_orchestrator()
 
         test_messages = [
             ("דירה 3 חדרים בתל אביב 5000 שקל", "ADD_PROPERTY"),
@@ -88,9 +97,12 @@ def test_3_manager_agent():
             ("שלום", "GENERAL"),
         ]
 
-        for message, expected in test_messages:
+        # הסיווגים בלתי תלויים - שולחים את כולם במקביל
+        with ThreadPoolExecutor(max_workers=len(test_messages)) as executor:
+            intents = list(executor.map(orchestrator.classify_intent, [m for m, _ in test_messages]))
+
+        for (message, expected), intent in zip(test_messages, intents):
             print(f"\n   בודק: '{message[:30]}...'")
-            intent = orchestrator.classify_intent(message)
             status = "✅" if intent == expected else "⚠️"
             print(f"   {status} כוונה: {intent} (צפוי: {expected})")
 
@@ -158,9 +170,7 @@ def test_5_orchestrator_full_flow():
     print("="*60)
 
     try:
-        from crews.orchestrator import CrewAIOrchestrator
-
-        orchestrator = CrewAIOrchestrator()
+        orchestrator = _get_orchestrator()
 
         test_message = "דירה 2 חדרים בירושלים 4500 שקל להשכרה"
         phone = "0509999999"
@@ -195,13 +205,13 @@ def test_5_orchestrator_full_flow():
         return False
 
 
-def test_6_twilio_credentials():
+def test_6_twilio_credentials(out=None):
     """
     📱 בדיקה 6: Twilio Credentials
     """
-    print("\n" + "="*60)
-    print("📱 בדיקה 6: Twilio Credentials")
-    print("="*60)
+    print("\n" + "="*60, file=out)
+    print("📱 בדיקה 6: Twilio Credentials", file=out)
+    print("="*60, file=out)
 
     try:
         from config import settings
@@ -215,13 +225,13 @@ def test_6_twilio_credentials():
         # בדוק שהחשבון קיים
         account = client.api.accounts(settings.TWILIO_ACCOUNT_SID).fetch()
 
-        print(f"✅ Twilio Credentials תקינים!")
-        print(f"   Account Status: {account.status}")
-        print(f"   WhatsApp Number: {settings.TWILIO_WHATSAPP_NUMBER}")
+        print(f"✅ Twilio Credentials תקינים!", file=out)
+        print(f"   Account Status: {account.status}", file=out)
+        print(f"   WhatsApp Number: {settings.TWILIO_WHATSAPP_NUMBER}", file=out)
         return True
 
     except Exception as e:
-        print(f"❌ שגיאה ב-Twilio: {e}")
+        print(f"❌ שגיאה ב-Twilio: {e}", file=out)
         return False
 
 
@@ -277,23 +287,41 @@ def run_all_tests():
     print("      מתחיל בדיקות שיטתיות")
     print("🚀"*30)
 
-    results = {}
+    # בדיקות בלתי תלויות (רשת / מסד נתונים) רצות במקביל; הפלט של כל אחת
+    # נאסף בבאפר משלה ומודפס בסדר קבוע, כדי שהשורות לא יתערבבו
+    probes = (
+        ('1. Database', test_1_database_connection),
+        ('2. OpenAI', test_2_openai_connection),
+        ('6. Twilio', test_6_twilio_credentials),
+    )
+    buffers = {name: io.StringIO() for name, _ in probes}
+    with ThreadPoolExecutor(max_workers=len(probes)) as executor:
+        independent = {name: executor.submit(test, buffers[name]) for name, test in probes}
+        independent_results = {name: future.result() for name, future in independent.items()}
+
+    for buffer in buffers.values():
+        sys.stdout.write(buffer.getvalue())
+
+    results = {
+        '1. Database': independent_results['1. Database'],
+        '2. OpenAI': independent_results['2. OpenAI'],
+    }
 
     # בדיקות בסיסיות קודם
-    results['1. Database'] = test_1_database_connection()
     if not results['1. Database']:
         print("\n⛔ עצור! תקן את הבעיה במסד הנתונים לפני שממשיכים")
         return results
 
-    results['2. OpenAI'] = test_2_openai_connection()
     if not results['2. OpenAI']:
         print("\n⛔ עצור! תקן את הבעיה ב-OpenAI לפני שממשיכים")
         return results
 
+    # בדיקות 3-5 תלויות ב-1 וב-2 ורצות ברצף
     results['3. Manager Agent'] = test_3_manager_agent()
     results['4. Property Crew'] = test_4_property_crew_response()
     results['5. Orchestrator'] = test_5_orchestrator_full_flow()
-    results['6. Twilio'] = test_6_twilio_credentials()
+    results['6. Twilio'] = independent_results['6. Twilio']
+    # בדיקה 7 בונה orchestrator ושולחת ל-webhook - רק אחרי שהבדיקות הבסיסיות עברו
     results['7. Webhook'] = test_7_webhook_simulation()
 
     # סיכום
@@ -316,8 +344,6 @@ def run_all_tests():
 
 
 if __name__ == "__main__":
-    import sys
-
     if len(sys.argv) > 1:
         # הרץ בדיקה ספציפית
         test_num = sys.argv[1]
@@ -9,7 +9,6 @@ This script:
 import os
 import sys
 import logging
-from config import settings
 
 # Fix Windows console encoding for Unicode characters
 if sys.platform == 'win32':
@@ -21,24 +20,30 @@ if sys.platform == 'win32':
         # For older Python versions, use environment variable
         os.environ['PYTHONIOENCODING'] = 'utf-8'
 
-# Configure logging
-logging.basicConfig(
-    level=getattr(logging, settings.LOG_LEVEL),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 
+def _configure_logging():
+    """Configure root logging from settings (called once from main())."""
+    from config import settings
+
+    logging.basicConfig(
+        level=getattr(logging, settings.LOG_LEVEL),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+
 def initialize_database():
     """Initialize database (create tables if they don't exist)."""
+    from config import settings
     from database.init_db import init_database
 
     logger.info("Initializing database...")
 
     try:
         # Create tables (doesn't recreate if they exist)
-        # Set seed=True to add Hebrew test data on first run
-        init_database(seed=True)
+        # Hebrew test data is only seeded when SEED_ON_STARTUP is on (development default)
+        init_database(seed=settings.SEED_ON_STARTUP)
         logger.info("Database initialized successfully")
         return True
     except Exception as e:
@@ -48,8 +53,8 @@ def initialize_database():
 
 def start_development_server():
     """Start development server with ngrok."""
+    from config import settings
     from ngrok_setup import start_ngrok
-    import subprocess
     import time
 
     logger.info("Starting development environment...")
@@ -99,16 +104,45 @@ def start_production_server():
     print(f"Webhook URL: https://your-domain.com/webhook")
     print("="*70 + "\n")
 
+    port = os.getenv('PORT', '5000')
+
+    # Prefer gunicorn (same settings as the Procfile); the webhook only
+    # enqueues work, so threaded workers keep many requests in flight
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        logger.warning("gunicorn not installed, falling back to Flask's threaded server")
+    else:
+        # Run it as a module of this interpreter: the gunicorn script may not be on PATH
+        try:
+            os.execv(sys.executable, [
+                sys.executable, '-m', 'gunicorn',
+                '--bind', f'0.0.0.0:{port}',
+                '--workers', '2',
+                '--threads', '8',
+                '--timeout', '120',
+                '--keep-alive', '5',
+                '--worker-class', 'gthread',
+                'bot.twilio_handler:app',
+            ])
+        except OSError as e:
+            logger.warning(f"Could not start gunicorn ({e}), falling back to Flask's threaded server")
+
     from bot.twilio_handler import app
     app.run(
         host='0.0.0.0',
-        port=int(os.getenv('PORT', 5000)),
-        debug=False
+        port=int(port),
+        debug=False,
+        threaded=True
     )
 
 
 def main():
     """Main entry point."""
+    from config import settings
+
+    _configure_logging()
+
     print("""
     ╔══════════════════════════════════════════════════════════════════╗
     ║                                                                  ║
@@ -2,116 +2,212 @@
 ngrok setup helper for development.
 Starts ngrok tunnel and prints webhook URL.
 """
+import asyncio
+import hashlib
+import shutil
 import subprocess
 import requests
+from requests.adapters import HTTPAdapter
 import time
 import sys
 import os
+from pathlib import Path
 from config import settings
 
+try:
+    import psutil
+except ImportError:
+    psutil = None
 
-def start_ngrok(port=5000):
+NGROK_API_URL = 'http://localhost:4040/api/tunnels'
+
+# Single keep-alive connection for every call to the local ngrok API
+_SESSION = requests.Session()
+_SESSION.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=1, max_retries=0))
+
+# Records (as a hash) the auth token last registered with ngrok
+AUTHTOKEN_MARKER = Path.home() / '.ngrok2' / 'authtoken.set'
+
+# Printed once the tunnel is up (single write instead of a print per line)
+_SEPARATOR = "=" * 70
+_TUNNEL_BANNER = f"""
+{_SEPARATOR}
+✅ ngrok tunnel started successfully!
+{_SEPARATOR}
+
+📍 Public URL: {{public_url}}
+📍 Webhook URL: {{webhook_url}}
+📍 ngrok Dashboard: http://localhost:4040
+
+{_SEPARATOR}
+🔧 Twilio Configuration:
+{_SEPARATOR}
+
+1. Go to: https://console.twilio.com/us1/develop/sms/settings/whatsapp-sandbox
+
+2. Set 'When a message comes in' to:
+   {{webhook_url}}
+
+3. Click 'Save'
+
+4. Send your join code to the sandbox number
+
+{_SEPARATOR}
+📱 Testing:
+{_SEPARATOR}
+
+Send these messages to test:
+  • "שלום" - Greeting
+  • "דירה 3 חדרים בתל אביב 5000 שקל להשכרה" - Add property
+  • "לקוח חדש יניב מחפש 2 חדרים עד 6000" - Add client
+
+{_SEPARATOR}
+⚠️  Keep this terminal open while testing!
+{_SEPARATOR}
+"""
+
+
+def _wait_for_ngrok_api(timeout=10.0, interval=0.1):
     """
-    Start ngrok tunnel on specified port.
+    Poll the ngrok local API until it reports a tunnel.
 
     Args:
-        port: Local port to tunnel (default: 5000)
+        timeout: Seconds to wait before giving up (default: 10)
+        interval: Seconds between polls (default: 0.1)
 
     Returns:
-        Public webhook URL
+        List of tunnel dicts from the API
+
+    Raises:
+        requests.exceptions.RequestException: If no tunnel appears in time
     """
-    print(f"Starting ngrok tunnel on port {port}...")
+    deadline = time.monotonic() + timeout
+    last_error = None
 
-    # Check if ngrok is installed
-    try:
-        subprocess.run(['ngrok', 'version'], capture_output=True, check=True)
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        print("❌ ngrok is not installed!")
-        print("\nInstall ngrok:")
-        print("  Windows: choco install ngrok")
-        print("  Mac: brew install ngrok")
-        print("  Or download from: https://ngrok.com/download")
-        sys.exit(1)
+    while time.monotonic() < deadline:
+        try:
+            response = _SESSION.get(NGROK_API_URL, timeout=0.5)
+            response.raise_for_status()
+            tunnels = response.json().get('tunnels')
+            if tunnels:
+                return tunnels
+        except (requests.exceptions.RequestException, ValueError) as e:
+            # API not up yet (connection refused) or mid-startup response
+            last_error = e
+        time.sleep(interval)
 
-    # Set auth token if available
-    if settings.NGROK_AUTH_TOKEN:
-        print("Setting ngrok auth token...")
-        subprocess.run(
-            ['ngrok', 'config', 'add-authtoken', settings.NGROK_AUTH_TOKEN],
-            capture_output=True
-        )
+    raise requests.exceptions.RequestException(
+        f"No ngrok tunnel after {timeout:g}s" + (f" ({last_error})" if last_error else "")
+    )
 
-    # Kill existing ngrok processes
-    try:
+
+def _kill_ngrok(timeout=2.0):
+    """
+    Terminate running ngrok processes and wait until they have exited.
+
+    Uses psutil when installed (no helper process; waiting is event-driven
+    rather than a fixed sleep), otherwise falls back to taskkill/pkill.
+
+    Args:
+        timeout: Seconds to wait for a clean exit before force-killing
+    """
+    if psutil is None:
         if os.name == 'nt':  # Windows
             subprocess.run(['taskkill', '/F', '/IM', 'ngrok.exe'], capture_output=True)
         else:  # Unix/Mac
             subprocess.run(['pkill', 'ngrok'], capture_output=True)
         time.sleep(1)
-    except Exception:
+        return
+
+    victims = []
+    for proc in psutil.process_iter(['name']):
+        if proc.info['name'] in ('ngrok', 'ngrok.exe'):
+            try:
+                proc.terminate()
+                victims.append(proc)
+            except psutil.NoSuchProcess:
+                pass
+
+    _, alive = psutil.wait_procs(victims, timeout=timeout)
+    for proc in alive:
+        try:
+            proc.kill()
+        except psutil.NoSuchProcess:
+            pass
+
+
+def _register_authtoken():
+    """Register NGROK_AUTH_TOKEN with ngrok (skipped when this token was already registered)."""
+    if not settings.NGROK_AUTH_TOKEN:
+        return
+
+    token_hash = hashlib.sha256(settings.NGROK_AUTH_TOKEN.encode()).hexdigest()
+    try:
+        if AUTHTOKEN_MARKER.read_text().strip() == token_hash:
+            return
+    except OSError:
         pass
 
-    # Start ngrok
-    print("Starting ngrok process...")
-    ngrok_process = subprocess.Popen(
-        ['ngrok', 'http', str(port)],
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL
+    print("Setting ngrok auth token...")
+    result = subprocess.run(
+        ['ngrok', 'config', 'add-authtoken', settings.NGROK_AUTH_TOKEN],
+        capture_output=True
     )
+    if result.returncode == 0:
+        try:
+            AUTHTOKEN_MARKER.parent.mkdir(parents=True, exist_ok=True)
+            AUTHTOKEN_MARKER.write_text(token_hash)
+        except OSError:
+            pass
 
-    # Wait for ngrok to start
-    print("Waiting for ngrok to initialize...")
-    time.sleep(3)
 
-    # Get public URL from ngrok API
+def _kill_stale_ngrok():
+    """Kill ngrok processes left over from a previous run (best effort)."""
     try:
-        response = requests.get('http://localhost:4040/api/tunnels', timeout=5)
-        response.raise_for_status()
+        _kill_ngrok()
+    except Exception:
+        pass
+
+
+async def _prepare_ngrok(port):
+    """Check the ngrok install, then register the auth token and kill stale ngrok processes concurrently."""
+    print(f"Starting ngrok tunnel on port {port}...")
+
+    # Check if ngrok is installed (PATH lookup; a broken binary fails at startup below)
+    if shutil.which('ngrok') is None:
+        print("❌ ngrok is not installed!")
+        print("\nInstall ngrok:")
+        print("  Windows: choco install ngrok")
+        print("  Mac: brew install ngrok")
+        print("  Or download from: https://ngrok.com/download")
+        sys.exit(1)
 
-        tunnels = response.json()['tunnels']
+    # Independent blocking steps: the token only touches ngrok's config file
+    await asyncio.gather(
+        asyncio.to_thread(_register_authtoken),
+        asyncio.to_thread(_kill_stale_ngrok)
+    )
 
-        if not tunnels:
-            raise Exception("No tunnels found")
 
-        # Get HTTPS URL
-        public_url = None
-        for tunnel in tunnels:
-            if tunnel['proto'] == 'https':
-                public_url = tunnel['public_url']
-                break
+def _report_tunnel():
+    """
+    Wait for the freshly started ngrok to publish a tunnel and print setup instructions.
 
-        if not public_url:
-            public_url = tunnels[0]['public_url']
+    Returns:
+        Public URL (exits the process if no tunnel comes up)
+    """
+    # Wait for ngrok to start, then get public URL from ngrok API
+    print("Waiting for ngrok to initialize...")
+    try:
+        tunnels = _wait_for_ngrok_api()
+
+        # Prefer the HTTPS tunnel
+        public_url = next((t['public_url'] for t in tunnels if t['proto'] == 'https'), tunnels[0]['public_url'])
 
         webhook_url = f"{public_url}/webhook"
 
-        print("\n" + "="*70)
-        print("✅ ngrok tunnel started successfully!")
-        print("="*70)
-        print(f"\n📍 Public URL: {public_url}")
-        print(f"📍 Webhook URL: {webhook_url}")
-        print(f"📍 ngrok Dashboard: http://localhost:4040")
-
-        print("\n" + "="*70)
-        print("🔧 Twilio Configuration:")
-        print("="*70)
-        print("\n1. Go to: https://console.twilio.com/us1/develop/sms/settings/whatsapp-sandbox")
-        print("\n2. Set 'When a message comes in' to:")
-        print(f"   {webhook_url}")
-        print("\n3. Click 'Save'")
-        print("\n4. Send your join code to the sandbox number")
-
-        print("\n" + "="*70)
-        print("📱 Testing:")
-        print("="*70)
-        print("\nSend these messages to test:")
-        print('  • "שלום" - Greeting')
-        print('  • "דירה 3 חדרים בתל אביב 5000 שקל להשכרה" - Add property')
-        print('  • "לקוח חדש יניב מחפש 2 חדרים עד 6000" - Add client')
-
-        print("\n" + "="*70)
-        print("⚠️  Keep this terminal open while testing!")
-        print("="*70)
+        sys.stdout.write(_TUNNEL_BANNER.format(public_url=public_url, webhook_url=webhook_url))
+        sys.stdout.flush()
 
         return public_url
 
@@ -122,14 +218,82 @@ def start_ngrok(port=5000):
         sys.exit(1)
 
 
+async def start_ngrok_async(port=5000):
+    """
+    Start ngrok tunnel on specified port.
+
+    The process is left running in the background; stop it with stop_ngrok().
+
+    Args:
+        port: Local port to tunnel (default: 5000)
+
+    Returns:
+        Public webhook URL
+    """
+    await _prepare_ngrok(port)
+
+    # Plain Popen, not an asyncio child: the event loop's subprocess
+    # transport would kill ngrok when the loop closes
+    print("Starting ngrok process...")
+    subprocess.Popen(
+        ['ngrok', 'http', str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+
+    return await asyncio.to_thread(_report_tunnel)
+
+
+def start_ngrok(port=5000):
+    """
+    Start ngrok tunnel on specified port (blocking wrapper for start_ngrok_async()).
+
+    Args:
+        port: Local port to tunnel (default: 5000)
+
+    Returns:
+        Public webhook URL
+    """
+    return asyncio.run(start_ngrok_async(port))
+
+
+async def _run_ngrok(port=5000):
+    """
+    Run ngrok as a supervised child until it exits or the task is cancelled.
+
+    Used when this module is run directly: waiting on the child is
+    event-driven, so an ngrok crash is reported immediately and the idle
+    process never wakes up on its own.
+
+    Args:
+        port: Local port to tunnel (default: 5000)
+    """
+    await _prepare_ngrok(port)
+
+    print("Starting ngrok process...")
+    proc = await asyncio.create_subprocess_exec(
+        'ngrok', 'http', str(port),
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.DEVNULL
+    )
+
+    try:
+        await asyncio.to_thread(_report_tunnel)
+        print("\nPress Ctrl+C to stop ngrok...")
+        returncode = await proc.wait()
+        print(f"\n❌ ngrok exited unexpectedly (exit code {returncode})")
+    finally:
+        if proc.returncode is None:
+            proc.terminate()
+            await proc.wait()
+
+
 def stop_ngrok():
     """Stop ngrok tunnel."""
     print("Stopping ngrok...")
     try:
-        if os.name == 'nt':  # Windows
-            subprocess.run(['taskkill', '/F', '/IM', 'ngrok.exe'])
-        else:  # Unix/Mac
-            subprocess.run(['pkill', 'ngrok'])
+        _kill_ngrok()
+        _SESSION.close()
         print("✅ ngrok stopped")
     except Exception as e:
         print(f"Error stopping ngrok: {e}")
@@ -137,11 +301,7 @@ def stop_ngrok():
 
 if __name__ == '__main__':
     try:
-        start_ngrok()
-        print("\nPress Ctrl+C to stop ngrok...")
-        # Keep running
-        while True:
-            time.sleep(1)
+        asyncio.run(_run_ngrok())
     except KeyboardInterrupt:
         print("\n\nStopping ngrok...")
         stop_ngrok()
@@ -1,13 +1,6 @@
 """
 Skills package for WhatsApp Real Estate Bot
 """
-from .supabase_skill import (
-    skill,
-    execute_sql,
-    get_analytics,
-    generate_report,
-    get_storage_info
-)
 
 __all__ = [
     'skill',
@@ -16,3 +9,12 @@ __all__ = [
     'generate_report',
     'get_storage_info'
 ]
+
+
+def __getattr__(name):
+    # Import the Supabase stack only when an export is used, so lightweight
+    # submodules (e.g. skills._cache for the CLI) load without it
+    if name in __all__:
+        from . import supabase_skill
+        return getattr(supabase_skill, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
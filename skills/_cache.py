@@ -0,0 +1,103 @@
+"""
+On-disk cache for Supabase skill CLI results.
+
+Read-only CLI commands (analytics, reports, storage, performance,
+satisfaction) store their JSON result keyed by command and arguments, so
+re-running the same command within the TTL skips the database round trip.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+from functools import wraps
+from pathlib import Path
+
+CACHE_DIR = Path(os.getenv('SUPABASE_SKILL_CACHE_DIR', Path.home() / '.cache' / 'supabase_skill'))
+
+# Cleared by the CLI's --no-cache flag
+enabled = True
+
+# Returned by get() on a miss (None is a valid cached result)
+MISS = object()
+
+
+def _path(key: str) -> Path:
+    return CACHE_DIR / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json"
+
+
+def get(key: str):
+    """
+    Return the cached result for a key.
+
+    Args:
+        key: Cache key
+
+    Returns:
+        Cached payload, or MISS if absent, expired or unreadable
+    """
+    try:
+        with open(_path(key), encoding='utf-8') as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return MISS
+
+    # Anything but a {'ts', 'ttl', 'payload'} object is a foreign or corrupt file
+    try:
+        expired = time.time() - entry['ts'] > entry['ttl']
+    except (KeyError, TypeError):
+        return MISS
+
+    if expired:
+        return MISS
+    return entry.get('payload')
+
+
+def put(key: str, obj, ttl: float):
+    """
+    Store a result for `ttl` seconds (atomic replace; failures are ignored).
+
+    Args:
+        key: Cache key
+        obj: JSON-serializable result (other values are stored via str())
+        ttl: Seconds the entry stays valid
+    """
+    tmp_path = None
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'ts': time.time(), 'ttl': ttl, 'payload': obj}, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, _path(key))
+    except (OSError, TypeError, ValueError):
+        # Don't leave a half-written temp file behind
+        if tmp_path is not None:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+
+def cached(ttl: float = 60):
+    """
+    Cache a CLI handler's result by handler name and arguments.
+
+    Args:
+        ttl: Seconds a result stays valid (default: 60)
+    """
+    def decorator(handler):
+        @wraps(handler)
+        def wrapper(args):
+            if not enabled:
+                return handler(args)
+
+            key = f"{handler.__name__}|{json.dumps(args, sort_keys=True)}"
+            result = get(key)
+            if result is MISS:
+                result = handler(args)
+                # Skill methods report failures as {"error": ...}; don't keep those
+                if not (isinstance(result, dict) and 'error' in result):
+                    put(key, result, ttl)
+            return result
+        return wrapper
+    return decorator
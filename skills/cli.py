@@ -5,75 +5,221 @@ Usage: python skills/cli.py [command] [options]
 """
 import sys
 import json
+from collections.abc import Iterator
 from pathlib import Path
 
-# Add project root to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
+_PROJECT_ROOT = str(Path(__file__).parent.parent)
 
-from skills.supabase_skill import skill
+try:
+    import orjson
+
+    def _dump(obj, indent=True) -> bytes:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option, default=str)
+except ImportError:
+    def _dump(obj, indent=True) -> bytes:
+        return json.dumps(obj, indent=2 if indent else None, default=str, ensure_ascii=False).encode('utf-8')
+
+
+def _write_json(obj):
+    """Write a result as pretty-printed UTF-8 JSON straight to stdout's byte stream."""
+    sys.stdout.flush()  # keep ordering with anything print()ed before
+    sys.stdout.buffer.write(_dump(obj) + b"\n")
+    sys.stdout.buffer.flush()
+
+
+def _write_json_stream(rows):
+    """
+    Write rows as a JSON array one row at a time (constant memory).
+
+    The opening bracket goes out with the first row, so a failure before any
+    row is fetched leaves stdout empty rather than holding a dangling "[".
+    """
+    out = sys.stdout.buffer
+    sys.stdout.flush()
+    separator = b"[\n  "
+    for row in rows:
+        line = _dump(row, indent=False)
+        out.write(separator)
+        out.write(line)
+        separator = b",\n  "
+    out.write(b"[]\n" if separator == b"[\n  " else b"\n]\n")
+    out.flush()
+
+
+def _bootstrap_path():
+    """Put the project root on sys.path (only once a command actually runs)."""
+    if _PROJECT_ROOT not in sys.path:
+        sys.path.insert(0, _PROJECT_ROOT)
+
+
+def _get_skill():
+    """Import the Supabase skill on first use, so help and usage errors stay fast."""
+    _bootstrap_path()
+    from skills.supabase_skill import skill
+    return skill
+
+
+class _UsageError(Exception):
+    """Bad command arguments; the message is the usage line to print."""
+
+
+def _call(command, args):
+    """
+    Run a command's handler.
+
+    Read-only commands go through the on-disk result cache, and transient
+    network/database failures are retried with backoff.
+    """
+    _bootstrap_path()
+    from skills import _cache
+    from utils.retry import is_transient, retry
+
+    handler = COMMANDS[command]
+    if command in CACHED_COMMANDS:
+        handler = _cache.cached(ttl=60)(handler)
+    return retry(lambda: handler(args), retryable=is_transient)
+
+
+def _cmd_analytics(args):
+    analytics_type = args[0] if args else "properties"
+    skill = _get_skill()
+
+    if analytics_type == "properties":
+        city = args[1] if len(args) > 1 else None
+        return skill.get_property_analytics(city=city)
+    if analytics_type == "clients":
+        return skill.get_client_analytics()
+    if analytics_type == "matches":
+        return skill.get_match_analytics()
+    return None
+
+
+def _cmd_report(args):
+    report_type = args[0] if args else "properties"
+    return _get_skill().generate_report(report_type)
+
+
+def _cmd_sql(args):
+    stream = "--no-stream" not in args
+    args = [arg for arg in args if arg != "--no-stream"]
+    if not args:
+        raise _UsageError("Usage: python skills/cli.py sql \"SELECT * FROM properties LIMIT 10\" [--no-stream]")
+
+    skill = _get_skill()
+    if stream:
+        return skill.iter_sql_query(args[0])
+    return skill.execute_sql_query(args[0])
+
+
+def _cmd_storage(args):
+    return _get_skill().get_storage_stats()
+
+
+def _cmd_performance(args):
+    limit = int(args[0]) if args else 10
+    return _get_skill().get_property_performance(limit=limit)
+
+
+def _cmd_satisfaction(args):
+    limit = int(args[0]) if args else 10
+    return _get_skill().get_client_satisfaction(limit=limit)
+
+
+def _cmd_batch(args):
+    """
+    Run several commands concurrently and return {spec: result}.
+
+    Specs are comma-separated, with arguments after colons:
+    analytics:clients,storage,performance:5
+    """
+    if not args:
+        raise _UsageError("Usage: python skills/cli.py batch analytics,storage,performance:5")
+
+    specs = [spec for spec in args[0].split(",") if spec]
+    parsed = []
+    for spec in specs:
+        name, *cmd_args = spec.split(":")
+        if name not in COMMANDS or name == "batch":
+            raise _UsageError(f"Unknown command in batch: {name}")
+        parsed.append((spec, name, cmd_args))
+
+    import asyncio
+
+    # Import once up front; all tasks then share the same skill and DB pool
+    _get_skill()
+
+    def run(name, cmd_args):
+        # Streamed results (sql) are collected so they fit in the combined object
+        result = _call(name, cmd_args)
+        return list(result) if isinstance(result, Iterator) else result
+
+    async def run_all():
+        return await asyncio.gather(
+            *(asyncio.to_thread(run, name, cmd_args) for _, name, cmd_args in parsed),
+            return_exceptions=True
+        )
+
+    results = asyncio.run(run_all())
+    return {
+        spec: {"error": str(result)} if isinstance(result, Exception) else result
+        for (spec, _, _), result in zip(parsed, results)
+    }
+
+
+# Command name -> handler(args); each returns the result to print
+COMMANDS = {
+    "analytics": _cmd_analytics,
+    "report": _cmd_report,
+    "sql": _cmd_sql,
+    "storage": _cmd_storage,
+    "performance": _cmd_performance,
+    "satisfaction": _cmd_satisfaction,
+    "batch": _cmd_batch,
+}
+
+# Commands that return preformatted text instead of JSON-serializable data
+TEXT_COMMANDS = {"report"}
+
+# Read-only commands whose results are cached on disk (never sql)
+CACHED_COMMANDS = {"analytics", "report", "storage", "performance", "satisfaction"}
 
 
 def main():
-    if len(sys.argv) < 2:
+    if len(sys.argv) < 2 or sys.argv[1] == "help":
+        print_help()
+        return
+
+    command, args = sys.argv[1], sys.argv[2:]
+    if command not in COMMANDS:
+        print(f"Unknown command: {command}")
         print_help()
         return
 
-    command = sys.argv[1]
+    if "--no-cache" in args:
+        args.remove("--no-cache")
+        _bootstrap_path()
+        from skills import _cache
+        _cache.enabled = False
 
     try:
-        if command == "analytics":
-            analytics_type = sys.argv[2] if len(sys.argv) > 2 else "properties"
-            result = None
-
-            if analytics_type == "properties":
-                city = sys.argv[3] if len(sys.argv) > 3 else None
-                result = skill.get_property_analytics(city=city)
-            elif analytics_type == "clients":
-                result = skill.get_client_analytics()
-            elif analytics_type == "matches":
-                result = skill.get_match_analytics()
-
-            print(json.dumps(result, indent=2, default=str))
-
-        elif command == "report":
-            report_type = sys.argv[2] if len(sys.argv) > 2 else "properties"
-            result = skill.generate_report(report_type)
-            print(result)
-
-        elif command == "sql":
-            if len(sys.argv) < 3:
-                print("Usage: python skills/cli.py sql \"SELECT * FROM properties LIMIT 10\"")
-                return
-
-            query = sys.argv[2]
-            result = skill.execute_sql_query(query)
-            print(json.dumps(result, indent=2, default=str))
-
-        elif command == "storage":
-            result = skill.get_storage_stats()
-            print(json.dumps(result, indent=2, default=str))
-
-        elif command == "performance":
-            limit = int(sys.argv[2]) if len(sys.argv) > 2 else 10
-            result = skill.get_property_performance(limit=limit)
-            print(json.dumps(result, indent=2, default=str))
-
-        elif command == "satisfaction":
-            limit = int(sys.argv[2]) if len(sys.argv) > 2 else 10
-            result = skill.get_client_satisfaction(limit=limit)
-            print(json.dumps(result, indent=2, default=str))
-
-        elif command == "help":
-            print_help()
-
-        else:
-            print(f"Unknown command: {command}")
-            print_help()
-
+        result = _call(command, args)
+        if isinstance(result, Iterator):
+            # Rows are fetched while writing, so errors surface here too
+            _write_json_stream(result)
+            return
+    except _UsageError as e:
+        print(e)
+        return
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
 
+    if command in TEXT_COMMANDS:
+        print(result)
+    else:
+        _write_json(result)
+
 
 def print_help():
     help_text = """
@@ -90,7 +236,7 @@ Commands:
     Types: properties, clients, matches, monthly
     Example: python skills/cli.py report monthly
 
-  sql "query"                Execute SQL query
+  sql "query" [--no-stream]  Execute SQL query (rows are streamed unless --no-stream)
     Example: python skills/cli.py sql "SELECT * FROM properties LIMIT 10"
 
   storage                    Get storage statistics
@@ -102,8 +248,15 @@ Commands:
   satisfaction [limit]       Get client satisfaction data
     Example: python skills/cli.py satisfaction 10
 
+  batch cmd[:arg...],...     Run several commands concurrently, one JSON object out
+    Example: python skills/cli.py batch analytics:clients,storage,performance:5
+
   help                       Show this help message
 
+Options:
+  --no-cache                 Skip the on-disk result cache (results are
+                             otherwise reused for 60 seconds; sql is never cached)
+
 Examples:
   # Get property analytics for Tel Aviv
   python skills/cli.py analytics properties "תל אביב"
@@ -117,7 +270,7 @@ Examples:
   # Get storage stats
   python skills/cli.py storage
 """
-    print(help_text)
+    sys.stdout.write(help_text)
 
 
 if __name__ == "__main__":
@@ -2,23 +2,343 @@
 Supabase Real Estate Management Skill
 Advanced database operations and analytics for WhatsApp Real Estate Bot
 """
+import functools
 import logging
-from typing import Optional, Dict, List, Any
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, List, Any, Iterator, Tuple, Union
 from datetime import datetime, timedelta
 from supabase import create_client, Client
 from sqlalchemy import text
+from sqlalchemy.sql.elements import TextClause
 
 from config import settings
-from database.connection import get_session, engine
+from crews.query_cache import TTLCache, data_version
+from database.connection import engine
+from utils.retry import is_transient
 
 logger = logging.getLogger(__name__)
 
+# Read-only guard: matches without copying/uppercasing the whole query
+_SELECT_RE = re.compile(r"\s*SELECT\b", re.I)
+
+Query = Union[str, TextClause]
+
+
+def _statement(query: Query) -> Tuple[TextClause, str]:
+    """Return the executable statement and its SQL text for a query string or text() constant."""
+    if isinstance(query, TextClause):
+        return query, query.text
+    return text(query), query
+
+
+# Analytics results shared across calls on the skill singleton
+_analytics_cache = TTLCache(maxsize=64, ttl=settings.ANALYTICS_CACHE_TTL)
+
+
+def _memoized(method):
+    """
+    Reuse a read-only analytics method's result for ANALYTICS_CACHE_TTL seconds.
+
+    The key includes the ORM data version, so a commit through the ORM in
+    this process invalidates earlier results; writes from other processes or
+    raw SQL are only bounded by the TTL. Error dicts are not cached.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (method.__name__, args, tuple(sorted(kwargs.items())), data_version())
+        result = _analytics_cache.get(key)
+        if result is None:
+            result = method(self, *args, **kwargs)
+            if not (isinstance(result, dict) and "error" in result):
+                _analytics_cache.set(key, result)
+        return result
+    return wrapper
+
+
+def _pivot_match_statuses(rows: List[Dict]) -> Dict[str, Any]:
+    """Fold per-status match rows into the overall totals row."""
+    counts = {row['status']: row['count'] for row in rows}
+    total = sum(counts.values())
+    sum_score = sum(row['sum_score'] for row in rows)
+
+    overall = {"total_matches": total, "avg_score": sum_score / total if total else None}
+    overall.update((status, counts.get(status, 0)) for status in _MATCH_STATUSES)
+    return overall
+
+
+def _label_buckets(rows: List[Dict], name: str, labels: Tuple[str, ...]) -> List[Dict]:
+    """Replace bucket ids (see _BUDGET_BUCKET / _SCORE_BUCKET) with their range labels."""
+    return [{name: labels[row['bucket']], 'count': row['count']} for row in rows]
+
+
 # Initialize Supabase client
 supabase: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
 
+# Fixed analytics queries, built once. Reusing the same text() objects keeps
+# SQLAlchemy's compiled cache warm and the statement text stable, so psycopg
+# can reuse its server-side prepared statement on each pooled connection.
+
+# Range histograms as 0-based bucket ids (labelled by _label_buckets).
+# width_bucket() is PostgreSQL-only; other dialects (the default SQLite
+# database) get the equivalent CASE ladder. NULL budgets land in the last bucket.
+if engine.dialect.name == 'postgresql':
+    _BUDGET_BUCKET = "COALESCE(width_bucket(max_price::numeric, ARRAY[3000, 5000, 7000, 10000]::numeric[]), 4)"
+    _SCORE_BUCKET = "width_bucket(score::numeric, ARRAY[50, 65, 80]::numeric[])"
+else:
+    _BUDGET_BUCKET = ("CASE WHEN max_price < 3000 THEN 0 WHEN max_price < 5000 THEN 1 "
+                      "WHEN max_price < 7000 THEN 2 WHEN max_price < 10000 THEN 3 ELSE 4 END")
+    _SCORE_BUCKET = "CASE WHEN score < 50 THEN 0 WHEN score < 65 THEN 1 WHEN score < 80 THEN 2 ELSE 3 END"
+
+# Property analytics sections. The optional city filter is a parameter
+# (NULL = all cities) rather than spliced-in SQL, so each query has a single
+# text and a single prepared plan whether or not a city is given.
+_PROPERTY_SECTIONS = {
+    "by_transaction_type": text("""
+        SELECT
+            transaction_type,
+            COUNT(*) as count,
+            AVG(price) as avg_price,
+            MIN(price) as min_price,
+            MAX(price) as max_price,
+            AVG(rooms) as avg_rooms
+        FROM properties
+        WHERE created_at >= :date_filter AND (CAST(:city AS TEXT) IS NULL OR city = :city)
+        GROUP BY transaction_type
+    """),
+    "top_cities": text("""
+        SELECT
+            city,
+            COUNT(*) as count,
+            AVG(price) as avg_price
+        FROM properties
+        WHERE created_at >= :date_filter
+        GROUP BY city
+        ORDER BY count DESC
+        LIMIT 10
+    """),
+    "by_status": text("""
+        SELECT
+            status,
+            COUNT(*) as count
+        FROM properties
+        WHERE created_at >= :date_filter AND (CAST(:city AS TEXT) IS NULL OR city = :city)
+        GROUP BY status
+    """),
+    "daily_new_listings": text("""
+        SELECT
+            DATE(created_at) as date,
+            COUNT(*) as count
+        FROM properties
+        WHERE created_at >= :date_filter AND (CAST(:city AS TEXT) IS NULL OR city = :city)
+        GROUP BY DATE(created_at)
+        ORDER BY date DESC
+    """),
+}
+
+# Same sections over mv_property_daily_stats (database/analytics_views.sql).
+# Averages are rebuilt from the per-day sums and counts; day granularity, so
+# the first day of the window is counted in full.
+_PROPERTY_VIEW_SECTIONS = {
+    "by_transaction_type": text("""
+        SELECT
+            transaction_type,
+            SUM(cnt)::bigint as count,
+            SUM(sum_price) / SUM(cnt) as avg_price,
+            MIN(min_price) as min_price,
+            MAX(max_price) as max_price,
+            SUM(sum_rooms) / NULLIF(SUM(cnt_rooms), 0) as avg_rooms
+        FROM mv_property_daily_stats
+        WHERE day >= CAST(:date_filter AS DATE) AND (CAST(:city AS TEXT) IS NULL OR city = :city)
+        GROUP BY transaction_type
+    """),
+    "top_cities": text("""
+        SELECT
+            city,
+            SUM(cnt)::bigint as count,
+            SUM(sum_price) / SUM(cnt) as avg_price
+        FROM mv_property_daily_stats
+        WHERE day >= CAST(:date_filter AS DATE)
+        GROUP BY city
+        ORDER BY count DESC
+        LIMIT 10
+    """),
+    "by_status": text("""
+        SELECT
+            NULLIF(status, '') as status,
+            SUM(cnt)::bigint as count
+        FROM mv_property_daily_stats
+        WHERE day >= CAST(:date_filter AS DATE) AND (CAST(:city AS TEXT) IS NULL OR city = :city)
+        GROUP BY status
+    """),
+    "daily_new_listings": text("""
+        SELECT
+            day as date,
+            SUM(cnt)::bigint as count
+        FROM mv_property_daily_stats
+        WHERE day >= CAST(:date_filter AS DATE) AND (CAST(:city AS TEXT) IS NULL OR city = :city)
+        GROUP BY day
+        ORDER BY date DESC
+    """),
+}
+
+_Q_PROPERTY_PERFORMANCE = text("""
+    SELECT
+        p.id,
+        p.city,
+        p.street,
+        p.rooms,
+        p.price,
+        p.transaction_type,
+        COUNT(m.id) as match_count,
+        AVG(m.score) as avg_score,
+        COUNT(*) FILTER (WHERE m.status = 'interested') as interested_count,
+        COUNT(*) FILTER (WHERE m.status = 'closed') as closed_count
+    FROM properties p
+    JOIN matches m ON p.id = m.property_id
+    WHERE p.status = 'available'
+    GROUP BY p.id, p.city, p.street, p.rooms, p.price, p.transaction_type
+    ORDER BY match_count DESC, avg_score DESC
+    LIMIT :limit
+""")
+
+_Q_CLIENT_BY_TYPE = text("""
+    SELECT
+        looking_for,
+        COUNT(*) as count,
+        AVG(max_price) as avg_budget
+    FROM clients
+    WHERE created_at >= :date_filter AND status = 'active'
+    GROUP BY looking_for
+""")
+
+_Q_CLIENT_BY_CITY = text("""
+    SELECT
+        city,
+        COUNT(*) as count
+    FROM clients
+    WHERE created_at >= :date_filter AND status = 'active' AND city IS NOT NULL
+    GROUP BY city
+    ORDER BY count DESC
+""")
+
+_Q_CLIENT_BUDGET_DISTRIBUTION = text(f"""
+    SELECT
+        {_BUDGET_BUCKET} as bucket,
+        COUNT(*) as count
+    FROM clients
+    WHERE created_at >= :date_filter AND status = 'active' AND looking_for = 'rent'
+    GROUP BY bucket
+    ORDER BY bucket
+""")
+_BUDGET_RANGES = ('Under 3,000', '3,000-5,000', '5,000-7,000', '7,000-10,000', 'Over 10,000')
+
+_Q_CLIENT_SATISFACTION = text("""
+    SELECT
+        c.id,
+        c.name,
+        c.city,
+        c.looking_for,
+        c.max_price,
+        COUNT(m.id) as match_count,
+        AVG(m.score) as avg_match_score,
+        MAX(m.score) as best_match_score,
+        COUNT(*) FILTER (WHERE m.status = 'interested') as interested_count
+    FROM clients c
+    JOIN matches m ON c.id = m.client_id
+    WHERE c.status = 'active'
+    GROUP BY c.id, c.name, c.city, c.looking_for, c.max_price
+    ORDER BY avg_match_score DESC, match_count DESC
+    LIMIT :limit
+""")
+
+# One row per status; overall totals are pivoted in Python (_pivot_match_statuses)
+_Q_MATCH_BY_STATUS_MV = text("""
+    SELECT
+        NULLIF(status, '') as status,
+        SUM(cnt)::bigint as count,
+        SUM(sum_score) as sum_score
+    FROM mv_match_daily_stats
+    WHERE day >= CAST(:date_filter AS DATE)
+    GROUP BY status
+""")
+
+_Q_MATCH_BY_STATUS = text("""
+    SELECT
+        status,
+        COUNT(*) as count,
+        SUM(score) as sum_score
+    FROM matches
+    WHERE suggested_at >= :date_filter
+    GROUP BY status
+""")
+_MATCH_STATUSES = ('suggested', 'sent', 'interested', 'rejected', 'closed')
+
+_Q_MATCH_SCORE_DISTRIBUTION_MV = text("""
+    SELECT
+        score_range,
+        SUM(cnt)::bigint as count
+    FROM mv_match_daily_stats
+    WHERE day >= CAST(:date_filter AS DATE)
+    GROUP BY score_range
+    ORDER BY MIN(min_score)
+""")
+
+_Q_MATCH_SCORE_DISTRIBUTION = text(f"""
+    SELECT
+        {_SCORE_BUCKET} as bucket,
+        COUNT(*) as count
+    FROM matches
+    WHERE suggested_at >= :date_filter
+    GROUP BY bucket
+    ORDER BY bucket
+""")
+_SCORE_RANGES = ('Poor (0-50)', 'Fair (50-65)', 'Good (65-80)', 'Excellent (80+)')
+
+_Q_PROPERTY_PHOTOS = text("""
+    SELECT
+        id,
+        file_path,
+        twilio_media_url,
+        media_content_type,
+        created_at
+    FROM photos
+    WHERE property_id = :property_id
+    ORDER BY created_at DESC
+""")
+
+# Object count straight from Supabase's storage schema, next to the DB photo count
+_Q_STORAGE_COUNTS = text("""
+    SELECT
+        (SELECT COUNT(*) FROM storage.objects WHERE bucket_id = :bucket) as total_files,
+        (SELECT COUNT(*) FROM photos) as photos_in_db
+""")
+
+_Q_PHOTO_COUNT = text("SELECT COUNT(*) as count FROM photos")
+
+# Photos whose property was deleted (anti-join; NULL-safe unlike NOT IN)
+_Q_ORPHANED_PHOTO_COUNT = text("""
+    SELECT COUNT(*) as count
+    FROM photos ph
+    WHERE NOT EXISTS (SELECT 1 FROM properties p WHERE p.id = ph.property_id)
+""")
+
+_Q_ORPHANED_PHOTO_SAMPLE = text("""
+    SELECT ph.id, ph.file_path
+    FROM photos ph
+    WHERE NOT EXISTS (SELECT 1 FROM properties p WHERE p.id = ph.property_id)
+    LIMIT :limit
+""")
+
 
 class SupabaseSkill:
-    """Main skill class for Supabase operations"""
+    """
+    Main skill class for Supabase operations.
+
+    Methods report failures as an error dict / empty result, except
+    transient connection errors (utils.retry.is_transient), which are
+    raised so callers such as the CLI can retry them.
+    """
 
     def __init__(self):
         self.supabase = supabase
@@ -28,12 +348,12 @@ class SupabaseSkill:
     # SQL QUERY EXECUTION
     # ==========================================
 
-    def execute_sql_query(self, query: str, params: Optional[Dict] = None, read_only: bool = True) -> List[Dict]:
+    def execute_sql_query(self, query: Query, params: Optional[Dict] = None, read_only: bool = True) -> List[Dict]:
         """
         Execute a parameterized SQL query safely.
 
         Args:
-            query: SQL query with :param placeholders
+            query: SQL query with :param placeholders, as a string or text()
             params: Dictionary of parameters
             read_only: If True, only SELECT queries allowed
 
@@ -41,18 +361,19 @@ class SupabaseSkill:
             List of result rows as dictionaries
         """
         try:
+            statement, sql = _statement(query)
+            is_select = _SELECT_RE.match(sql) is not None
+
             # Safety check for read-only mode
-            if read_only and not query.strip().upper().startswith('SELECT'):
+            if read_only and not is_select:
                 raise ValueError("Only SELECT queries are allowed in read-only mode")
 
             with engine.connect() as conn:
-                result = conn.execute(text(query), params or {})
+                result = conn.execute(statement, params or {})
 
                 # If SELECT, return results
-                if query.strip().upper().startswith('SELECT'):
-                    columns = result.keys()
-                    rows = result.fetchall()
-                    return [dict(zip(columns, row)) for row in rows]
+                if is_select:
+                    return [dict(row) for row in result.mappings()]
                 else:
                     conn.commit()
                     return [{"affected_rows": result.rowcount}]
@@ -61,10 +382,79 @@ class SupabaseSkill:
             logger.error(f"SQL query error: {e}", exc_info=True)
             raise
 
+    def execute_sql_batch(self, queries: List[Tuple[Query, Optional[Dict]]]) -> List[List[Dict]]:
+        """
+        Run several read-only queries on one pooled connection.
+
+        Used by the analytics methods so a report costs one connection
+        checkout and one transaction instead of one per section.
+
+        Args:
+            queries: (query, params) pairs, SELECT only
+
+        Returns:
+            One list of row dictionaries per query, in order
+        """
+        statements = [(*_statement(query), params) for query, params in queries]
+        for _, sql, _ in statements:
+            if not _SELECT_RE.match(sql):
+                raise ValueError("Only SELECT queries can be batched")
+
+        try:
+            results = []
+            with engine.connect() as conn:
+                for statement, _, params in statements:
+                    result = conn.execute(statement, params or {})
+                    results.append([dict(row) for row in result.mappings()])
+            return results
+
+        except Exception as e:
+            logger.error(f"SQL batch error: {e}", exc_info=True)
+            raise
+
+    def iter_sql_query(self, query: str, params: Optional[Dict] = None, page_size: int = 1000) -> Iterator[Dict]:
+        """
+        Stream the rows of a SELECT query instead of loading them all at once.
+
+        Rows come from a server-side cursor, `page_size` at a time, so memory
+        stays flat however large the result is. The query is checked and
+        executed before this returns, so a rejected or failing query raises
+        here rather than on the first iteration.
+
+        Args:
+            query: SELECT query with :param placeholders
+            params: Dictionary of parameters
+            page_size: Rows fetched from the server per round trip
+
+        Returns:
+            Iterator over the result rows as dictionaries
+        """
+        if not _SELECT_RE.match(query):
+            raise ValueError("Only SELECT queries can be streamed")
+
+        conn = engine.connect()
+        try:
+            result = conn.execution_options(stream_results=True, yield_per=page_size).execute(
+                text(query), params or {}
+            )
+        except Exception:
+            conn.close()
+            raise
+
+        return self._stream_rows(conn, result)
+
+    @staticmethod
+    def _stream_rows(conn, result) -> Iterator[Dict]:
+        """Yield result rows as dictionaries, closing the connection when done."""
+        with conn:
+            for row in result.mappings():
+                yield dict(row)
+
     # ==========================================
     # PROPERTY ANALYTICS
     # ==========================================
 
+    @_memoized
     def get_property_analytics(self, city: Optional[str] = None, days: int = 30) -> Dict[str, Any]:
         """
         Get comprehensive property analytics.
@@ -77,75 +467,29 @@ class SupabaseSkill:
             Dictionary with analytics data
         """
         try:
-            analytics = {}
-
-            # Base query with optional city filter
-            city_filter = f"AND city = :city" if city else ""
-            date_filter = datetime.now() - timedelta(days=days)
-
-            # Total counts by transaction type
-            query = f"""
-                SELECT
-                    transaction_type,
-                    COUNT(*) as count,
-                    AVG(price) as avg_price,
-                    MIN(price) as min_price,
-                    MAX(price) as max_price,
-                    AVG(rooms) as avg_rooms
-                FROM properties
-                WHERE created_at >= :date_filter {city_filter}
-                GROUP BY transaction_type
-            """
-            params = {"date_filter": date_filter}
-            if city:
-                params["city"] = city
-
-            analytics["by_transaction_type"] = self.execute_sql_query(query, params)
-
-            # By city (if not filtered)
-            if not city:
-                query = """
-                    SELECT
-                        city,
-                        COUNT(*) as count,
-                        AVG(price) as avg_price
-                    FROM properties
-                    WHERE created_at >= :date_filter
-                    GROUP BY city
-                    ORDER BY count DESC
-                    LIMIT 10
-                """
-                analytics["top_cities"] = self.execute_sql_query(query, {"date_filter": date_filter})
-
-            # Status distribution
-            query = f"""
-                SELECT
-                    status,
-                    COUNT(*) as count
-                FROM properties
-                WHERE created_at >= :date_filter {city_filter}
-                GROUP BY status
-            """
-            analytics["by_status"] = self.execute_sql_query(query, params)
-
-            # Daily new listings
-            query = f"""
-                SELECT
-                    DATE(created_at) as date,
-                    COUNT(*) as count
-                FROM properties
-                WHERE created_at >= :date_filter {city_filter}
-                GROUP BY DATE(created_at)
-                ORDER BY date DESC
-            """
-            analytics["daily_new_listings"] = self.execute_sql_query(query, params)
+            params = {
+                "date_filter": datetime.now() - timedelta(days=days),
+                "city": city or None,
+            }
+            queries = _PROPERTY_VIEW_SECTIONS if settings.ANALYTICS_USE_MATVIEWS else _PROPERTY_SECTIONS
+
+            # Section name -> (query, params); all run on one connection.
+            # The city breakdown is only meaningful when not filtering by city.
+            sections = {
+                name: (query, params)
+                for name, query in queries.items()
+                if not (city and name == "top_cities")
+            }
 
-            return analytics
+            return dict(zip(sections, self.execute_sql_batch(list(sections.values()))))
 
         except Exception as e:
+            if is_transient(e):
+                raise
             logger.error(f"Property analytics error: {e}", exc_info=True)
             return {"error": str(e)}
 
+    @_memoized
     def get_property_performance(self, limit: int = 10) -> List[Dict]:
         """
         Get top performing properties by match count and scores.
@@ -157,29 +501,11 @@ class SupabaseSkill:
             List of property performance data
         """
         try:
-            query = """
-                SELECT
-                    p.id,
-                    p.city,
-                    p.street,
-                    p.rooms,
-                    p.price,
-                    p.transaction_type,
-                    COUNT(m.id) as match_count,
-                    AVG(m.score) as avg_score,
-                    COUNT(CASE WHEN m.status = 'interested' THEN 1 END) as interested_count,
-                    COUNT(CASE WHEN m.status = 'closed' THEN 1 END) as closed_count
-                FROM properties p
-                LEFT JOIN matches m ON p.id = m.property_id
-                WHERE p.status = 'available'
-                GROUP BY p.id, p.city, p.street, p.rooms, p.price, p.transaction_type
-                HAVING COUNT(m.id) > 0
-                ORDER BY match_count DESC, avg_score DESC
-                LIMIT :limit
-            """
-            return self.execute_sql_query(query, {"limit": limit})
+            return self.execute_sql_query(_Q_PROPERTY_PERFORMANCE, {"limit": limit})
 
         except Exception as e:
+            if is_transient(e):
+                raise
             logger.error(f"Property performance error: {e}", exc_info=True)
             return []
 
@@ -187,6 +513,7 @@ class SupabaseSkill:
     # CLIENT ANALYTICS
     # ==========================================
 
+    @_memoized
     def get_client_analytics(self, days: int = 30) -> Dict[str, Any]:
         """
         Get comprehensive client analytics.
@@ -198,57 +525,33 @@ class SupabaseSkill:
             Dictionary with analytics data
         """
         try:
-            analytics = {}
-            date_filter = datetime.now() - timedelta(days=days)
+            params = {"date_filter": datetime.now() - timedelta(days=days)}
+
+            # Section name -> (query, params); all run on one connection
+            sections = {}
 
             # By looking_for type
-            query = """
-                SELECT
-                    looking_for,
-                    COUNT(*) as count,
-                    AVG(max_price) as avg_budget
-                FROM clients
-                WHERE created_at >= :date_filter AND status = 'active'
-                GROUP BY looking_for
-            """
-            analytics["by_type"] = self.execute_sql_query(query, {"date_filter": date_filter})
+            sections["by_type"] = (_Q_CLIENT_BY_TYPE, params)
 
             # By city preference
-            query = """
-                SELECT
-                    city,
-                    COUNT(*) as count
-                FROM clients
-                WHERE created_at >= :date_filter AND status = 'active' AND city IS NOT NULL
-                GROUP BY city
-                ORDER BY count DESC
-            """
-            analytics["by_city"] = self.execute_sql_query(query, {"date_filter": date_filter})
+            sections["by_city"] = (_Q_CLIENT_BY_CITY, params)
 
             # Budget distribution
-            query = """
-                SELECT
-                    CASE
-                        WHEN max_price < 3000 THEN 'Under 3,000'
-                        WHEN max_price < 5000 THEN '3,000-5,000'
-                        WHEN max_price < 7000 THEN '5,000-7,000'
-                        WHEN max_price < 10000 THEN '7,000-10,000'
-                        ELSE 'Over 10,000'
-                    END as budget_range,
-                    COUNT(*) as count
-                FROM clients
-                WHERE created_at >= :date_filter AND status = 'active' AND looking_for = 'rent'
-                GROUP BY budget_range
-                ORDER BY MIN(max_price)
-            """
-            analytics["budget_distribution"] = self.execute_sql_query(query, {"date_filter": date_filter})
+            sections["budget_distribution"] = (_Q_CLIENT_BUDGET_DISTRIBUTION, params)
 
+            analytics = dict(zip(sections, self.execute_sql_batch(list(sections.values()))))
+            analytics["budget_distribution"] = _label_buckets(
+                analytics["budget_distribution"], "budget_range", _BUDGET_RANGES
+            )
             return analytics
 
         except Exception as e:
+            if is_transient(e):
+                raise
             logger.error(f"Client analytics error: {e}", exc_info=True)
             return {"error": str(e)}
 
+    @_memoized
     def get_client_satisfaction(self, limit: int = 10) -> List[Dict]:
         """
         Get clients with best match scores and engagement.
@@ -260,28 +563,11 @@ class SupabaseSkill:
             List of client satisfaction data
         """
         try:
-            query = """
-                SELECT
-                    c.id,
-                    c.name,
-                    c.city,
-                    c.looking_for,
-                    c.max_price,
-                    COUNT(m.id) as match_count,
-                    AVG(m.score) as avg_match_score,
-                    MAX(m.score) as best_match_score,
-                    COUNT(CASE WHEN m.status = 'interested' THEN 1 END) as interested_count
-                FROM clients c
-                LEFT JOIN matches m ON c.id = m.client_id
-                WHERE c.status = 'active'
-                GROUP BY c.id, c.name, c.city, c.looking_for, c.max_price
-                HAVING COUNT(m.id) > 0
-                ORDER BY avg_match_score DESC, match_count DESC
-                LIMIT :limit
-            """
-            return self.execute_sql_query(query, {"limit": limit})
+            return self.execute_sql_query(_Q_CLIENT_SATISFACTION, {"limit": limit})
 
         except Exception as e:
+            if is_transient(e):
+                raise
             logger.error(f"Client satisfaction error: {e}", exc_info=True)
             return []
 
@@ -289,6 +575,7 @@ class SupabaseSkill:
     # MATCH ANALYTICS
     # ==========================================
 
+    @_memoized
     def get_match_analytics(self, days: int = 30) -> Dict[str, Any]:
         """
         Get comprehensive match analytics and conversion rates.
@@ -301,53 +588,38 @@ class SupabaseSkill:
         """
         try:
             analytics = {}
-            date_filter = datetime.now() - timedelta(days=days)
-
-            # Overall statistics
-            query = """
-                SELECT
-                    COUNT(*) as total_matches,
-                    AVG(score) as avg_score,
-                    COUNT(CASE WHEN status = 'suggested' THEN 1 END) as suggested,
-                    COUNT(CASE WHEN status = 'sent' THEN 1 END) as sent,
-                    COUNT(CASE WHEN status = 'interested' THEN 1 END) as interested,
-                    COUNT(CASE WHEN status = 'rejected' THEN 1 END) as rejected,
-                    COUNT(CASE WHEN status = 'closed' THEN 1 END) as closed
-                FROM matches
-                WHERE suggested_at >= :date_filter
-            """
-            overall = self.execute_sql_query(query, {"date_filter": date_filter})
-            if overall:
-                analytics["overall"] = overall[0]
-                # Calculate conversion rates
-                total = overall[0].get('total_matches', 0)
-                if total > 0:
-                    analytics["conversion_rates"] = {
-                        "suggested_to_sent": round(overall[0].get('sent', 0) / total * 100, 2),
-                        "sent_to_interested": round(overall[0].get('interested', 0) / total * 100, 2),
-                        "interested_to_closed": round(overall[0].get('closed', 0) / total * 100, 2)
-                    }
-
-            # Score distribution
-            query = """
-                SELECT
-                    CASE
-                        WHEN score < 50 THEN 'Poor (0-50)'
-                        WHEN score < 65 THEN 'Fair (50-65)'
-                        WHEN score < 80 THEN 'Good (65-80)'
-                        ELSE 'Excellent (80+)'
-                    END as score_range,
-                    COUNT(*) as count
-                FROM matches
-                WHERE suggested_at >= :date_filter
-                GROUP BY score_range
-                ORDER BY MIN(score)
-            """
-            analytics["score_distribution"] = self.execute_sql_query(query, {"date_filter": date_filter})
+            params = {"date_filter": datetime.now() - timedelta(days=days)}
+
+            # Overall statistics and score distribution, on one connection
+            if settings.ANALYTICS_USE_MATVIEWS:
+                by_status, score_distribution = self.execute_sql_batch(
+                    [(_Q_MATCH_BY_STATUS_MV, params), (_Q_MATCH_SCORE_DISTRIBUTION_MV, params)]
+                )
+            else:
+                by_status, buckets = self.execute_sql_batch(
+                    [(_Q_MATCH_BY_STATUS, params), (_Q_MATCH_SCORE_DISTRIBUTION, params)]
+                )
+                score_distribution = _label_buckets(buckets, "score_range", _SCORE_RANGES)
+
+            overall = analytics["overall"] = _pivot_match_statuses(by_status)
+
+            # Calculate conversion rates
+            total = overall['total_matches']
+            if total > 0:
+                scale = 100.0 / total
+                analytics["conversion_rates"] = {
+                    "suggested_to_sent": round(overall['sent'] * scale, 2),
+                    "sent_to_interested": round(overall['interested'] * scale, 2),
+                    "interested_to_closed": round(overall['closed'] * scale, 2)
+                }
+
+            analytics["score_distribution"] = score_distribution
 
             return analytics
 
         except Exception as e:
+            if is_transient(e):
+                raise
             logger.error(f"Match analytics error: {e}", exc_info=True)
             return {"error": str(e)}
 
@@ -358,23 +630,34 @@ class SupabaseSkill:
     def get_storage_stats(self) -> Dict[str, Any]:
         """Get Supabase Storage usage statistics."""
         try:
-            # Get all files from bucket
-            files = self.supabase.storage.from_(self.bucket_name).list()
-
-            # Count photos in database
-            with get_session() as session:
-                db_photo_count = session.execute(text("SELECT COUNT(*) FROM photos")).scalar()
+            bucket = self.supabase.storage.from_(self.bucket_name)
+
+            if engine.dialect.name == 'postgresql':
+                # Only the newest few objects' metadata; the total is counted in SQL
+                files = bucket.list(
+                    "", {"limit": 10, "offset": 0, "sortBy": {"column": "created_at", "order": "desc"}}
+                ) or []
+                counts = self.execute_sql_query(_Q_STORAGE_COUNTS, {"bucket": self.bucket_name})[0]
+                total_files, photos_in_db = counts["total_files"], counts["photos_in_db"]
+            else:
+                # storage.objects only exists in Supabase Postgres; count the listing instead
+                listed = bucket.list() or []
+                files = listed[:10]
+                total_files = len(listed)
+                photos_in_db = self.execute_sql_query(_Q_PHOTO_COUNT)[0]["count"]
 
             stats = {
                 "bucket_name": self.bucket_name,
-                "total_files": len(files) if files else 0,
-                "photos_in_db": db_photo_count,
-                "files": files[:10] if files else []  # Sample of files
+                "total_files": total_files,
+                "photos_in_db": photos_in_db,
+                "files": files  # Sample of files
             }
 
             return stats
 
         except Exception as e:
+            if is_transient(e):
+                raise
             logger.error(f"Storage stats error: {e}", exc_info=True)
             return {"error": str(e)}
 
@@ -389,45 +672,44 @@ class SupabaseSkill:
             List of photo URLs and metadata
         """
         try:
-            query = """
-                SELECT
-                    id,
-                    file_path,
-                    twilio_media_url,
-                    media_content_type,
-                    created_at
-                FROM photos
-                WHERE property_id = :property_id
-                ORDER BY created_at DESC
-            """
-            return self.execute_sql_query(query, {"property_id": property_id})
+            return self.execute_sql_query(_Q_PROPERTY_PHOTOS, {"property_id": property_id})
 
         except Exception as e:
+            if is_transient(e):
+                raise
             logger.error(f"Get property photos error: {e}", exc_info=True)
             return []
 
     def cleanup_orphaned_photos(self) -> Dict[str, int]:
         """
-        Identify and optionally remove photos not linked to any property.
+        Check for photos not linked to any property.
+
+        photos.property_id cascades on property delete, so this should
+        always report zero; anything else means the foreign key is missing
+        (see supabase_setup.sql) or SQLite ran without foreign_keys=ON.
 
         Returns:
             Dictionary with cleanup statistics
         """
         try:
-            # Find orphaned photos (properties that were deleted)
-            query = """
-                SELECT id, file_path
-                FROM photos
-                WHERE property_id NOT IN (SELECT id FROM properties)
-            """
-            orphaned = self.execute_sql_query(query)
+            # Count in the database and fetch only a sample, rather than every orphan
+            count, sample = self.execute_sql_batch([
+                (_Q_ORPHANED_PHOTO_COUNT, None),
+                (_Q_ORPHANED_PHOTO_SAMPLE, {"limit": 10}),
+            ])
+
+            orphaned_count = count[0]["count"]
+            if orphaned_count:
+                logger.warning(f"{orphaned_count} photos reference deleted properties; is the photos foreign key in place?")
 
             return {
-                "orphaned_count": len(orphaned),
-                "orphaned_photos": orphaned[:10]  # Sample
+                "orphaned_count": orphaned_count,
+                "orphaned_photos": sample
             }
 
         except Exception as e:
+            if is_transient(e):
+                raise
             logger.error(f"Cleanup orphaned photos error: {e}", exc_info=True)
             return {"error": str(e)}
 
@@ -459,6 +741,8 @@ class SupabaseSkill:
                 return f"Unknown report type: {report_type}"
 
         except Exception as e:
+            if is_transient(e):
+                raise
             logger.error(f"Generate report error: {e}", exc_info=True)
             return f"Error generating report: {str(e)}"
 
@@ -467,104 +751,113 @@ class SupabaseSkill:
         analytics = self.get_property_analytics(city=city, days=days)
         performance = self.get_property_performance(limit=5)
 
-        report = f"# Property Report ({days} days)\n\n"
+        lines = [f"# Property Report ({days} days)", ""]
 
         if city:
-            report += f"**City:** {city}\n\n"
+            lines += [f"**City:** {city}", ""]
 
         # Transaction types
-        report += "## By Transaction Type\n"
-        for row in analytics.get("by_transaction_type", []):
-            report += f"- **{row['transaction_type'].upper()}**: {row['count']} properties, "
-            report += f"Avg: {int(row['avg_price']):,} ₪, "
-            report += f"Range: {int(row['min_price']):,}-{int(row['max_price']):,} ₪\n"
+        lines.append("## By Transaction Type")
+        lines += [
+            f"- **{row['transaction_type'].upper()}**: {row['count']} properties, "
+            f"Avg: {int(row['avg_price']):,} ₪, "
+            f"Range: {int(row['min_price']):,}-{int(row['max_price']):,} ₪"
+            for row in analytics.get("by_transaction_type", [])
+        ]
 
         # Top cities
         if not city and analytics.get("top_cities"):
-            report += "\n## Top Cities\n"
-            for row in analytics.get("top_cities", []):
-                report += f"- **{row['city']}**: {row['count']} properties, Avg: {int(row['avg_price']):,} ₪\n"
+            lines += ["", "## Top Cities"]
+            lines += [
+                f"- **{row['city']}**: {row['count']} properties, Avg: {int(row['avg_price']):,} ₪"
+                for row in analytics["top_cities"]
+            ]
 
         # Top performers
         if performance:
-            report += "\n## Top Performing Properties\n"
-            for i, prop in enumerate(performance[:5], 1):
-                report += f"{i}. **#{prop['id']}** - {prop['city']}, {prop['street']} | "
-                report += f"{prop['rooms']} rooms, {int(prop['price']):,} ₪ | "
-                report += f"Matches: {prop['match_count']}, Score: {prop['avg_score']:.1f}\n"
+            lines += ["", "## Top Performing Properties"]
+            lines += [
+                f"{i}. **#{prop['id']}** - {prop['city']}, {prop['street']} | "
+                f"{prop['rooms']} rooms, {int(prop['price']):,} ₪ | "
+                f"Matches: {prop['match_count']}, Score: {prop['avg_score']:.1f}"
+                for i, prop in enumerate(performance[:5], 1)
+            ]
 
-        return report
+        return "\n".join(lines) + "\n"
 
     def _generate_client_report(self, days: int = 30) -> str:
         """Generate client report."""
         analytics = self.get_client_analytics(days=days)
         satisfaction = self.get_client_satisfaction(limit=5)
 
-        report = f"# Client Report ({days} days)\n\n"
+        lines = [f"# Client Report ({days} days)", ""]
 
         # By type
-        report += "## By Type\n"
-        for row in analytics.get("by_type", []):
-            report += f"- **{row['looking_for'].upper()}**: {row['count']} clients, "
-            if row['avg_budget']:
-                report += f"Avg Budget: {int(row['avg_budget']):,} ₪\n"
-            else:
-                report += "\n"
+        lines.append("## By Type")
+        lines += [
+            f"- **{row['looking_for'].upper()}**: {row['count']} clients, "
+            + (f"Avg Budget: {int(row['avg_budget']):,} ₪" if row['avg_budget'] else "")
+            for row in analytics.get("by_type", [])
+        ]
 
         # Top cities
         if analytics.get("by_city"):
-            report += "\n## Popular Cities\n"
-            for row in analytics.get("by_city", [])[:5]:
-                report += f"- **{row['city']}**: {row['count']} clients\n"
+            lines += ["", "## Popular Cities"]
+            lines += [f"- **{row['city']}**: {row['count']} clients" for row in analytics["by_city"][:5]]
 
         # Best matches
         if satisfaction:
-            report += "\n## Clients with Best Matches\n"
-            for i, client in enumerate(satisfaction[:5], 1):
-                report += f"{i}. **{client['name']}** ({client['city']}) | "
-                report += f"Budget: {int(client['max_price']):,} ₪ | "
-                report += f"Matches: {client['match_count']}, Avg Score: {client['avg_match_score']:.1f}\n"
+            lines += ["", "## Clients with Best Matches"]
+            lines += [
+                f"{i}. **{client['name']}** ({client['city']}) | "
+                f"Budget: {int(client['max_price']):,} ₪ | "
+                f"Matches: {client['match_count']}, Avg Score: {client['avg_match_score']:.1f}"
+                for i, client in enumerate(satisfaction[:5], 1)
+            ]
 
-        return report
+        return "\n".join(lines) + "\n"
 
     def _generate_match_report(self, days: int = 30) -> str:
         """Generate match report."""
         analytics = self.get_match_analytics(days=days)
 
-        report = f"# Match Analytics Report ({days} days)\n\n"
+        lines = [f"# Match Analytics Report ({days} days)", ""]
 
         if "overall" in analytics:
             overall = analytics["overall"]
-            report += "## Overall Statistics\n"
-            report += f"- **Total Matches**: {overall['total_matches']}\n"
-            report += f"- **Average Score**: {overall['avg_score']:.1f}\n"
-            report += f"- **Suggested**: {overall['suggested']}\n"
-            report += f"- **Sent**: {overall['sent']}\n"
-            report += f"- **Interested**: {overall['interested']}\n"
-            report += f"- **Rejected**: {overall['rejected']}\n"
-            report += f"- **Closed**: {overall['closed']}\n"
+            lines += [
+                "## Overall Statistics",
+                f"- **Total Matches**: {overall['total_matches']}",
+                f"- **Average Score**: {overall['avg_score']:.1f}",
+                f"- **Suggested**: {overall['suggested']}",
+                f"- **Sent**: {overall['sent']}",
+                f"- **Interested**: {overall['interested']}",
+                f"- **Rejected**: {overall['rejected']}",
+                f"- **Closed**: {overall['closed']}",
+            ]
 
         if "conversion_rates" in analytics:
             rates = analytics["conversion_rates"]
-            report += "\n## Conversion Rates\n"
-            report += f"- **Suggested → Sent**: {rates['suggested_to_sent']}%\n"
-            report += f"- **Sent → Interested**: {rates['sent_to_interested']}%\n"
-            report += f"- **Interested → Closed**: {rates['interested_to_closed']}%\n"
+            lines += [
+                "",
+                "## Conversion Rates",
+                f"- **Suggested → Sent**: {rates['suggested_to_sent']}%",
+                f"- **Sent → Interested**: {rates['sent_to_interested']}%",
+                f"- **Interested → Closed**: {rates['interested_to_closed']}%",
+            ]
 
-        return report
+        return "\n".join(lines) + "\n"
 
     def _generate_monthly_report(self) -> str:
         """Generate comprehensive monthly report."""
-        property_report = self._generate_property_report(days=30)
-        client_report = self._generate_client_report(days=30)
-        match_report = self._generate_match_report(days=30)
-
-        report = f"# Monthly Report - {datetime.now().strftime('%B %Y')}\n\n"
-        report += property_report + "\n\n---\n\n"
-        report += client_report + "\n\n---\n\n"
-        report += match_report
-
-        return report
+        # The sections are independent; run them on separate pooled connections
+        sections = (self._generate_property_report, self._generate_client_report, self._generate_match_report)
+        with ThreadPoolExecutor(max_workers=len(sections)) as executor:
+            futures = [executor.submit(section, days=30) for section in sections]
+            reports = [future.result() for future in futures]
+
+        header = f"# Monthly Report - {datetime.now().strftime('%B %Y')}\n\n"
+        return header + "\n\n---\n\n".join(reports)
 
 
 # Singleton instance
@@ -7,6 +7,7 @@ from pydantic import BaseModel
 from typing import Type, Optional, List
 import logging
 import json
+from sqlalchemy.orm import undefer
 
 from database.models import Property, Client, Photo, Match
 from database.connection import get_session
@@ -95,12 +96,14 @@ class PropertyGetByIdTool(BaseTool):
         """Get a specific property by ID with all details."""
         try:
             with get_session() as session:
-                prop = session.query(Property).filter_by(id=property_id).first()
+                prop = session.query(Property).options(
+                    undefer(Property.photo_count)
+                ).filter_by(id=property_id).first()
 
                 if not prop:
                     return f"נכס מספר {property_id} לא נמצא במאגר."
 
-                photo_count = len(prop.photos)
+                photo_count = prop.photo_count
                 transaction = "להשכרה" if prop.transaction_type == "rent" else "למכירה"
 
                 # Build full details response
@@ -172,15 +175,17 @@ class PropertyQueryTool(BaseTool):
             with get_session() as session:
                 # If specific property_id is provided, return full details
                 if property_id:
-                    prop = session.query(Property).filter_by(id=property_id).first()
+                    prop = session.query(Property).options(
+                        undefer(Property.photo_count)
+                    ).filter_by(id=property_id).first()
 
                     if not prop:
                         return f"נכס מספר {property_id} לא נמצא במאגר."
 
                     return self._format_full_property(prop)
 
-                # Otherwise, search with filters
-                query = session.query(Property)
+                # Otherwise, search with filters (photo counts come back in the same SELECT)
+                query = session.query(Property).options(undefer(Property.photo_count))
 
                 if street:
                     query = query.filter(Property.street.ilike(f'%{street}%'))
@@ -218,7 +223,7 @@ class PropertyQueryTool(BaseTool):
 
     def _format_full_property(self, prop: Property) -> str:
         """Format a property with all its details."""
-        photo_count = len(prop.photos)
+        photo_count = prop.photo_count
         transaction = "להשכרה" if prop.transaction_type == "rent" else "למכירה"
 
         lines = [f"נכס #{prop.id}: {prop.property_type} ב{prop.address}"]
@@ -4,9 +4,12 @@ Property-client matching algorithm with weighted scoring.
 from crewai_tools import BaseTool
 
 from pydantic import BaseModel
-from typing import Type, List, Dict, Tuple, ClassVar
+from typing import Type, List, Dict, Tuple, ClassVar, Optional
+import heapq
 import logging
 import json
+from operator import itemgetter
+from sqlalchemy.orm import load_only
 
 from database.models import Property, Client, Match
 from database.connection import get_session
@@ -14,6 +17,71 @@ from tools.schemas import PropertyMatchInput, ClientMatchInput
 
 logger = logging.getLogger(__name__)
 
+# Minimum score for a pair to count as a match
+MATCH_THRESHOLD = 65
+
+# Region mappings for location matching
+_REGIONS: Dict[str, List[str]] = {
+    'גוש_דן': ['תל אביב', 'רמת גן', 'גבעתיים', 'בני ברק', 'חולון', 'בת ים'],
+    'ירושלים': ['ירושלים', 'בית שמש', 'מודיעין'],
+    'חיפה': ['חיפה', 'קריות', 'קריית ביאליק', 'קריית אתא', 'קריית מוצקין'],
+    'מרכז': ['רעננה', 'כפר סבא', 'הרצליה', 'רמת השרון', 'הוד השרון'],
+    'דרום': ['באר שבע', 'אשדוד', 'אשקלון'],
+    'צפון': ['נצרת', 'כרמיאל', 'צפת', 'טבריה'],
+}
+
+# Columns the scorer and result formatting read; skip descriptions/notes on candidate scans
+_PROPERTY_MATCH_COLUMNS = (
+    Property.id, Property.address, Property.property_type, Property.city,
+    Property.rooms, Property.size, Property.price,
+)
+_CLIENT_MATCH_COLUMNS = (
+    Client.id, Client.name, Client.phone, Client.city,
+    Client.min_rooms, Client.max_rooms, Client.min_price, Client.max_price, Client.min_size,
+)
+
+# Reverse lookup (city -> region) so region checks are a dict hit per pair
+_CITY_REGION: Dict[str, str] = {
+    city: region for region, cities in _REGIONS.items() for city in cities
+}
+
+
+def save_matches(session, scored: List[Tuple[int, float]],
+                 client_id: Optional[int] = None, property_id: Optional[int] = None):
+    """
+    Store suggested matches for one client or one property, skipping pairs that already exist.
+
+    Args:
+        session: Active database session
+        scored: (id, score) pairs for the other side of each match
+        client_id: Client the matches belong to (scored holds property IDs)
+        property_id: Property the matches belong to (scored holds client IDs)
+    """
+    if (client_id is None) == (property_id is None):
+        raise ValueError("Pass exactly one of client_id or property_id")
+
+    if client_id is not None:
+        fixed_key, fixed_id, other_key = 'client_id', client_id, 'property_id'
+    else:
+        fixed_key, fixed_id, other_key = 'property_id', property_id, 'client_id'
+    other_column = getattr(Match, other_key)
+
+    # One IN query for all candidate pairs instead of a lookup per candidate
+    existing = {
+        other_id for (other_id,) in session.query(other_column).filter(
+            getattr(Match, fixed_key) == fixed_id,
+            other_column.in_([other_id for other_id, _ in scored])
+        )
+    }
+
+    for other_id, score in scored:
+        if other_id not in existing:
+            session.add(Match(
+                **{fixed_key: fixed_id, other_key: other_id},
+                score=score,
+                status='suggested'
+            ))
+
 
 class PropertyMatcherTool(BaseTool):
     """Tool for finding matching properties for a client."""
@@ -21,15 +89,7 @@ class PropertyMatcherTool(BaseTool):
     description: str = "מחפש נכסים המתאימים לדרישות הלקוח ומחזיר רשימה עם ציוני התאמה."
     args_schema: Type[BaseModel] = PropertyMatchInput
 
-    # Region mappings for location matching
-    REGIONS: ClassVar[Dict[str, List[str]]] = {
-        'גוש_דן': ['תל אביב', 'רמת גן', 'גבעתיים', 'בני ברק', 'חולון', 'בת ים'],
-        'ירושלים': ['ירושלים', 'בית שמש', 'מודיעין'],
-        'חיפה': ['חיפה', 'קריות', 'קריית ביאליק', 'קריית אתא', 'קריית מוצקין'],
-        'מרכז': ['רעננה', 'כפר סבא', 'הרצליה', 'רמת השרון', 'הוד השרון'],
-        'דרום': ['באר שבע', 'אשדוד', 'אשקלון'],
-        'צפון': ['נצרת', 'כרמיאל', 'צפת', 'טבריה'],
-    }
+    REGIONS: ClassVar[Dict[str, List[str]]] = _REGIONS
 
     def _run(self, client_id: int, limit: int = 5) -> str:
         """Find matching properties for a client."""
@@ -40,75 +100,80 @@ class PropertyMatcherTool(BaseTool):
                 if not client:
                     return f"לקוח מספר {client_id} לא נמצא במאגר."
 
-                # Get all available properties with matching transaction type
-                looking_for_mapping = {'rent': 'rent', 'buy': 'sale'}
-                transaction_type = looking_for_mapping.get(client.looking_for)
-
-                properties = session.query(Property).filter(
-                    Property.status == 'available',
-                    Property.transaction_type == transaction_type
-                ).all()
-
-                if not properties:
-                    return f"לא נמצאו נכסים זמינים מסוג '{transaction_type}'."
-
-                # Calculate match scores
-                matches = []
-                for prop in properties:
-                    score = self._calculate_score(prop, client)
-                    if score >= 65:  # Threshold for good match
-                        matches.append({
-                            'property': prop,
-                            'score': score,
-                            'explanation': self._explain_score(prop, client, score)
-                        })
-
-                # Sort by score
-                matches.sort(key=lambda x: x['score'], reverse=True)
-                top_matches = matches[:limit]
-
-                if not top_matches:
-                    return f"לא נמצאו נכסים מתאימים ללקוח {client.name}. אולי כדאי להרחיב את הקריטריונים."
+                top_matches, no_results = self.find_matches(session, client, limit)
+                if no_results:
+                    return no_results
 
                 # Save matches to database
-                for match in top_matches:
-                    existing_match = session.query(Match).filter_by(
-                        property_id=match['property'].id,
-                        client_id=client_id
-                    ).first()
-
-                    if not existing_match:
-                        db_match = Match(
-                            property_id=match['property'].id,
-                            client_id=client_id,
-                            score=match['score'],
-                            status='suggested'
-                        )
-                        session.add(db_match)
+                save_matches(session, [
+                    (match['property'].id, match['score']) for match in top_matches
+                ], client_id=client_id)
 
-                # Format results
-                result_lines = [
-                    f"נמצאו {len(top_matches)} נכסים מתאימים ל{client.name}:\n"
-                ]
-
-                for i, match in enumerate(top_matches, 1):
-                    prop = match['property']
-                    score = match['score']
-                    explanation = match['explanation']
-
-                    result_lines.append(
-                        f"{i}. נכס #{prop.id} - {prop.address} "
-                        f"(ציון התאמה: {score:.0f}%)"
-                    )
-                    result_lines.append(f"   {prop.property_type} | {prop.rooms} חדרים | {prop.price:,}₪")
-                    result_lines.append(f"   {explanation}\n")
-
-                return "\n".join(result_lines)
+                return self.format_matches(client, top_matches)
 
         except Exception as e:
             logger.error(f"Error matching properties: {e}", exc_info=True)
             return f"שגיאה בחיפוש התאמות: {str(e)}"
 
+    def find_matches(self, session, client, limit: int = 5) -> Tuple[list, str]:
+        """
+        Score available properties against a saved client's criteria.
+
+        Returns:
+            (top matches, "") or ([], Hebrew message explaining why nothing matched)
+        """
+        # Get all available properties with matching transaction type
+        looking_for_mapping = {'rent': 'rent', 'buy': 'sale'}
+        transaction_type = looking_for_mapping.get(client.looking_for)
+
+        properties = session.query(Property).options(
+            load_only(*_PROPERTY_MATCH_COLUMNS)
+        ).filter(
+            Property.status == 'available',
+            Property.transaction_type == transaction_type
+        ).all()
+
+        if not properties:
+            return [], f"לא נמצאו נכסים זמינים מסוג '{transaction_type}'."
+
+        # Score every candidate, keep only the top `limit` above the threshold
+        calculate_score = self._calculate_score
+        scored = (
+            {'property': prop, 'score': score}
+            for prop in properties
+            if (score := calculate_score(prop, client)) >= MATCH_THRESHOLD
+        )
+        top_matches = heapq.nlargest(limit, scored, key=itemgetter('score'))
+
+        # Only the shown matches need an explanation
+        for match in top_matches:
+            match['explanation'] = self._explain_score(match['property'], client, match['score'])
+
+        if not top_matches:
+            return [], f"לא נמצאו נכסים מתאימים ללקוח {client.name}. אולי כדאי להרחיב את הקריטריונים."
+
+        return top_matches, ""
+
+    def format_matches(self, client, top_matches: list) -> str:
+        """Format matches from find_matches() as a Hebrew list."""
+        result_lines = [
+            f"נמצאו {len(top_matches)} נכסים מתאימים ל{client.name}:\n"
+        ]
+
+        for i, match in enumerate(top_matches, 1):
+            prop = match['property']
+            score = match['score']
+            explanation = match['explanation']
+
+            result_lines.append(
+                f"{i}. נכס #{prop.id} - {prop.address} "
+                f"(ציון התאמה: {score:.0f}%)"
+            )
+            result_lines.append(f"   {prop.property_type} | {prop.rooms} חדרים | {prop.price:,}₪")
+            result_lines.append(f"   {explanation}\n")
+
+        return "\n".join(result_lines)
+
     def _calculate_score(self, prop: Property, client: Client) -> float:
         """
         Calculate match score based on weighted criteria.
@@ -168,10 +233,8 @@ class PropertyMatcherTool(BaseTool):
 
     def _same_region(self, city1: str, city2: str) -> bool:
         """Check if two cities are in the same region."""
-        for region, cities in self.REGIONS.items():
-            if city1 in cities and city2 in cities:
-                return True
-        return False
+        region = _CITY_REGION.get(city1)
+        return region is not None and region == _CITY_REGION.get(city2)
 
     def _explain_score(self, prop: Property, client: Client, score: float) -> str:
         """Generate explanation for the match score."""
@@ -233,7 +296,9 @@ class ClientMatcherTool(BaseTool):
                 looking_for_mapping = {'rent': 'rent', 'sale': 'buy'}
                 looking_for = looking_for_mapping.get(prop.transaction_type)
 
-                clients = session.query(Client).filter(
+                clients = session.query(Client).options(
+                    load_only(*_CLIENT_MATCH_COLUMNS)
+                ).filter(
                     Client.status == 'active',
                     Client.looking_for == looking_for
                 ).all()
@@ -243,39 +308,25 @@ class ClientMatcherTool(BaseTool):
 
                 # Use PropertyMatcherTool logic in reverse
                 matcher = PropertyMatcherTool()
-                matches = []
-
-                for client in clients:
-                    score = matcher._calculate_score(prop, client)
-                    if score >= 65:
-                        matches.append({
-                            'client': client,
-                            'score': score,
-                            'explanation': matcher._explain_score(prop, client, score)
-                        })
+                calculate_score = matcher._calculate_score
+                scored = (
+                    {'client': client, 'score': score}
+                    for client in clients
+                    if (score := calculate_score(prop, client)) >= MATCH_THRESHOLD
+                )
+                top_matches = heapq.nlargest(limit, scored, key=itemgetter('score'))
 
-                # Sort by score
-                matches.sort(key=lambda x: x['score'], reverse=True)
-                top_matches = matches[:limit]
+                # Only the shown matches need an explanation
+                for match in top_matches:
+                    match['explanation'] = matcher._explain_score(prop, match['client'], match['score'])
 
                 if not top_matches:
                     return f"לא נמצאו לקוחות מתאימים לנכס #{property_id}."
 
                 # Save matches to database
-                for match in top_matches:
-                    existing_match = session.query(Match).filter_by(
-                        property_id=property_id,
-                        client_id=match['client'].id
-                    ).first()
-
-                    if not existing_match:
-                        db_match = Match(
-                            property_id=property_id,
-                            client_id=match['client'].id,
-                            score=match['score'],
-                            status='suggested'
-                        )
-                        session.add(db_match)
+                save_matches(session, [
+                    (match['client'].id, match['score']) for match in top_matches
+                ], property_id=property_id)
 
                 # Format results
                 result_lines = [
@@ -8,10 +8,12 @@ from pydantic import BaseModel
 from typing import Type, Optional
 import logging
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
 import os
 from uuid import uuid4
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, Future
 from supabase import create_client, Client
 
 from database.models import Photo
@@ -24,6 +26,66 @@ logger = logging.getLogger(__name__)
 # Initialize Supabase client
 supabase: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
 
+# WhatsApp allows up to 10 media items per message; download them all at once
+MAX_CONCURRENT_DOWNLOADS = 10
+DOWNLOAD_TIMEOUT = 15  # seconds per media file
+
+# Shared HTTP session so repeated Twilio downloads reuse TLS connections.
+# The pool is sized to the download concurrency so parallel fetches keep
+# their connections instead of opening and discarding extra ones.
+_http = requests.Session()
+_http.auth = HTTPBasicAuth(
+    settings.TWILIO_ACCOUNT_SID,
+    settings.TWILIO_AUTH_TOKEN
+)
+_http.mount('https://', HTTPAdapter(
+    pool_connections=MAX_CONCURRENT_DOWNLOADS,
+    pool_maxsize=MAX_CONCURRENT_DOWNLOADS
+))
+
+# Media downloads started ahead of the photo task (media_url -> Future[bytes])
+_download_pool = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_DOWNLOADS, thread_name_prefix='media')
+_prefetched: dict = {}
+
+
+def _download_media(media_url: str) -> bytes:
+    """Download raw media bytes from Twilio (authenticated)."""
+    logger.info(f"Downloading media from: {media_url}")
+    response = _http.get(media_url, timeout=DOWNLOAD_TIMEOUT)
+    response.raise_for_status()
+    return response.content
+
+
+def prefetch_media(media_urls: list):
+    """
+    Start downloading media in the background.
+
+    The photo task later picks up the result instead of downloading again,
+    so the Twilio round-trips overlap with intent classification and parsing.
+    """
+    for media_url in media_urls:
+        if media_url not in _prefetched:
+            _prefetched[media_url] = _download_pool.submit(_download_media, media_url)
+
+
+def discard_prefetched(media_urls: list):
+    """Drop prefetched media that was never consumed (e.g. message was not a new property)."""
+    for media_url in media_urls:
+        future = _prefetched.pop(media_url, None)
+        if future is not None:
+            future.cancel()
+
+
+def _get_media_content(media_url: str) -> bytes:
+    """Return prefetched media bytes if available, otherwise download now."""
+    future: Optional[Future] = _prefetched.pop(media_url, None)
+    if future is not None:
+        try:
+            return future.result()
+        except Exception as e:
+            logger.warning(f"Prefetch failed for {media_url}, retrying: {e}")
+    return _download_media(media_url)
+
 
 class TwilioMediaDownloader(BaseTool):
     """Tool for downloading media from Twilio WhatsApp and uploading to Supabase."""
@@ -51,16 +113,8 @@ class TwilioMediaDownloader(BaseTool):
             Hebrew confirmation message with file URL
         """
         try:
-            # Authenticate with Twilio
-            auth = HTTPBasicAuth(
-                settings.TWILIO_ACCOUNT_SID,
-                settings.TWILIO_AUTH_TOKEN
-            )
-
-            # Download media from Twilio
-            logger.info(f"Downloading media from: {media_url}")
-            response = requests.get(media_url, auth=auth, timeout=30)
-            response.raise_for_status()
+            # Download media from Twilio (or pick up the prefetched copy)
+            content = _get_media_content(media_url)
 
             # Determine file extension
             extension = self._get_extension(content_type, media_url)
@@ -81,7 +135,7 @@ class TwilioMediaDownloader(BaseTool):
 
             upload_response = supabase.storage.from_(settings.SUPABASE_STORAGE_BUCKET).upload(
                 path=storage_path,
-                file=response.content,
+                file=content,
                 file_options={"content-type": content_type}
             )
 
@@ -192,18 +246,34 @@ class BatchMediaDownloader(BaseTool):
         """Download multiple media files."""
         try:
             downloader = TwilioMediaDownloader()
-            results = []
             success_count = 0
 
-            for i, media_url in enumerate(media_urls, 1):
-                logger.info(f"Downloading media {i}/{len(media_urls)}")
-                result = downloader._run(
-                    media_url=media_url,
-                    user_phone=user_phone,
-                    property_id=property_id
-                )
+            # Start every download up front; uploads run concurrently as each lands
+            logger.info(f"Downloading {len(media_urls)} media files in parallel")
+            prefetch_media(media_urls)
+
+            workers = max(1, min(len(media_urls), MAX_CONCURRENT_DOWNLOADS))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = [
+                    pool.submit(
+                        downloader._run,
+                        media_url=media_url,
+                        user_phone=user_phone,
+                        property_id=property_id
+                    )
+                    for media_url in media_urls
+                ]
 
-                if "נשמרה" in result:
+            # One failed photo must not drop the others' results
+            results = []
+            for i, (media_url, future) in enumerate(zip(media_urls, futures), 1):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"Error processing media {media_url}: {e}", exc_info=True)
+                    result = f"שגיאה בעיבוד התמונה: {str(e)}"
+
+                if "✅" in result:
                     success_count += 1
 
                 results.append(f"{i}. {result}")
@@ -0,0 +1,78 @@
+"""
+Retry helper with exponential backoff for transient network/database failures.
+"""
+import logging
+import sys
+import time
+from typing import Callable, Optional, Tuple, Type, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+# (module, exception names) counted as transient. Looked up in sys.modules
+# rather than imported: an error can only come from a library that is loaded,
+# and importing this helper stays free for lightweight callers like the CLI.
+_TRANSIENT_ERRORS = (
+    ('requests', ('ConnectionError', 'Timeout')),
+    ('sqlalchemy.exc', ('DisconnectionError',)),
+    ('httpx', ('TransportError',)),  # supabase client
+)
+
+
+def is_transient(error: BaseException) -> bool:
+    """
+    Decide whether an error is worth retrying.
+
+    Connection errors, timeouts, dropped database connections and HTTP 5xx
+    responses are transient; HTTP 4xx and everything else are not. Database
+    errors only count when SQLAlchemy invalidated the connection: SQLite
+    raises OperationalError for plain SQL mistakes too.
+    """
+    if getattr(error, 'connection_invalidated', False):
+        return True
+
+    response = getattr(error, 'response', None)
+    status = getattr(response, 'status_code', None)
+    if status is not None:
+        return status >= 500
+
+    for module_name, names in _TRANSIENT_ERRORS:
+        module = sys.modules.get(module_name)
+        if module is not None and isinstance(error, tuple(getattr(module, name) for name in names)):
+            return True
+    return False
+
+
+def retry(
+    fn: Callable[[], T],
+    attempts: int = 5,
+    backoff: float = 0.2,
+    exc: Tuple[Type[BaseException], ...] = (Exception,),
+    retryable: Optional[Callable[[BaseException], bool]] = None
+) -> T:
+    """
+    Call `fn` until it succeeds, sleeping backoff * 2**attempt between tries.
+
+    Args:
+        fn: Zero-argument callable
+        attempts: Maximum number of calls (default: 5)
+        backoff: Initial delay in seconds (default: 0.2)
+        exc: Exception types that may be retried
+        retryable: Optional predicate; errors it rejects are raised at once
+
+    Returns:
+        Whatever `fn` returns
+
+    Raises:
+        The last error once attempts are exhausted, or any non-retryable error
+    """
+    for attempt in range(attempts):
+        try:
+            return fn()
+        except exc as e:
+            if attempt == attempts - 1 or (retryable is not None and not retryable(e)):
+                raise
+            delay = backoff * 2 ** attempt
+            logger.warning(f"Attempt {attempt + 1}/{attempts} failed ({e}), retrying in {delay:.1f}s")
+            time.sleep(delay)